@@ -0,0 +1,195 @@
+import math
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Packed key layout: group id | time bucket | histogram bin
+_BIN_BITS = 13
+_BIN_OFFSET = 1 << (_BIN_BITS - 1)
+_BUCKET_BITS = 34
+_GROUP_BITS = 63 - _BUCKET_BITS - _BIN_BITS
+
+class SpreadAggregator:
+    """
+    Incremental, out-of-core spread aggregation.
+
+    Consumes Arrow record batches and keeps per (exchange, symbol, time bucket)
+    count/sum/min/max plus a sparse log-spaced histogram for percentiles
+    (relative error about (gamma - 1) / 2). State grows with the number of
+    buckets, not with the number of ticks, so memory is bounded by the batch
+    size plus the size of the aggregated output.
+
+    Args:
+        bucket_ns: Time bucket width in nanoseconds.
+        value_column: Column to aggregate.
+        percentiles: Percentiles (0-100) to report.
+        gamma: Ratio between consecutive histogram bin edges.
+        min_value: Magnitudes below this count as zero.
+    """
+    def __init__(self, bucket_ns: int, value_column: str = "spread_10k",
+                 percentiles: Sequence[float] = (50, 90, 99),
+                 gamma: float = 1.02, min_value: float = 1e-12):
+        if bucket_ns <= 0:
+            raise ValueError("bucket_ns must be positive")
+        self.bucket_ns = int(bucket_ns)
+        self.value_column = value_column
+        self.percentiles = list(percentiles)
+        self.gamma = gamma
+        self.min_value = min_value
+        self._log_gamma = math.log(gamma)
+
+        # Buckets are stored relative to this one, centred on the first timestamp seen,
+        # so narrow buckets of present-day timestamps fit in _BUCKET_BITS
+        self._base: Optional[int] = None
+
+        self._groups: Dict[Tuple[str, str], int] = {}
+        self._group_names: List[Tuple[str, str]] = []
+
+        # Sorted unique stat keys (group << _BUCKET_BITS | relative bucket) and their aggregates
+        self._keys = np.empty(0, dtype=np.int64)
+        self._count = np.empty(0, dtype=np.int64)
+        self._sum = np.empty(0, dtype=np.float64)
+        self._min = np.empty(0, dtype=np.float64)
+        self._max = np.empty(0, dtype=np.float64)
+        # Sorted unique histogram keys and their counts
+        self._hist_keys = np.empty(0, dtype=np.int64)
+        self._hist_counts = np.empty(0, dtype=np.int64)
+
+    def update(self, batch: pa.RecordBatch):
+        if batch.num_rows == 0:
+            return
+        values = batch.column(self.value_column).to_numpy(zero_copy_only=False).astype(np.float64, copy=False)
+        ts = _timestamps(batch.column("timestamp"))
+        groups = self._group_ids(batch)
+
+        valid = ~np.isnan(values)
+        if not valid.all():
+            values, ts, groups = values[valid], ts[valid], groups[valid]
+        if len(values) == 0:
+            return
+
+        buckets = ts // self.bucket_ns
+        if self._base is None:
+            self._base = int(buckets.min()) - (1 << (_BUCKET_BITS - 1))
+        buckets = buckets - self._base
+        if buckets.min() < 0 or buckets.max() >= (1 << _BUCKET_BITS):
+            raise ValueError("Timestamps span too many buckets of this width; use a wider bucket")
+        if len(self._group_names) > (1 << _GROUP_BITS):
+            raise ValueError("Too many exchange/symbol groups")
+        keys = (groups << _BUCKET_BITS) | buckets
+        self._merge_stats(keys, values)
+
+        hist_keys = (keys << _BIN_BITS) | (self._bins(values) + _BIN_OFFSET)
+        uniq, counts = np.unique(hist_keys, return_counts=True)
+        self._merge_hist(uniq, counts)
+
+    def consume(self, batches: Iterable[pa.RecordBatch]) -> "SpreadAggregator":
+        for batch in batches:
+            self.update(batch)
+        return self
+
+    def result(self) -> pd.DataFrame:
+        """
+        Return one row per (exchange, symbol, bucket) with count, mean, min,
+        max and the requested percentiles, ordered by exchange, symbol and time.
+        """
+        group_ids = self._keys >> _BUCKET_BITS
+        buckets = (self._keys & ((1 << _BUCKET_BITS) - 1)) + (self._base or 0)
+        names = self._group_names
+        frame = pd.DataFrame({
+            "exchange": [names[g][0] for g in group_ids],
+            "symbol": [names[g][1] for g in group_ids],
+            "timestamp": pd.to_datetime(buckets * self.bucket_ns, unit="ns"),
+            "count": self._count,
+            "mean": self._sum / np.maximum(self._count, 1),
+            "min": self._min,
+            "max": self._max,
+        })
+        for q, values in zip(self.percentiles, self._percentile_values()):
+            frame[f"p{q:g}"] = values
+        return frame.sort_values(["exchange", "symbol", "timestamp"], ignore_index=True)
+
+    def _group_ids(self, batch: pa.RecordBatch) -> np.ndarray:
+        ex_codes, ex_values = _encode(batch.column("exchange"))
+        sym_codes, sym_values = _encode(batch.column("symbol"))
+        pairs, inverse = np.unique(ex_codes.astype(np.int64) << 32 | sym_codes, return_inverse=True)
+        lookup = np.empty(len(pairs), dtype=np.int64)
+        for i, pair in enumerate(pairs):
+            name = (ex_values[pair >> 32], sym_values[pair & 0xFFFFFFFF])
+            gid = self._groups.get(name)
+            if gid is None:
+                gid = len(self._group_names)
+                self._groups[name] = gid
+                self._group_names.append(name)
+            lookup[i] = gid
+        return lookup[inverse.ravel()]
+
+    def _bins(self, values: np.ndarray) -> np.ndarray:
+        magnitude = np.abs(values)
+        bins = np.zeros(len(values), dtype=np.int64)
+        nonzero = magnitude >= self.min_value
+        scaled = np.log(magnitude[nonzero] / self.min_value) / self._log_gamma
+        bins[nonzero] = np.minimum(np.floor(scaled).astype(np.int64) + 1, _BIN_OFFSET - 1)
+        return np.where(values < 0, -bins, bins)
+
+    def _bin_values(self, bins: np.ndarray) -> np.ndarray:
+        # Midpoint of each log bin, mirrored for negative bins
+        magnitude = self.min_value * self.gamma ** (np.abs(bins) - 1) * (2 * self.gamma / (self.gamma + 1))
+        return np.where(bins == 0, 0.0, np.sign(bins) * magnitude)
+
+    def _merge_stats(self, keys: np.ndarray, values: np.ndarray):
+        all_keys = np.concatenate((self._keys, keys))
+        order = np.argsort(all_keys, kind="stable")
+        sorted_keys = all_keys[order]
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(sorted_keys)) + 1))
+
+        counts = np.concatenate((self._count, np.ones(len(keys), dtype=np.int64)))[order]
+        sums = np.concatenate((self._sum, values))[order]
+        mins = np.concatenate((self._min, values))[order]
+        maxs = np.concatenate((self._max, values))[order]
+
+        self._keys = sorted_keys[starts]
+        self._count = np.add.reduceat(counts, starts)
+        self._sum = np.add.reduceat(sums, starts)
+        self._min = np.minimum.reduceat(mins, starts)
+        self._max = np.maximum.reduceat(maxs, starts)
+
+    def _merge_hist(self, keys: np.ndarray, counts: np.ndarray):
+        all_keys = np.concatenate((self._hist_keys, keys))
+        all_counts = np.concatenate((self._hist_counts, counts))
+        order = np.argsort(all_keys, kind="stable")
+        sorted_keys = all_keys[order]
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(sorted_keys)) + 1))
+        self._hist_keys = sorted_keys[starts]
+        self._hist_counts = np.add.reduceat(all_counts[order], starts)
+
+    def _percentile_values(self) -> List[np.ndarray]:
+        if len(self._hist_keys) == 0:
+            return [np.empty(0) for _ in self.percentiles]
+        # Histogram keys are sorted by (stat key, bin), so each stat key owns a contiguous run
+        owner = self._hist_keys >> _BIN_BITS
+        bins = (self._hist_keys & ((1 << _BIN_BITS) - 1)) - _BIN_OFFSET
+        cumulative = np.cumsum(self._hist_counts)
+        run_starts = np.searchsorted(owner, self._keys, side="left")
+        before = np.where(run_starts > 0, cumulative[np.maximum(run_starts - 1, 0)], 0)
+
+        out = []
+        for q in self.percentiles:
+            rank = np.maximum(np.ceil(q / 100.0 * self._count), 1).astype(np.int64)
+            idx = np.searchsorted(cumulative, before + rank, side="left")
+            out.append(np.clip(self._bin_values(bins[idx]), self._min, self._max))
+        return out
+
+def _encode(column) -> Tuple[np.ndarray, List[str]]:
+    if not pa.types.is_dictionary(column.type):
+        column = pc.dictionary_encode(column)
+    if isinstance(column, pa.ChunkedArray):
+        column = column.unify_dictionaries().combine_chunks()
+    return column.indices.to_numpy(zero_copy_only=False).astype(np.int64), column.dictionary.to_pylist()
+
+def _timestamps(column) -> np.ndarray:
+    if pa.types.is_timestamp(column.type):
+        column = column.cast(pa.timestamp("ns")).cast(pa.int64())
+    return column.to_numpy(zero_copy_only=False).astype(np.int64, copy=False)
@@ -0,0 +1,103 @@
+from typing import Optional, Tuple
+import numpy as np
+
+# Default per-trace point budget for HTML reports
+DEFAULT_MAX_POINTS = 5000
+
+def _as_float(values) -> np.ndarray:
+    arr = np.asarray(values)
+    if np.issubdtype(arr.dtype, np.datetime64):
+        return arr.astype("datetime64[ns]").view("int64").astype(np.float64)
+    return arr.astype(np.float64, copy=False)
+
+def minmax_indices(x, y, n_buckets: int) -> np.ndarray:
+    """
+    Indices of the min and max point in each of n_buckets equal-width x buckets.
+
+    x must be sorted. The first and last points are always kept, so the
+    result has at most 2 * n_buckets + 2 points and never hides a spike.
+    """
+    xf, yf = _as_float(x), _as_float(y)
+    n = len(xf)
+    if n <= 2 * n_buckets + 2 or n_buckets <= 0:
+        return np.arange(n)
+
+    span = xf[-1] - xf[0]
+    if span > 0:
+        buckets = np.minimum(((xf - xf[0]) / span * n_buckets).astype(np.int64), n_buckets - 1)
+    else:
+        buckets = np.arange(n) * n_buckets // n
+
+    # x is sorted, so each bucket is a contiguous run
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    lengths = np.diff(np.r_[starts, n])
+    keep = [np.array([0, n - 1])]
+    for reduce in (np.minimum, np.maximum):
+        extreme = np.repeat(reduce.reduceat(yf, starts), lengths)
+        hits = np.flatnonzero(yf == extreme)
+        # First hit per bucket
+        first = np.r_[True, buckets[hits][1:] != buckets[hits][:-1]]
+        keep.append(hits[first])
+    return np.unique(np.concatenate(keep))
+
+def lttb_indices(x, y, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets selection of n_out point indices.
+
+    Each bucket keeps the point forming the largest triangle with the point
+    picked in the previous bucket and the mean of the next bucket. The
+    per-bucket search is vectorized; only the walk over buckets is sequential.
+    """
+    xf, yf = _as_float(x), _as_float(y)
+    n = len(xf)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # Interior points split into n_out - 2 buckets; first and last points are fixed
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # Mean of every bucket, used as the third triangle vertex
+    csum_x = np.concatenate(([0.0], np.cumsum(xf)))
+    csum_y = np.concatenate(([0.0], np.cumsum(yf)))
+    lo, hi = edges[:-1], edges[1:]
+    counts = np.maximum(hi - lo, 1)
+    mean_x = (csum_x[hi] - csum_x[lo]) / counts
+    mean_y = (csum_y[hi] - csum_y[lo]) / counts
+    mean_x = np.append(mean_x, xf[-1])
+    mean_y = np.append(mean_y, yf[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = lo[i], max(hi[i], lo[i] + 1)
+        bx, by = xf[start:end], yf[start:end]
+        cx, cy = mean_x[i + 1], mean_y[i + 1]
+        area = np.abs((xf[a] - cx) * (by - yf[a]) - (xf[a] - bx) * (cy - yf[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+def downsample(x, y, max_points: Optional[int] = DEFAULT_MAX_POINTS, method: str = "minmax") -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce (x, y) to roughly max_points points for plotting.
+
+    Series already within budget (or max_points=None) are returned unchanged.
+
+    Args:
+        x: Sorted x values (numeric or datetime64).
+        y: Values to plot.
+        max_points: Point budget per trace; None disables decimation.
+        method: 'minmax' (keeps extremes, best for spiky spreads) or 'lttb'
+            (keeps visual shape, best for smooth curves).
+    """
+    x, y = np.asarray(x), np.asarray(y)
+    if max_points is None or len(x) <= max_points:
+        return x, y
+    if method == "minmax":
+        idx = minmax_indices(x, y, max(1, (max_points - 2) // 2))
+    elif method == "lttb":
+        idx = lttb_indices(x, y, max_points)
+    else:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    return x[idx], y[idx]
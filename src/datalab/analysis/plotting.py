@@ -1,11 +1,18 @@
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+import numpy as np
 import pandas as pd
+from typing import Optional
 from datalab.backtest.engine import BacktestResult
+from datalab.backtest.metrics import drawdown_series
+from datalab.analysis.downsample import downsample, DEFAULT_MAX_POINTS
 
-def plot_backtest_results(result: BacktestResult, output_path: str):
+def plot_backtest_results(result: BacktestResult, output_path: str, max_points: Optional[int] = DEFAULT_MAX_POINTS):
     """
     Generate interactive HTML report for backtest results with comprehensive statistics.
+
+    Curves longer than max_points are decimated (LTTB for value, min/max for
+    drawdown so the deepest troughs survive); pass None to embed every point.
     """
     # Create layout with 3 rows: Metrics Table, Portfolio Value, Drawdown
     fig = make_subplots(
@@ -71,19 +78,22 @@ def plot_backtest_results(result: BacktestResult, output_path: str):
     )
 
     # --- Row 2: Portfolio Value ---
+    steps = np.arange(len(result.daily_values))
+    x, y = downsample(steps, result.daily_values, max_points, method="lttb")
     fig.add_trace(
-        go.Scatter(y=result.daily_values, mode='lines', name='Portfolio Value', line=dict(color='blue')), 
+        go.Scatter(x=x, y=y, mode='lines', name='Portfolio Value', line=dict(color='blue')), 
         row=2, col=1
     )
     
     # --- Row 3: Drawdown ---
-    # Recompute drawdown series for plotting
-    values = pd.Series(result.daily_values)
-    peak = values.cummax()
-    drawdown = (values - peak) / peak
+    # Stored by the engine; recomputed only for results built without it
+    drawdown = result.drawdown
+    if len(drawdown) != len(result.daily_values):
+        drawdown = drawdown_series(result.daily_values)
     
+    x, y = downsample(steps, drawdown, max_points, method="minmax")
     fig.add_trace(
-        go.Scatter(y=drawdown, mode='lines', name='Drawdown', fill='tozeroy', line=dict(color='red')), 
+        go.Scatter(x=x, y=y, mode='lines', name='Drawdown', fill='tozeroy', line=dict(color='red')), 
         row=3, col=1
     )
 
@@ -100,15 +110,45 @@ def plot_backtest_results(result: BacktestResult, output_path: str):
 
     fig.write_html(output_path)
 
-def plot_spreads(data: pd.DataFrame, output_path: str):
+def plot_spreads(data: pd.DataFrame, output_path: str, max_points: Optional[int] = DEFAULT_MAX_POINTS):
     """
     Plot spread comparison.
+
+    Each exchange trace is min/max-decimated to max_points so spikes stay visible.
     """
     fig = go.Figure()
     
-    for exchange in data['exchange'].unique():
-        subset = data[data['exchange'] == exchange]
-        fig.add_trace(go.Scatter(x=subset['timestamp'], y=subset['spread_10k'], mode='lines', name=f"{exchange} 10k Spread"))
+    data = data.sort_values('timestamp')
+    for exchange, subset in data.groupby('exchange', sort=False, observed=True):
+        x, y = downsample(subset['timestamp'].to_numpy(), subset['spread_10k'].to_numpy(), max_points)
+        fig.add_trace(go.Scatter(x=x, y=y, mode='lines', name=f"{exchange} 10k Spread"))
 
     fig.update_layout(title="Spread Comparison", xaxis_title="Time", yaxis_title="Spread")
-    fig.write_html(output_path)
\ No newline at end of file
+    fig.write_html(output_path)
+
+def plot_spread_aggregates(aggregates: pd.DataFrame, output_path: str, value_column: str = "spread_10k",
+                           max_points: Optional[int] = DEFAULT_MAX_POINTS):
+    """
+    Plot time-bucketed spread aggregates (see SpreadAggregator.result).
+
+    Draws the bucket mean per exchange/symbol; max and p99 traces can be
+    toggled from the legend so spikes stay visible. Traces are min/max-decimated
+    to max_points.
+    """
+    fig = go.Figure()
+    
+    for (exchange, symbol), subset in aggregates.groupby(["exchange", "symbol"], sort=True):
+        label = f"{exchange} {symbol}"
+        ts = subset['timestamp'].to_numpy()
+        x, y = downsample(ts, subset['mean'].to_numpy(), max_points)
+        fig.add_trace(go.Scatter(x=x, y=y, mode='lines', name=f"{label} mean"))
+        x, y = downsample(ts, subset['max'].to_numpy(), max_points)
+        fig.add_trace(go.Scatter(x=x, y=y, mode='lines', name=f"{label} max",
+                                 line=dict(dash='dot'), visible='legendonly'))
+        if 'p99' in subset:
+            x, y = downsample(ts, subset['p99'].to_numpy(), max_points)
+            fig.add_trace(go.Scatter(x=x, y=y, mode='lines', name=f"{label} p99",
+                                     line=dict(dash='dash'), visible='legendonly'))
+
+    fig.update_layout(title=f"Spread Comparison ({value_column})", xaxis_title="Time", yaxis_title="Spread")
+    fig.write_html(output_path)
@@ -0,0 +1,161 @@
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from datalab.utils.storage import TimeLike, iter_tick_batches
+
+SIDES = ("bid", "ask")
+OHLC = ("open", "high", "low", "close")
+TICK_COLUMNS = ["timestamp", "bid_price", "ask_price"]
+
+Partial = Dict[str, np.ndarray]
+
+class MixedExchangesError(ValueError):
+    """The asset was collected on several exchanges and none was chosen."""
+
+def _run_starts(keys: np.ndarray) -> np.ndarray:
+    """First index of every run of equal values in a sorted array."""
+    return np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+
+def _ticks_to_partial(ts: np.ndarray, bid: np.ndarray, ask: np.ndarray, step: int) -> Partial:
+    """OHLC per bucket for one batch of ticks."""
+    if len(ts) > 1 and not (ts[1:] >= ts[:-1]).all():
+        # One stable argsort on time orders both the buckets and the ticks inside them
+        order = np.argsort(ts, kind="stable")
+        ts, bid, ask = ts[order], bid[order], ask[order]
+    bucket = ts // step
+    starts = _run_starts(bucket)
+    ends = np.r_[starts[1:], len(ts)] - 1
+    out = {
+        "bucket": bucket[starts],
+        "first_ts": ts[starts],
+        "last_ts": ts[ends],
+        "ticks": np.diff(np.r_[starts, len(ts)]),
+    }
+    for side, prices in (("bid", bid), ("ask", ask)):
+        out[f"{side}_open"] = prices[starts]
+        out[f"{side}_high"] = np.maximum.reduceat(prices, starts)
+        out[f"{side}_low"] = np.minimum.reduceat(prices, starts)
+        out[f"{side}_close"] = prices[ends]
+    return out
+
+def _merge_partials(partials: List[Partial]) -> Partial:
+    """Combine per-batch partials; buckets split across batches or files are merged."""
+    rows = {name: np.concatenate([p[name] for p in partials]) for name in partials[0]}
+    bucket = rows["bucket"]
+    if len(bucket) < 2 or (bucket[1:] > bucket[:-1]).all():
+        # Batches arrived in time order with no shared buckets
+        return rows
+
+    # Open: earliest first_ts per bucket; close: latest last_ts per bucket
+    by_first = np.lexsort((rows["first_ts"], bucket))
+    by_last = np.lexsort((rows["last_ts"], bucket))
+    sorted_bucket = bucket[by_first]
+    starts = _run_starts(sorted_bucket)
+    ends = np.r_[starts[1:], len(sorted_bucket)] - 1
+    out = {
+        "bucket": sorted_bucket[starts],
+        "first_ts": rows["first_ts"][by_first][starts],
+        "last_ts": rows["last_ts"][by_last][ends],
+        "ticks": np.add.reduceat(rows["ticks"][by_first], starts),
+    }
+    for side in SIDES:
+        out[f"{side}_open"] = rows[f"{side}_open"][by_first][starts]
+        out[f"{side}_high"] = np.maximum.reduceat(rows[f"{side}_high"][by_first], starts)
+        out[f"{side}_low"] = np.minimum.reduceat(rows[f"{side}_low"][by_first], starts)
+        out[f"{side}_close"] = rows[f"{side}_close"][by_last][ends]
+    return out
+
+def resample_ticks(batches: Iterable[pa.RecordBatch], freq: str) -> pd.DataFrame:
+    """
+    Aggregate tick batches into fixed-width bid/ask OHLC bars in one pass.
+
+    Each batch is reduced with NumPy (sort only if out of order, then
+    reduceat per bucket) and the small per-batch partials are merged at the
+    end, so memory is bounded by the batch size and the bar count. Buckets are
+    aligned to the epoch; buckets without ticks produce no bar.
+
+    Returns:
+        DataFrame with timestamp (bar start), bid/ask open/high/low/close,
+        ticks, and bid_price/ask_price (the closing quotes used by the engine).
+    """
+    step = pd.Timedelta(freq).value
+    if step <= 0:
+        raise ValueError(f"Bar frequency must be positive: {freq}")
+
+    partials = []
+    for batch in batches:
+        if batch.num_rows == 0:
+            continue
+        ts = batch.column("timestamp")
+        if pa.types.is_timestamp(ts.type):
+            ts = pc.cast(ts, pa.int64())
+        partials.append(_ticks_to_partial(
+            ts.to_numpy(),
+            batch.column("bid_price").to_numpy(zero_copy_only=False),
+            batch.column("ask_price").to_numpy(zero_copy_only=False),
+            step,
+        ))
+
+    columns = ["timestamp"] + [f"{side}_{agg}" for side in SIDES for agg in OHLC] + ["ticks", "bid_price", "ask_price"]
+    if not partials:
+        return pd.DataFrame(columns=columns)
+
+    bars = _merge_partials(partials)
+    data = {"timestamp": (bars["bucket"] * step).view("datetime64[ns]")}
+    for side in SIDES:
+        for agg in OHLC:
+            data[f"{side}_{agg}"] = bars[f"{side}_{agg}"]
+    data["ticks"] = bars["ticks"]
+    data["bid_price"] = bars["bid_close"]
+    data["ask_price"] = bars["ask_close"]
+    return pd.DataFrame(data, columns=columns)
+
+def load_bars(
+    path: str,
+    asset: str,
+    freq: str = "1D",
+    start: Optional[TimeLike] = None,
+    end: Optional[TimeLike] = None,
+    exchange: Optional[str] = None,
+    batch_size: int = 1 << 20,
+) -> pd.DataFrame:
+    """
+    Build backtest bars for one asset from collected ticks.
+
+    Only timestamp/bid/ask are read, and partition plus row-group pruning
+    skips other symbols, exchanges and dates.
+
+    Args:
+        path: Collected dataset root (or a parquet file).
+        asset: Symbol as stored by the collector (e.g. BTC-USD).
+        freq: Bar width as a pandas offset string (e.g. 1min, 1h, 1D).
+        start: Inclusive start time.
+        end: Exclusive end time.
+        exchange: Venue to use; required when the asset was collected on several
+            (MixedExchangesError otherwise).
+        batch_size: Rows per streamed record batch.
+    """
+    columns = TICK_COLUMNS if exchange is not None else TICK_COLUMNS + ["exchange"]
+    batches = iter_tick_batches(
+        path,
+        exchanges=[exchange] if exchange is not None else None,
+        symbols=[asset],
+        start=start,
+        end=end,
+        columns=columns,
+        batch_size=batch_size,
+    )
+    if exchange is None:
+        batches = _single_exchange(batches, asset)
+    return resample_ticks(batches, freq)
+
+def _single_exchange(batches: Iterable[pa.RecordBatch], asset: str) -> Iterable[pa.RecordBatch]:
+    # Quotes from different venues must not be mixed into one bar series
+    seen = set()
+    for batch in batches:
+        seen.update(v for v in pc.unique(batch.column("exchange")).to_pylist() if v is not None)
+        if len(seen) > 1:
+            raise MixedExchangesError(f"{asset} was collected on several exchanges ({', '.join(sorted(seen))}); choose one")
+        yield batch
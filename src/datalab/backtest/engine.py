@@ -1,16 +1,14 @@
 from dataclasses import dataclass, field
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 import pandas as pd
 import numpy as np
-from datalab.strategy.base import BaseDCAStrategy
+from datalab.backtest.metrics import METRIC_NAMES, compute_metrics, periods_per_year
+from datalab.backtest.trades import Trade, TradeLog
+from datalab.strategy.base import BaseDCAStrategy, timestamps_ns
+from datalab.strategy.indicators import compute_indicators
 
-@dataclass
-class Trade:
-    date: pd.Timestamp
-    amount: float
-    price: float
-    fee: float
-    asset_amount: float
+# (total_invested, total_fees, trades, portfolio value per bar) of one simulated run
+Run = Tuple[float, float, TradeLog, np.ndarray]
 
 @dataclass
 class BacktestResult:
@@ -30,22 +28,59 @@ class BacktestResult:
     best_day: float
     worst_day: float
     value_at_risk: float
-    history: List[Trade]
-    daily_values: List[float] = field(default_factory=list)
+    history: TradeLog
+    daily_values: np.ndarray = field(default_factory=lambda: np.empty(0))
+    # (value - running peak) / running peak per bar, for plotting
+    drawdown: np.ndarray = field(default_factory=lambda: np.empty(0))
 
 class BacktestEngine:
     def __init__(self, initial_capital: float = 10000.0, commission_rate: float = 0.001):
         self.initial_capital = initial_capital
         self.commission_rate = commission_rate
 
-    def run(self, strategy: BaseDCAStrategy, data: pd.DataFrame) -> BacktestResult:
-        cash = self.initial_capital
-        holdings = 0.0
-        total_invested = 0.0
-        total_fees = 0.0
-        history = []
-        portfolio_values = []
-        
+    def run(self, strategy: BaseDCAStrategy, data: pd.DataFrame, vectorized: bool = False,
+            indicators: Optional[Dict[str, np.ndarray]] = None) -> BacktestResult:
+        """
+        Run a backtest of strategy over data.
+
+        The per-row loop is the reference implementation. With vectorized=True
+        the engine uses strategy.generate_signals() and computes fills, fees,
+        holdings and mark-to-market with NumPy cumulative operations; results
+        are identical. Strategies without a vectorized hook fall back to the loop.
+
+        Indicators declared by strategy.indicators() are computed once per run
+        and shared by both paths, unless precomputed arrays (aligned with data
+        sorted by timestamp, e.g. from the feature cache) are passed in.
+
+        Volatility, Sharpe and Sortino are annualized from the median bar
+        spacing (252 periods per year for daily bars).
+        """
+        data = self._prepare(data)
+        run = self._simulate(strategy, data, vectorized, indicators)
+        metrics = compute_metrics(run[3], self.initial_capital, self._years(data), periods_per_year(timestamps_ns(data)))
+        return self._build_result(strategy, run, metrics)
+
+    def run_batch(self, strategies: Sequence[BaseDCAStrategy], data: pd.DataFrame,
+                  indicators: Optional[Dict[str, np.ndarray]] = None) -> List[BacktestResult]:
+        """
+        Run several strategies over the same data with the vectorized path.
+
+        The equity curves are stacked into one (runs, bars) array and all
+        metrics are computed in a single batched pass, which is what makes
+        large parameter sweeps cheap. Results equal run(..., vectorized=True).
+        """
+        data = self._prepare(data)
+        runs = [self._simulate(strategy, data, True, indicators) for strategy in strategies]
+        if not runs:
+            return []
+        metrics = compute_metrics(np.stack([run[3] for run in runs]), self.initial_capital, self._years(data),
+                                  periods_per_year(timestamps_ns(data)))
+        return [
+            self._build_result(strategy, run, {name: values[i] for name, values in metrics.items()})
+            for i, (strategy, run) in enumerate(zip(strategies, runs))
+        ]
+
+    def _prepare(self, data: pd.DataFrame) -> pd.DataFrame:
         # Ensure sorting
         if 'timestamp' not in data.columns:
              if isinstance(data.index, pd.DatetimeIndex):
@@ -53,14 +88,43 @@ class BacktestEngine:
              else:
                  raise ValueError("Data must have timestamp column")
                  
-        data = data.sort_values("timestamp")
+        return data.sort_values("timestamp", kind="stable")
+
+    def _simulate(self, strategy: BaseDCAStrategy, data: pd.DataFrame, vectorized: bool,
+                  indicators: Optional[Dict[str, np.ndarray]]) -> Run:
+        if indicators is None:
+            indicators = compute_indicators(strategy.indicators(), data)
+
+        if vectorized:
+            signals = strategy.generate_signals(data, indicators)
+            if signals is not None:
+                return self._run_vectorized(data, *signals)
+        return self._run_loop(strategy, data, indicators)
+
+    @staticmethod
+    def _years(data: pd.DataFrame) -> float:
+        if data.empty:
+            return 0
+        days = (data["timestamp"].iloc[-1] - data["timestamp"].iloc[0]).days
+        return days / 365.25 if days > 0 else 0
+
+    def _run_loop(self, strategy: BaseDCAStrategy, data: pd.DataFrame,
+                  indicator_values: Dict[str, np.ndarray]) -> Run:
+        cash = self.initial_capital
+        holdings = 0.0
+        total_invested = 0.0
+        total_fees = 0.0
+        trades = []
+        portfolio_values = []
         
-        for _, row in data.iterrows():
+        names = list(indicator_values)
+        columns = [indicator_values[name] for name in names]
+        for i, (_, row) in enumerate(data.iterrows()):
             date = row["timestamp"]
             price = row["ask_price"] # Buy price
             
             # Strategy Decision
-            indicators = {} 
+            indicators = {name: float(values[i]) for name, values in zip(names, columns)}
             
             if strategy.should_invest(date, price, indicators):
                 amount = strategy.get_investment_amount(date, cash)
@@ -74,86 +138,73 @@ class BacktestEngine:
                     total_invested += amount
                     total_fees += fee
                     
-                    history.append(Trade(date, amount, price, fee, asset_bought))
+                    trades.append(Trade(date, amount, price, fee, asset_bought))
             
             # Mark to market
             valuation_price = row["bid_price"]
             current_val = cash + (holdings * valuation_price)
             portfolio_values.append(current_val)
 
-        final_value = portfolio_values[-1] if portfolio_values else self.initial_capital
-        net_profit = final_value - self.initial_capital
-        return_pct = (net_profit / self.initial_capital) * 100.0
-        
-        # Metrics Calculation
-        series = pd.Series(portfolio_values)
-        returns = series.pct_change().dropna()
-        
-        days = (data["timestamp"].iloc[-1] - data["timestamp"].iloc[0]).days
-        years = days / 365.25 if days > 0 else 0
+        history = TradeLog.from_trades(trades)
+        return total_invested, total_fees, history, np.asarray(portfolio_values, dtype=np.float64)
 
-        # CAGR
-        if years > 0 and final_value > 0 and self.initial_capital > 0:
-            cagr = (final_value / self.initial_capital) ** (1 / years) - 1
-        else:
-            cagr = 0.0
+    def _run_vectorized(self, data: pd.DataFrame, signals: np.ndarray,
+                        amounts: np.ndarray) -> Run:
+        asks = data["ask_price"].to_numpy(dtype=np.float64)
+        bids = data["bid_price"].to_numpy(dtype=np.float64)
+        n = len(data)
 
-        # Volatility (Annualized)
-        volatility = returns.std() * np.sqrt(252) if len(returns) > 1 else 0.0
+        idx = np.flatnonzero(np.asarray(signals, dtype=bool))
+        spent = np.asarray(amounts, dtype=np.float64)[idx]
+        keep = spent > 0
+        idx, spent = idx[keep], spent[keep]
 
-        # Max Drawdown
-        max_dd = self._compute_drawdown(portfolio_values)
+        # Cash before each trade, accumulated in the same order as the loop (cash -= amount)
+        cash_path = np.cumsum(np.concatenate(([self.initial_capital], -spent)))
+        short = np.flatnonzero(cash_path[:-1] < spent)
+        if len(short):
+            # First trade that exceeds cash takes whatever is left, later ones get nothing
+            k = short[0]
+            spent[k] = max(cash_path[k], 0.0)
+            spent[k + 1:] = 0.0
+            keep = spent > 0
+            idx, spent = idx[keep], spent[keep]
 
-        # Sharpe Ratio (Risk Free Rate assumed 0 for simplicity)
-        sharpe = (returns.mean() / returns.std() * np.sqrt(252)) if returns.std() != 0 else 0.0
+        fees = spent * self.commission_rate
+        asset_bought = (spent - fees) / asks[idx]
 
-        # Sortino Ratio
-        downside_returns = returns[returns < 0]
-        downside_std = downside_returns.std() * np.sqrt(252)
-        sortino = (returns.mean() * 252) / downside_std if downside_std != 0 else 0.0
+        spent_rows = np.zeros(n)
+        spent_rows[idx] = spent
+        bought_rows = np.zeros(n)
+        bought_rows[idx] = asset_bought
 
-        # Calmar Ratio
-        calmar = (cagr / max_dd) if max_dd > 0 else 0.0
+        cash = np.cumsum(np.concatenate(([self.initial_capital], -spent_rows)))[1:]
+        holdings = np.cumsum(bought_rows)
+        portfolio_values = cash + holdings * bids
 
-        # Win Rate (Daily)
-        win_rate = (len(returns[returns > 0]) / len(returns)) * 100 if len(returns) > 0 else 0.0
+        history = TradeLog.from_columns(timestamps_ns(data)[idx], spent, asks[idx], fees, asset_bought,
+                                        tz=_timezone(data))
+        total_invested = float(np.cumsum(spent)[-1]) if len(spent) else 0.0
+        total_fees = float(np.cumsum(fees)[-1]) if len(fees) else 0.0
 
-        # Best/Worst Day
-        best_day = returns.max() * 100 if len(returns) > 0 else 0.0
-        worst_day = returns.min() * 100 if len(returns) > 0 else 0.0
-        
-        # Value at Risk (95% confidence)
-        var_95 = np.percentile(returns, 5) * 100 if len(returns) > 0 else 0.0
+        return total_invested, total_fees, history, portfolio_values
 
+    def _build_result(self, strategy: BaseDCAStrategy, run: Run,
+                      metrics: Dict[str, Any]) -> BacktestResult:
+        total_invested, total_fees, history, portfolio_values = run
+        final_value = float(metrics["final_value"])
         return BacktestResult(
             strategy_name=strategy.__class__.__name__,
             total_invested=total_invested,
             final_value=final_value,
             total_fees=total_fees,
-            net_profit=net_profit,
-            return_pct=return_pct,
-            cagr=cagr * 100,
-            volatility=volatility * 100,
-            sharpe_ratio=sharpe,
-            sortino_ratio=sortino,
-            calmar_ratio=calmar,
-            max_drawdown=max_dd * 100,
-            win_rate=win_rate,
-            best_day=best_day,
-            worst_day=worst_day,
-            value_at_risk=var_95,
+            net_profit=final_value - self.initial_capital,
+            **{name: float(metrics[name]) for name in METRIC_NAMES if name != "final_value"},
             history=history,
-            daily_values=portfolio_values
+            daily_values=portfolio_values,
+            drawdown=metrics["drawdown"],
         )
 
-    def _compute_drawdown(self, values: List[float]) -> float:
-        if not values: return 0.0
-        peak = values[0]
-        max_dd = 0.0
-        for v in values:
-            if v > peak:
-                peak = v
-            dd = (peak - v) / peak
-            if dd > max_dd:
-                max_dd = dd
-        return max_dd
+def _timezone(data: pd.DataFrame) -> Optional[str]:
+    tz = getattr(data["timestamp"].dtype, "tz", None)
+    return str(tz) if tz is not None else None
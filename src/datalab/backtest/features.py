@@ -0,0 +1,191 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Callable, Dict, Mapping, Optional, Sequence, Tuple
+from urllib.parse import quote
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from datalab.strategy.indicators import Indicator, compute_indicators
+
+logger = logging.getLogger(__name__)
+
+# Indicator columns are stored next to the bars under this prefix
+INDICATOR_PREFIX = "ind:"
+
+def dataset_fingerprint(path: Optional[str], symbols: Optional[Sequence[str]] = None) -> str:
+    """
+    Fingerprint the parquet files a backtest input is built from.
+
+    Hashes the relative path, size and mtime of every visible parquet file
+    (restricted to symbol=<s> partitions when symbols are given), so any
+    flush, compaction or deletion under the dataset changes the result.
+    Returns 'none' when there is no source path.
+    """
+    if not path:
+        return "none"
+    digest = hashlib.sha1()
+    if os.path.isfile(path):
+        entries = [(os.path.basename(path), os.stat(path))]
+    else:
+        # Partition directories hold URI-encoded values (see storage._partition_dir)
+        wanted = {f"symbol={quote(str(s), safe='')}" for s in symbols} if symbols else None
+        entries = []
+        for directory, dirnames, filenames in os.walk(path):
+            dirnames[:] = sorted(
+                d for d in dirnames
+                if not d.startswith(("_", ".")) and (wanted is None or not d.startswith("symbol=") or d in wanted)
+            )
+            for name in sorted(filenames):
+                if name.endswith(".parquet") and not name.startswith(("_", ".")):
+                    full = os.path.join(directory, name)
+                    entries.append((os.path.relpath(full, path), os.stat(full)))
+    for rel, st in entries:
+        digest.update(f"{rel}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+def indicator_spec(indicators: Mapping[str, Indicator]) -> Dict[str, Any]:
+    """Stable, JSON-serializable description of named indicators (class plus parameters)."""
+    spec = {}
+    for name, indicator in sorted(indicators.items()):
+        params = {k: v for k, v in sorted(vars(indicator).items()) if not k.startswith("_")}
+        spec[name] = [type(indicator).__name__, params]
+    return spec
+
+class FeatureCache:
+    """
+    On-disk cache of backtest inputs (bars plus indicator columns).
+
+    Entries are uncompressed Arrow IPC (Feather v2) files read through a
+    memory map, so a hit costs a few milliseconds regardless of size. Keys are
+    hashes of the entry's parts (asset, source fingerprint, frequency, range,
+    indicator spec); a change in any part simply misses and leaves the old
+    entry to age out. Entries are evicted least-recently-used once the cache
+    exceeds max_bytes (file mtime records the last use).
+
+    Args:
+        root: Cache directory.
+        max_bytes: Disk budget for all entries.
+    """
+    def __init__(self, root: str, max_bytes: int = 2 * 1024**3):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def key(**parts: Any) -> str:
+        return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.arrow")
+
+    def get(self, key: str) -> Optional[pa.Table]:
+        path = self._path(key)
+        try:
+            source = pa.memory_map(path, "r")
+            table = pa.ipc.open_file(source).read_all()
+        except (FileNotFoundError, pa.ArrowInvalid):
+            return None
+        # Mark as recently used
+        os.utime(path)
+        return table
+
+    def put(self, key: str, table: pa.Table, metadata: Optional[Dict[str, Any]] = None):
+        if metadata:
+            table = table.replace_schema_metadata({"datalab.cache": json.dumps(metadata, sort_keys=True, default=str)})
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+        self.evict(keep=key)
+
+    def evict(self, keep: Optional[str] = None):
+        """Delete least-recently-used entries until the cache fits max_bytes."""
+        entries = []
+        for name in os.listdir(self.root):
+            if name.endswith(".arrow"):
+                full = os.path.join(self.root, name)
+                try:
+                    st = os.stat(full)
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime_ns, st.st_size, full))
+        total = sum(size for _, size, _ in entries)
+        keep_path = self._path(keep) if keep else None
+        for _, size, full in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if full == keep_path:
+                continue
+            try:
+                os.remove(full)
+                total -= size
+                logger.info(f"Evicted feature cache entry {os.path.basename(full)}")
+            except OSError as e:
+                logger.debug(f"Could not evict {full}: {e}")
+
+    def clear(self):
+        for name in os.listdir(self.root):
+            if name.endswith(".arrow"):
+                os.remove(os.path.join(self.root, name))
+
+def load_features(
+    build_bars: Callable[[], pd.DataFrame],
+    asset: str,
+    freq: str,
+    start: Any,
+    end: Any,
+    indicators: Mapping[str, Indicator],
+    source: Optional[str] = None,
+    cache: Optional[FeatureCache] = None,
+    exchange: Optional[str] = None,
+) -> Tuple[pd.DataFrame, Dict[str, np.ndarray]]:
+    """
+    Return backtest bars and their indicator arrays, from the cache when possible.
+
+    On a miss, build_bars() produces the bars, the indicators are computed
+    once and both are stored together. The key covers the asset, exchange,
+    the source dataset fingerprint, frequency, time range and indicator spec,
+    so new collected data invalidates the entry automatically.
+
+    Args:
+        build_bars: Callable returning the bars (must include 'timestamp').
+        asset: Asset symbol, as stored in the dataset's symbol partitions.
+        freq: Bar frequency label.
+        start: Range start (part of the key).
+        end: Range end (part of the key).
+        indicators: Named indicators to precompute.
+        source: Collected dataset path the bars are built from (fingerprinted).
+        cache: Feature cache; None disables caching.
+        exchange: Venue the bars are restricted to (part of the key).
+    """
+    parts = {
+        "asset": asset,
+        "exchange": exchange,
+        "source": dataset_fingerprint(source, [asset]),
+        "freq": freq,
+        "start": start,
+        "end": end,
+        "indicators": indicator_spec(indicators),
+    }
+    key = FeatureCache.key(**parts) if cache is not None else None
+    table = cache.get(key) if cache is not None else None
+
+    if table is None:
+        bars = build_bars().sort_values("timestamp").reset_index(drop=True)
+        values = compute_indicators(indicators, bars)
+        if cache is not None:
+            columns = {name: bars[name].to_numpy() for name in bars.columns}
+            columns.update({INDICATOR_PREFIX + name: arr for name, arr in values.items()})
+            cache.put(key, pa.table(columns), metadata=parts)
+        return bars, values
+
+    bars = table.drop([n for n in table.column_names if n.startswith(INDICATOR_PREFIX)]).to_pandas()
+    values = {
+        name[len(INDICATOR_PREFIX):]: table.column(name).to_numpy()
+        for name in table.column_names if name.startswith(INDICATOR_PREFIX)
+    }
+    return bars, values
@@ -0,0 +1,132 @@
+import warnings
+from typing import Dict, Union
+import numpy as np
+
+TRADING_DAYS = 252
+NS_PER_DAY = 86_400 * 10**9
+
+# Scalar metrics returned by compute_metrics, in BacktestResult units
+METRIC_NAMES = (
+    "final_value", "return_pct", "cagr", "volatility", "sharpe_ratio", "sortino_ratio",
+    "calmar_ratio", "max_drawdown", "win_rate", "best_day", "worst_day", "value_at_risk",
+)
+
+def _masked_std(values: np.ndarray, mask: np.ndarray, count: np.ndarray) -> np.ndarray:
+    # Sample std (ddof=1) of the masked entries of each row; NaN with fewer than 2
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(mask, values, 0.0).sum(axis=-1) / count
+        sq = np.where(mask, (values - mean[..., None]) ** 2, 0.0).sum(axis=-1)
+        return np.where(count > 1, np.sqrt(sq / (count - 1)), np.nan)
+
+def drawdown_series(values: np.ndarray) -> np.ndarray:
+    """(value - running peak) / running peak along the last axis (0 at new highs, negative below)."""
+    values = np.asarray(values, dtype=np.float64)
+    peak = np.maximum.accumulate(values, axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (values - peak) / peak
+
+def periods_per_year(timestamps: np.ndarray) -> float:
+    """
+    Annualization factor for samples spaced like timestamps (int64 ns).
+
+    Keeps the daily convention of TRADING_DAYS per year and scales it by the
+    median sample spacing, so daily bars give 252 and hourly bars 252 * 24.
+    """
+    steps = np.diff(np.asarray(timestamps, dtype=np.int64))
+    steps = steps[steps > 0]
+    if len(steps) == 0:
+        return float(TRADING_DAYS)
+    return TRADING_DAYS * NS_PER_DAY / float(np.median(steps))
+
+def compute_metrics(values: np.ndarray, initial_capital: Union[float, np.ndarray], years: float,
+                    periods: float = TRADING_DAYS) -> Dict[str, Union[float, np.ndarray]]:
+    """
+    Performance metrics of one or many equity curves in a single vectorized pass.
+
+    Args:
+        values: Portfolio values per bar, shape (T,) or (runs, T).
+        initial_capital: Starting capital of every run (or one per run).
+        years: Length of the backtest in years (0 disables CAGR).
+        periods: Samples per year used to annualize volatility, Sharpe and
+            Sortino (see periods_per_year).
+
+    Returns:
+        Every name in METRIC_NAMES (percentages where BacktestResult uses
+        them) plus 'drawdown', the drawdown series with the shape of values.
+        Metrics are floats for 1-D input and arrays of length runs for 2-D.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    single = values.ndim == 1
+    curves = values[None, :] if single else values
+    runs, length = curves.shape
+    initial = np.broadcast_to(np.asarray(initial_capital, dtype=np.float64), (runs,))
+
+    final_value = curves[:, -1] if length else initial.copy()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return_pct = (final_value - initial) / initial * 100.0
+
+    # Bar-to-bar returns (NaN returns, e.g. 0/0, are dropped like pct_change().dropna())
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns = curves[:, 1:] / curves[:, :-1] - 1.0
+    valid = ~np.isnan(returns)
+    n = valid.sum(axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(valid, returns, 0.0).sum(axis=-1) / n
+    std = _masked_std(returns, valid, n)
+
+    if years > 0:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            growth = np.maximum(final_value, 0) / np.where(initial > 0, initial, 1.0)
+            cagr = np.where((final_value > 0) & (initial > 0), growth ** (1 / years) - 1, 0.0)
+    else:
+        cagr = np.zeros(runs)
+
+    volatility = np.where(n > 1, std * np.sqrt(periods), 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # A NaN std (fewer than 2 returns) propagates, as with the pandas reference
+        sharpe = np.where(std != 0, mean / std * np.sqrt(periods), 0.0)
+
+        down = valid & (returns < 0)
+        downside_std = _masked_std(returns, down, down.sum(axis=-1)) * np.sqrt(periods)
+        sortino = np.where(downside_std != 0, mean * periods / downside_std, 0.0)
+
+    drawdown = drawdown_series(curves)
+    # + 0.0 normalizes -0.0 from negating a flat curve
+    max_dd = np.nanmax(-drawdown, axis=-1, initial=0.0) + 0.0 if length else np.zeros(runs)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        calmar = np.where(max_dd > 0, cagr / max_dd, 0.0)
+
+    has = n > 0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        win_rate = np.where(has, (valid & (returns > 0)).sum(axis=-1) / n * 100, 0.0)
+    filled = np.where(valid, returns, np.nan)
+    if returns.shape[-1]:
+        with np.errstate(invalid="ignore"), warnings.catch_warnings():
+            # Rows without returns warn in nanmax/nanpercentile; they are masked out below
+            warnings.simplefilter("ignore", RuntimeWarning)
+            best = np.where(has, np.nanmax(filled, axis=-1) * 100, 0.0)
+            worst = np.where(has, np.nanmin(filled, axis=-1) * 100, 0.0)
+            var_95 = np.where(has, np.nanpercentile(filled, 5, axis=-1) * 100, 0.0)
+    else:
+        best = worst = var_95 = np.zeros(runs)
+
+    out = {
+        "final_value": final_value,
+        "return_pct": return_pct,
+        "cagr": cagr * 100,
+        "volatility": volatility * 100,
+        "sharpe_ratio": sharpe,
+        "sortino_ratio": sortino,
+        "calmar_ratio": calmar,
+        "max_drawdown": max_dd * 100,
+        "win_rate": win_rate,
+        "best_day": best,
+        "worst_day": worst,
+        "value_at_risk": var_95,
+    }
+    if single:
+        out = {name: float(v[0]) for name, v in out.items()}
+        out["drawdown"] = drawdown[0]
+    else:
+        out["drawdown"] = drawdown
+    return out
@@ -0,0 +1,274 @@
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+from datalab.backtest.engine import BacktestResult
+from datalab.backtest.metrics import METRIC_NAMES, compute_metrics, periods_per_year
+from datalab.backtest.trades import TRADE_DTYPE, TradeLog
+from datalab.strategy.base import BaseDCAStrategy, period_gate, timestamps_ns
+from datalab.strategy.indicators import compute_indicators
+
+@dataclass
+class PriceMatrix:
+    """Quotes of several assets on one shared, sorted UTC time axis (rows = time, columns = assets)."""
+    timestamps: np.ndarray
+    assets: List[str]
+    bids: np.ndarray
+    asks: np.ndarray
+
+    def frame(self, asset: str) -> pd.DataFrame:
+        """Single-asset view in the layout BacktestEngine and the strategies expect."""
+        i = self.assets.index(asset)
+        return pd.DataFrame({
+            "timestamp": self.timestamps,
+            "bid_price": self.bids[:, i],
+            "ask_price": self.asks[:, i],
+        }, copy=False)
+
+def align_prices(frames: Mapping[str, pd.DataFrame]) -> PriceMatrix:
+    """
+    Align per-asset bid/ask frames onto the union of their timestamps.
+
+    Each asset carries its last quote forward; rows before every asset has
+    quoted are dropped, so the matrix has no gaps.
+
+    Args:
+        frames: Asset -> frame with timestamp, bid_price and ask_price columns
+            (at least one row each).
+    """
+    if not frames:
+        raise ValueError("No assets to align")
+    series = {}
+    for asset, data in frames.items():
+        if data.empty:
+            raise ValueError(f"No prices for {asset}")
+        data = data.sort_values("timestamp", kind="stable")
+        series[asset] = (
+            timestamps_ns(data),
+            data["bid_price"].to_numpy(dtype=np.float64),
+            data["ask_price"].to_numpy(dtype=np.float64),
+        )
+
+    axis = np.unique(np.concatenate([ts for ts, _, _ in series.values()]))
+    axis = axis[axis >= max(ts[0] for ts, _, _ in series.values())]
+
+    bids = np.empty((len(axis), len(series)))
+    asks = np.empty((len(axis), len(series)))
+    for col, (ts, bid, ask) in enumerate(series.values()):
+        # Index of the last quote at or before each row
+        last = np.searchsorted(ts, axis, side="right") - 1
+        bids[:, col] = bid[last]
+        asks[:, col] = ask[last]
+    return PriceMatrix(axis.view("datetime64[ns]"), list(series), bids, asks)
+
+@dataclass
+class PortfolioResult:
+    """Aggregate result plus one result per asset sleeve (sleeve values add up to the portfolio)."""
+    portfolio: BacktestResult
+    assets: Dict[str, BacktestResult]
+
+    def to_frame(self) -> pd.DataFrame:
+        rows = {"portfolio": self.portfolio, **self.assets}
+        return pd.DataFrame(
+            [{"asset": name, **{m: getattr(r, m) for m in ("total_invested", "total_fees") + METRIC_NAMES},
+              "trades": len(r.history)} for name, r in rows.items()]
+        )
+
+class PortfolioEngine:
+    """
+    Backtest one strategy per asset over an aligned price matrix with shared cash.
+
+    Signals come from each strategy's vectorized generate_signals() (or a
+    per-row should_invest() pass). The simulation then visits only rows with
+    a trade or a rebalance, and each visit updates all assets with NumPy
+    operations, so the cost grows with the number of events rather than with
+    assets x rows. Between events, holdings are constant and the valuation is
+    one matrix product.
+
+    When the requested buys of a row exceed the shared cash, every request is
+    scaled down pro rata. Rebalancing sells overweight sleeves at the bid and
+    buys underweight ones at the ask with the proceeds, paying each asset's fee.
+
+    Args:
+        initial_capital: Starting cash shared by all assets.
+        commission_rates: Fee rate for all assets, or a rate per asset.
+    """
+    def __init__(self, initial_capital: float = 10000.0,
+                 commission_rates: Union[float, Mapping[str, float]] = 0.001):
+        self.initial_capital = initial_capital
+        self.commission_rates = commission_rates
+
+    def _fee_rates(self, assets: List[str]) -> np.ndarray:
+        if isinstance(self.commission_rates, Mapping):
+            missing = [a for a in assets if a not in self.commission_rates]
+            if missing:
+                raise ValueError(f"No commission rate for {', '.join(missing)}")
+            return np.array([self.commission_rates[a] for a in assets], dtype=np.float64)
+        return np.full(len(assets), float(self.commission_rates))
+
+    def run(
+        self,
+        strategies: Mapping[str, BaseDCAStrategy],
+        prices: PriceMatrix,
+        weights: Optional[Mapping[str, float]] = None,
+        rebalance_days: Optional[int] = None,
+    ) -> PortfolioResult:
+        """
+        Run the portfolio backtest.
+
+        Args:
+            strategies: Asset -> strategy deciding when and how much to buy.
+            prices: Aligned quotes; must contain every asset in strategies.
+            weights: Target allocation per asset (normalized; default equal).
+                Also splits the initial capital between the per-asset sleeves.
+            rebalance_days: Rebalance holdings to the weights every N days
+                (None disables rebalancing).
+        """
+        assets = list(strategies)
+        missing = [a for a in assets if a not in prices.assets]
+        if missing:
+            raise ValueError(f"No prices for {', '.join(missing)}")
+        cols = [prices.assets.index(a) for a in assets]
+        bids, asks = prices.bids[:, cols], prices.asks[:, cols]
+        ts = prices.timestamps.astype("datetime64[ns]").view(np.int64)
+        n, k = bids.shape
+
+        w = np.array([1.0 if weights is None else weights.get(a, 0.0) for a in assets], dtype=np.float64)
+        if (w < 0).any() or w.sum() <= 0:
+            raise ValueError(f"Weights must be non-negative with a positive sum, got {weights}")
+        w = w / w.sum()
+        fee_rates = self._fee_rates(assets)
+
+        requests = np.zeros((n, k))
+        for col, asset in enumerate(assets):
+            requests[:, col] = self._requests(strategies[asset], prices.frame(asset))
+        buy_rows = requests.any(axis=1)
+        rebalance = np.zeros(n, dtype=bool)
+        if rebalance_days is not None and n:
+            rebalance = period_gate(ts, np.arange(n), rebalance_days)
+        events = np.flatnonzero(buy_rows | rebalance)
+
+        cash = self.initial_capital
+        holdings = np.zeros(k)
+        flows = np.zeros(k)
+        fees = np.zeros(k)
+        cash_after = np.empty(len(events) + 1)
+        holdings_after = np.empty((len(events) + 1, k))
+        flows_after = np.empty((len(events) + 1, k))
+        cash_after[0], holdings_after[0], flows_after[0] = cash, holdings, flows
+        fills = []
+
+        for e, row in enumerate(events, start=1):
+            if buy_rows[row]:
+                spend = requests[row]
+                total = spend.sum()
+                if total > cash:
+                    spend = spend * (max(cash, 0.0) / total)
+                fee = spend * fee_rates
+                qty = (spend - fee) / asks[row]
+                cash -= spend.sum()
+                holdings += qty
+                flows += spend
+                fees += fee
+                fills.append((row, spend, asks[row], fee, qty))
+
+            if rebalance[row]:
+                values = holdings * bids[row]
+                total = values.sum()
+                if total > 0:
+                    gap = w * total - values
+                    sell = np.maximum(-gap, 0.0)
+                    sell_qty = sell / bids[row]
+                    sell_fee = sell * fee_rates
+                    proceeds = sell - sell_fee
+                    need = np.maximum(gap, 0.0)
+                    budget = proceeds.sum()
+                    buy = need * min(1.0, budget / need.sum()) if need.sum() > 0 else need
+                    buy_fee = buy * fee_rates
+                    buy_qty = (buy - buy_fee) / asks[row]
+                    cash += budget - buy.sum()
+                    holdings += buy_qty - sell_qty
+                    flows += buy - proceeds
+                    fees += sell_fee + buy_fee
+                    # Sells are recorded with negative amount and quantity
+                    fills.append((row, -proceeds, bids[row], sell_fee, -sell_qty))
+                    fills.append((row, buy, asks[row], buy_fee, buy_qty))
+
+            cash_after[e], holdings_after[e], flows_after[e] = cash, holdings, flows
+
+        # State in force at every row (0 = before the first event)
+        state = np.searchsorted(events, np.arange(n), side="right")
+        position_values = holdings_after[state] * bids
+        sleeve_values = (self.initial_capital * w - flows_after[state]) + position_values
+        portfolio_values = cash_after[state] + position_values.sum(axis=1)
+
+        curves = np.vstack([portfolio_values[None, :], sleeve_values.T])
+        capital = np.concatenate(([self.initial_capital], self.initial_capital * w))
+        metrics = compute_metrics(curves, capital, self._years(ts), periods_per_year(ts))
+        histories = self._histories(fills, ts, k)
+
+        def result(i: int, name: str, invested: float, fee_total: float, history: TradeLog) -> BacktestResult:
+            final_value = float(metrics["final_value"][i])
+            return BacktestResult(
+                strategy_name=name,
+                total_invested=invested,
+                final_value=final_value,
+                total_fees=fee_total,
+                net_profit=final_value - capital[i],
+                **{m: float(metrics[m][i]) for m in METRIC_NAMES if m != "final_value"},
+                history=history,
+                daily_values=curves[i],
+                drawdown=metrics["drawdown"][i],
+            )
+
+        combined = np.concatenate([h.records for h in histories])
+        combined = combined[np.argsort(combined["date"], kind="stable")]
+        return PortfolioResult(
+            portfolio=result(0, "Portfolio", float(flows.sum()), float(fees.sum()), TradeLog(combined)),
+            assets={
+                asset: result(i + 1, strategies[asset].__class__.__name__, float(flows[i]), float(fees[i]), histories[i])
+                for i, asset in enumerate(assets)
+            },
+        )
+
+    @staticmethod
+    def _requests(strategy: BaseDCAStrategy, data: pd.DataFrame) -> np.ndarray:
+        # Requested buy amount per row (0 = no trade); the engine applies the shared cash limit
+        indicators = compute_indicators(strategy.indicators(), data)
+        signals = strategy.generate_signals(data, indicators)
+        if signals is not None:
+            active, amounts = signals
+            return np.where(np.asarray(active, dtype=bool), np.asarray(amounts, dtype=np.float64), 0.0)
+
+        names = list(indicators)
+        out = np.zeros(len(data))
+        for i, (date, price) in enumerate(zip(data["timestamp"], data["ask_price"])):
+            if strategy.should_invest(date, price, {name: float(indicators[name][i]) for name in names}):
+                out[i] = max(strategy.get_investment_amount(date, np.inf), 0.0)
+        return out
+
+    @staticmethod
+    def _years(ts: np.ndarray) -> float:
+        if len(ts) == 0:
+            return 0
+        days = (pd.Timestamp(int(ts[-1])) - pd.Timestamp(int(ts[0]))).days
+        return days / 365.25 if days > 0 else 0
+
+    @staticmethod
+    def _histories(fills: List[Tuple], ts: np.ndarray, k: int) -> List[TradeLog]:
+        if not fills:
+            return [TradeLog() for _ in range(k)]
+        rows = np.array([row for row, *_ in fills])
+        # (fills, assets) matrices of the recorded vectors
+        amount, price, fee, qty = (np.array([f[j] for f in fills]) for j in range(1, 5))
+        histories = []
+        for col in range(k):
+            traded = amount[:, col] != 0
+            records = np.empty(int(traded.sum()), dtype=TRADE_DTYPE)
+            records["date"] = ts[rows[traded]]
+            records["amount"] = amount[traded, col]
+            records["price"] = price[traded, col]
+            records["fee"] = fee[traded, col]
+            records["asset_amount"] = qty[traded, col]
+            histories.append(TradeLog(records))
+        return histories
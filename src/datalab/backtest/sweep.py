@@ -0,0 +1,145 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+import numpy as np
+import pandas as pd
+from datalab.backtest.engine import BacktestEngine, BacktestResult
+from datalab.strategy.base import BaseDCAStrategy, timestamps_ns
+
+# Scalar BacktestResult fields reported per run (history and the per-bar series are dropped)
+METRIC_FIELDS = [
+    f.name for f in fields(BacktestResult)
+    if f.name not in ("strategy_name", "history", "daily_values", "drawdown")
+]
+
+# Upper bound on runs x bars held as one equity-curve matrix for batched metrics
+BATCH_ELEMENTS = 1 << 22
+
+PRICE_COLUMNS = ("timestamp", "bid_price", "ask_price")
+
+# Per-worker state, populated once by _init_worker
+_worker_data: Optional[pd.DataFrame] = None
+_worker_shm: List[shared_memory.SharedMemory] = []
+_worker_engine: Optional[BacktestEngine] = None
+_worker_strategy: Optional[Type[BaseDCAStrategy]] = None
+
+def expand_grid(grid: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Expand {param: [values]} into the list of all parameter combinations."""
+    keys = list(grid.keys())
+    return [dict(zip(keys, combo)) for combo in itertools.product(*(grid[k] for k in keys))]
+
+def summarize(result: BacktestResult) -> Tuple:
+    """Reduce a BacktestResult to its scalar metrics plus the trade count."""
+    return tuple(float(getattr(result, name)) for name in METRIC_FIELDS) + (len(result.history),)
+
+def _share_columns(data: pd.DataFrame) -> Tuple[List[shared_memory.SharedMemory], List[Tuple[str, str, str, int]]]:
+    blocks = []
+    specs = []
+    columns = {
+        "timestamp": timestamps_ns(data),
+        "bid_price": data["bid_price"].to_numpy(dtype=np.float64),
+        "ask_price": data["ask_price"].to_numpy(dtype=np.float64),
+    }
+    for name, values in columns.items():
+        shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)[:] = values
+        blocks.append(shm)
+        specs.append((name, shm.name, values.dtype.str, len(values)))
+    return blocks, specs
+
+def _attach_columns(specs: List[Tuple[str, str, str, int]]) -> Tuple[List[shared_memory.SharedMemory], pd.DataFrame]:
+    blocks = []
+    columns = {}
+    for name, shm_name, dtype, length in specs:
+        shm = shared_memory.SharedMemory(name=shm_name)
+        blocks.append(shm)
+        values = np.ndarray((length,), dtype=np.dtype(dtype), buffer=shm.buf)
+        if name == "timestamp":
+            values = values.view("datetime64[ns]")
+        columns[name] = values
+    return blocks, pd.DataFrame(columns, copy=False)
+
+def _init_worker(specs, strategy_cls, initial_capital, commission_rate):
+    global _worker_data, _worker_shm, _worker_engine, _worker_strategy
+    _worker_shm, _worker_data = _attach_columns(specs)
+    _worker_engine = BacktestEngine(initial_capital, commission_rate)
+    _worker_strategy = strategy_cls
+
+def _run_batches(engine: BacktestEngine, strategy_cls: Type[BaseDCAStrategy],
+                 combos: List[Dict[str, Any]], data: pd.DataFrame) -> List[Tuple]:
+    # Metrics for as many runs as fit in BATCH_ELEMENTS are computed in one pass
+    size = max(1, BATCH_ELEMENTS // max(len(data), 1))
+    rows = []
+    for i in range(0, len(combos), size):
+        strategies = [strategy_cls(**params) for params in combos[i:i + size]]
+        rows.extend(summarize(result) for result in engine.run_batch(strategies, data))
+    return rows
+
+def _run_chunk(combos: List[Dict[str, Any]]) -> List[Tuple]:
+    return _run_batches(_worker_engine, _worker_strategy, combos, _worker_data)
+
+def run_sweep(
+    data: pd.DataFrame,
+    strategy_cls: Type[BaseDCAStrategy],
+    grid: Dict[str, Sequence[Any]],
+    initial_capital: float = 10000.0,
+    commission_rate: float = 0.001,
+    workers: Optional[int] = None,
+    chunksize: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Backtest every parameter combination in grid and return a metrics table.
+
+    The price columns are copied into shared memory once; each worker process
+    attaches to them at start-up and runs its share of the grid through the
+    vectorized engine path, computing metrics for a whole chunk of runs in
+    one batched pass.
+
+    Args:
+        data: Price frame with timestamp, bid_price and ask_price columns.
+        strategy_cls: Strategy class, instantiated as strategy_cls(**params).
+        grid: Mapping of constructor argument name to candidate values.
+        initial_capital: Starting cash for every run.
+        commission_rate: Fee rate for every run.
+        workers: Process count (default: os.cpu_count()). 1 runs in-process.
+        chunksize: Combinations per task (default: spread evenly, ~4 tasks per worker).
+
+    Returns:
+        DataFrame with one row per combination: parameter columns, scalar
+        BacktestResult metrics and a 'trades' count.
+    """
+    combos = expand_grid(grid)
+    columns = list(grid.keys()) + METRIC_FIELDS + ["trades"]
+    if not combos:
+        return pd.DataFrame(columns=columns)
+
+    data = data.sort_values("timestamp")
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, len(combos))
+
+    if workers == 1:
+        engine = BacktestEngine(initial_capital, commission_rate)
+        rows = _run_batches(engine, strategy_cls, combos, data)
+    else:
+        if chunksize is None:
+            chunksize = max(1, len(combos) // (workers * 4))
+        blocks, specs = _share_columns(data)
+        try:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(specs, strategy_cls, initial_capital, commission_rate),
+            ) as pool:
+                chunks = [combos[i:i + chunksize] for i in range(0, len(combos), chunksize)]
+                rows = [row for chunk in pool.map(_run_chunk, chunks) for row in chunk]
+        finally:
+            for shm in blocks:
+                shm.close()
+                shm.unlink()
+
+    params = pd.DataFrame(combos, columns=list(grid.keys()))
+    metrics = pd.DataFrame(rows, columns=METRIC_FIELDS + ["trades"])
+    return pd.concat([params, metrics], axis=1)
@@ -0,0 +1,378 @@
+import logging
+import time
+from datetime import datetime
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+from datalab.backtest.engine import BacktestResult
+from datalab.backtest.metrics import METRIC_NAMES, NS_PER_DAY, compute_metrics, periods_per_year
+from datalab.backtest.trades import TRADE_DTYPE, TradeLog
+from datalab.strategy.base import BaseDCAStrategy
+from datalab.utils.storage import TimeLike, open_tick_dataset, tick_filter
+
+logger = logging.getLogger(__name__)
+
+# Notionals (quote currency) of the recorded spread_* columns
+DEPTH_NOTIONALS = np.array([10_000.0, 50_000.0, 100_000.0, 500_000.0])
+SPREAD_COLUMNS = ["spread_10k", "spread_50k", "spread_100k", "spread_500k"]
+REPLAY_COLUMNS = ["timestamp", "exchange", "bid_price", "ask_price"] + SPREAD_COLUMNS
+
+def slippage(notional: float, bid: np.ndarray, ask: np.ndarray, spreads: np.ndarray) -> np.ndarray:
+    """
+    Price impact of a market order of the given notional, per venue.
+
+    The recorded effective spread (volume-weighted ask fill minus bid fill)
+    is interpolated linearly in notional between the top-of-book spread at 0
+    and the spread_* columns, and extrapolated from the last segment beyond
+    500k. Half of the extra spread over the top of book is the impact on one
+    side. NaN where the recorded depth did not cover the notional.
+
+    Args:
+        notional: Order size in quote currency.
+        bid: Best bid per venue.
+        ask: Best ask per venue.
+        spreads: Recorded effective spreads per venue, shape (venues, 4).
+    """
+    top = ask - bid
+    x = np.concatenate(([0.0], DEPTH_NOTIONALS))
+    y = np.column_stack([top, spreads])
+    j = min(max(int(np.searchsorted(x, notional)), 1), len(x) - 1)
+    weight = (notional - x[j - 1]) / (x[j] - x[j - 1])
+    spread = y[:, j - 1] + weight * (y[:, j] - y[:, j - 1])
+    return np.maximum(spread - top, 0.0) / 2
+
+@dataclass
+class TickBacktestResult(BacktestResult):
+    # Start of every equity sample (daily_values holds the sampled portfolio values)
+    sample_times: np.ndarray = field(default_factory=lambda: np.empty(0, dtype="datetime64[ns]"))
+    # Venue each trade in history was routed to
+    venues: List[str] = field(default_factory=list)
+    events: int = 0
+    rejected_orders: int = 0
+
+def _row_groups(dataset: ds.Dataset, flt: Optional[ds.Expression]) -> List[Tuple[float, ds.Fragment]]:
+    """Row groups matching flt (pruned by statistics), ordered by their first timestamp."""
+    units = []
+    for fragment in dataset.get_fragments(filter=flt):
+        for unit in fragment.split_by_row_group(filter=flt, schema=dataset.schema):
+            stats = unit.row_groups[0].statistics.get("timestamp") if unit.row_groups else None
+            if not stats:
+                # Without statistics the group may start anywhere; read it first
+                first = -np.inf
+            elif isinstance(stats["min"], datetime):
+                first = pd.Timestamp(stats["min"]).value
+            else:
+                first = stats["min"]
+            units.append((first, unit))
+    units.sort(key=lambda u: u[0])
+    return units
+
+class _Venues:
+    """Latest quote per exchange, carried across chunks."""
+    def __init__(self):
+        self.names: List[str] = []
+        self.codes: Dict[str, int] = {}
+        self.ts = np.empty(0, dtype=np.int64)
+        self.bid = np.empty(0)
+        self.ask = np.empty(0)
+        self.spreads = np.empty((0, len(SPREAD_COLUMNS)))
+
+    def encode(self, column: pa.ChunkedArray) -> np.ndarray:
+        encoded = pc.dictionary_encode(column).combine_chunks()
+        lookup = np.array([self._code(name) for name in encoded.dictionary.to_pylist()], dtype=np.int64)
+        return lookup[encoded.indices.to_numpy(zero_copy_only=False)]
+
+    def _code(self, name: str) -> int:
+        if name not in self.codes:
+            self.codes[name] = len(self.names)
+            self.names.append(name)
+            self.ts = np.append(self.ts, np.iinfo(np.int64).min)
+            self.bid = np.append(self.bid, np.nan)
+            self.ask = np.append(self.ask, np.nan)
+            self.spreads = np.vstack([self.spreads, np.full(len(SPREAD_COLUMNS), np.nan)])
+        return self.codes[name]
+
+class TickBacktester:
+    """
+    Event-driven backtest over collected ticks, replayed in timestamp order across exchanges.
+
+    Parquet row groups are read one at a time in order of their first
+    timestamp and merged, so memory is bounded by the row groups that overlap
+    in time (about one per venue), not by the length of the replay. Ticks are
+    then processed in batches where every step is vectorized except the
+    strategy calls: the strategy is consulted once per decision_interval
+    (at the first tick of each interval, or on every tick when None), with
+    its indicators updated in streaming mode from the best quotes.
+
+    Buys are routed to the venue with the lowest all-in price: the venue's
+    ask plus the slippage implied by its recorded spread_* depth for the
+    order size, plus its fee. Quotes older than max_quote_age are not
+    routed to. Orders no venue can fill are counted as rejected. The
+    portfolio is marked at the best bid and sampled at the end of every
+    sample_freq interval; metrics are annualized from that interval.
+
+    Args:
+        initial_capital: Starting cash.
+        commission_rates: Fee rate for every venue, or a rate per exchange.
+        decision_interval: How often the strategy is consulted (pandas offset), None for every tick.
+        sample_freq: Equity sampling interval.
+        max_quote_age: Oldest quote a venue may have to receive an order.
+        batch_size: Ticks processed per vectorized step.
+    """
+    def __init__(
+        self,
+        initial_capital: float = 10000.0,
+        commission_rates: Union[float, Mapping[str, float]] = 0.001,
+        decision_interval: Optional[str] = "1min",
+        sample_freq: str = "1h",
+        max_quote_age: str = "10s",
+        batch_size: int = 1 << 20,
+    ):
+        self.initial_capital = initial_capital
+        self.commission_rates = commission_rates
+        self.decision_step = pd.Timedelta(decision_interval).value if decision_interval else None
+        self.sample_step = pd.Timedelta(sample_freq).value
+        self.max_quote_age = pd.Timedelta(max_quote_age).value
+        self.batch_size = batch_size
+        if self.sample_step <= 0 or (self.decision_step is not None and self.decision_step <= 0):
+            raise ValueError("decision_interval and sample_freq must be positive")
+
+    def _fee_rate(self, venue: str) -> float:
+        if isinstance(self.commission_rates, Mapping):
+            if venue not in self.commission_rates:
+                raise ValueError(f"No commission rate for {venue}")
+            return float(self.commission_rates[venue])
+        return float(self.commission_rates)
+
+    def run(
+        self,
+        strategy: BaseDCAStrategy,
+        path: str,
+        symbol: str,
+        exchanges: Optional[Sequence[str]] = None,
+        start: Optional[TimeLike] = None,
+        end: Optional[TimeLike] = None,
+    ) -> TickBacktestResult:
+        """
+        Replay the ticks of symbol and trade it with strategy.
+
+        Args:
+            strategy: Strategy consulted at each decision point.
+            path: Collected dataset root (or a parquet file).
+            symbol: Symbol as stored by the collector.
+            exchanges: Venues to replay and route to (default: all).
+            start: Inclusive start time (default: first tick).
+            end: Exclusive end time (default: after the last tick).
+        """
+        indicators = strategy.indicators()
+        for name, indicator in indicators.items():
+            if indicator.source not in ("bid_price", "ask_price"):
+                raise ValueError(f"Indicator {name} reads {indicator.source}; tick replay provides bid_price/ask_price")
+            indicator.reset()
+
+        dataset = open_tick_dataset(path)
+        flt = tick_filter(dataset, exchanges, [symbol], start, end)
+
+        self._strategy = strategy
+        self._indicators = indicators
+        self._venues = _Venues()
+        self._cash = self.initial_capital
+        self._holdings = 0.0
+        self._invested = 0.0
+        self._fees = 0.0
+        self._trades: List[Tuple[int, float, float, float, float]] = []
+        self._trade_venues: List[str] = []
+        self._rejected = 0
+        self._last_decision = None
+        self._sample_buckets: List[int] = []
+        self._sample_values: List[float] = []
+        events = 0
+
+        began = time.perf_counter()
+        units = _row_groups(dataset, flt)
+        pending = None
+        for i, (_, unit) in enumerate(units):
+            table = ds.Scanner.from_fragment(unit, schema=dataset.schema, columns=REPLAY_COLUMNS, filter=flt).to_table()
+            if table.num_rows == 0:
+                continue
+            columns = self._columns(table)
+            pending = columns if pending is None else tuple(np.concatenate(pair) for pair in zip(pending, columns))
+            # Rows before the next row group's first tick can no longer be preceded by unread ticks
+            if i + 1 < len(units):
+                ready = pending[0] < units[i + 1][0]
+                now = tuple(c[ready] for c in pending)
+                pending = tuple(c[~ready] for c in pending)
+            else:
+                now, pending = pending, None
+            events += len(now[0])
+            self._replay_sorted(*now)
+        elapsed = time.perf_counter() - began
+        logger.info(f"Replayed {events} ticks in {elapsed:.2f}s ({events / max(elapsed, 1e-9):,.0f}/s)")
+        return self._result(events)
+
+    def _columns(self, table: pa.Table) -> Tuple[np.ndarray, ...]:
+        ts = pc.cast(table.column("timestamp"), pa.int64()).to_numpy()
+        codes = self._venues.encode(table.column("exchange"))
+        bid = table.column("bid_price").to_numpy()
+        ask = table.column("ask_price").to_numpy()
+        spreads = np.column_stack([table.column(name).to_numpy() for name in SPREAD_COLUMNS])
+        return ts, codes, bid, ask, spreads
+
+    def _replay_sorted(self, ts: np.ndarray, codes: np.ndarray, bid: np.ndarray, ask: np.ndarray, spreads: np.ndarray):
+        if len(ts) > 1 and not (ts[1:] >= ts[:-1]).all():
+            order = np.argsort(ts, kind="stable")
+            ts, codes, bid, ask, spreads = ts[order], codes[order], bid[order], ask[order], spreads[order]
+        for lo in range(0, len(ts), self.batch_size):
+            hi = lo + self.batch_size
+            self._replay(ts[lo:hi], codes[lo:hi], bid[lo:hi], ask[lo:hi], spreads[lo:hi])
+
+    def _replay(self, ts: np.ndarray, codes: np.ndarray, bid: np.ndarray, ask: np.ndarray, spreads: np.ndarray):
+        # One time-ordered batch of ticks; all state carries over to the next batch
+        # Row positions of each venue's ticks, for as-of lookups of the latest quote
+        positions = [np.flatnonzero(codes == code) for code in range(len(self._venues.names))]
+
+        if self.decision_step is None:
+            decisions = np.arange(len(ts))
+        else:
+            bucket = ts // self.decision_step
+            decisions = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+            if self._last_decision is not None:
+                decisions = decisions[bucket[decisions] > self._last_decision]
+            if len(decisions):
+                self._last_decision = int(bucket[decisions[-1]])
+
+        # Cash and holdings before this chunk, then after each of its trades
+        trade_rows = []
+        cash_path = [self._cash]
+        holdings_path = [self._holdings]
+        if len(decisions):
+            q_ts, q_bid, q_ask, q_spreads = self._latest(decisions, positions, ts, bid, ask, spreads)
+            fresh = q_ts >= ts[decisions][None, :] - self.max_quote_age
+            with np.errstate(invalid="ignore"):
+                best_ask = np.where(fresh, q_ask, np.inf).min(axis=0)
+                best_bid = np.where(fresh, q_bid, -np.inf).max(axis=0)
+            for d, row in enumerate(decisions.tolist()):
+                if not np.isfinite(best_ask[d]):
+                    continue
+                if self._decide(int(ts[row]), best_bid[d], best_ask[d], fresh[:, d], q_bid[:, d], q_ask[:, d], q_spreads[:, d]):
+                    trade_rows.append(row)
+                    cash_path.append(self._cash)
+                    holdings_path.append(self._holdings)
+
+        self._sample(ts, positions, bid, ask, spreads, trade_rows, cash_path, holdings_path)
+        self._carry(positions, ts, bid, ask, spreads)
+
+    def _latest(self, rows: np.ndarray, positions: List[np.ndarray], ts: np.ndarray, bid: np.ndarray,
+                ask: np.ndarray, spreads: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """Latest quote of every venue as of each row: (venues, rows) arrays, spreads (venues, rows, 4)."""
+        venues = self._venues
+        k = len(venues.names)
+        q_ts = np.repeat(venues.ts[:, None], len(rows), axis=1)
+        q_bid = np.repeat(venues.bid[:, None], len(rows), axis=1)
+        q_ask = np.repeat(venues.ask[:, None], len(rows), axis=1)
+        q_spreads = np.repeat(venues.spreads[:, None, :], len(rows), axis=1)
+        for code in range(k):
+            pos = positions[code]
+            if not len(pos):
+                continue
+            last = np.searchsorted(pos, rows, side="right") - 1
+            seen = last >= 0
+            src = pos[last[seen]]
+            q_ts[code, seen] = ts[src]
+            q_bid[code, seen] = bid[src]
+            q_ask[code, seen] = ask[src]
+            q_spreads[code, seen] = spreads[src]
+        return q_ts, q_bid, q_ask, q_spreads
+
+    def _decide(self, ts: int, best_bid: float, best_ask: float, fresh: np.ndarray, bids: np.ndarray,
+                asks: np.ndarray, spreads: np.ndarray) -> bool:
+        date = pd.Timestamp(ts)
+        quotes = {"bid_price": best_bid, "ask_price": best_ask}
+        values = {name: indicator.update(quotes[indicator.source]) for name, indicator in self._indicators.items()}
+        if not self._strategy.should_invest(date, best_ask, values):
+            return False
+        amount = self._strategy.get_investment_amount(date, self._cash)
+        if not (amount > 0 and self._cash >= amount):
+            return False
+
+        fee_rates = np.array([self._fee_rate(name) for name in self._venues.names])
+        fills = asks + slippage(amount, bids, asks, spreads)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            all_in = np.where(fresh & np.isfinite(fills), fills / (1 - fee_rates), np.inf)
+        venue = int(np.argmin(all_in))
+        if not np.isfinite(all_in[venue]):
+            self._rejected += 1
+            return False
+
+        fee = amount * fee_rates[venue]
+        quantity = (amount - fee) / fills[venue]
+        self._cash -= amount
+        self._holdings += quantity
+        self._invested += amount
+        self._fees += fee
+        self._trades.append((ts, amount, float(fills[venue]), fee, quantity))
+        self._trade_venues.append(self._venues.names[venue])
+        return True
+
+    def _sample(self, ts: np.ndarray, positions: List[np.ndarray], bid: np.ndarray, ask: np.ndarray,
+                spreads: np.ndarray, trade_rows: List[int], cash_path: List[float], holdings_path: List[float]):
+        # Portfolio value at the last tick of every sample interval in this chunk
+        bucket = ts // self.sample_step
+        rows = np.r_[np.flatnonzero(bucket[1:] != bucket[:-1]), len(ts) - 1]
+        q_ts, q_bid, _, _ = self._latest(rows, positions, ts, bid, ask, spreads)
+        fresh = q_ts >= ts[rows][None, :] - self.max_quote_age
+        with np.errstate(invalid="ignore"):
+            mark = np.where(fresh, q_bid, -np.inf).max(axis=0)
+        # No fresh venue: fall back to the most recent quote
+        newest = q_bid[np.argmax(q_ts, axis=0), np.arange(len(rows))]
+        mark = np.where(np.isfinite(mark), mark, newest)
+
+        # Trades at or before each sampled row (index into the cash/holdings paths)
+        state = np.searchsorted(np.asarray(trade_rows, dtype=np.int64), rows, side="right")
+        values = np.asarray(cash_path)[state] + np.asarray(holdings_path)[state] * np.nan_to_num(mark)
+
+        for b, v in zip(bucket[rows].tolist(), values.tolist()):
+            if self._sample_buckets and self._sample_buckets[-1] == b:
+                # The interval continued from the previous chunk
+                self._sample_values[-1] = v
+            else:
+                self._sample_buckets.append(b)
+                self._sample_values.append(v)
+
+    def _carry(self, positions: List[np.ndarray], ts: np.ndarray, bid: np.ndarray, ask: np.ndarray,
+               spreads: np.ndarray):
+        venues = self._venues
+        for code, pos in enumerate(positions):
+            if len(pos):
+                last = pos[-1]
+                venues.ts[code] = ts[last]
+                venues.bid[code] = bid[last]
+                venues.ask[code] = ask[last]
+                venues.spreads[code] = spreads[last]
+
+    def _result(self, events: int) -> TickBacktestResult:
+        values = np.asarray(self._sample_values, dtype=np.float64)
+        sample_ns = np.asarray(self._sample_buckets, dtype=np.int64) * self.sample_step
+        days = (sample_ns[-1] - sample_ns[0]) / NS_PER_DAY if len(sample_ns) else 0
+        years = days / 365.25 if days > 0 else 0
+        metrics = compute_metrics(values, self.initial_capital, years, periods_per_year(sample_ns))
+        final_value = metrics["final_value"]
+        return TickBacktestResult(
+            strategy_name=self._strategy.__class__.__name__,
+            total_invested=self._invested,
+            final_value=final_value,
+            total_fees=self._fees,
+            net_profit=final_value - self.initial_capital,
+            **{name: metrics[name] for name in METRIC_NAMES if name != "final_value"},
+            history=TradeLog(np.array(self._trades, dtype=TRADE_DTYPE)),
+            daily_values=values,
+            drawdown=metrics["drawdown"],
+            sample_times=sample_ns.view("datetime64[ns]"),
+            venues=self._trade_venues,
+            events=events,
+            rejected_orders=self._rejected,
+        )
@@ -0,0 +1,112 @@
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional, Sequence, Union
+import numpy as np
+import pandas as pd
+
+@dataclass
+class Trade:
+    date: pd.Timestamp
+    amount: float
+    price: float
+    fee: float
+    asset_amount: float
+
+# One fixed-width record per fill; dates are int64 nanoseconds since epoch (UTC)
+TRADE_DTYPE = np.dtype([
+    ("date", np.int64),
+    ("amount", np.float64),
+    ("price", np.float64),
+    ("fee", np.float64),
+    ("asset_amount", np.float64),
+])
+
+class TradeLog(Sequence):
+    """
+    Array-backed, read-only sequence of trades.
+
+    Fills are held in one structured NumPy array (40 bytes per trade), so a
+    result with millions of trades pickles as a single buffer. Indexing and
+    iteration build Trade objects on demand; column() and to_frame() give
+    vectorized access without creating any.
+
+    Args:
+        records: Structured array with TRADE_DTYPE (empty if None).
+        tz: Time zone the dates are reported in (None for naive timestamps).
+    """
+    def __init__(self, records: Optional[np.ndarray] = None, tz: Optional[str] = None):
+        if records is None:
+            records = np.empty(0, dtype=TRADE_DTYPE)
+        if records.dtype != TRADE_DTYPE:
+            raise ValueError(f"Trade records must have dtype {TRADE_DTYPE}, got {records.dtype}")
+        self.records = records
+        self.tz = tz
+
+    @classmethod
+    def from_columns(cls, dates: np.ndarray, amount: np.ndarray, price: np.ndarray, fee: np.ndarray,
+                     asset_amount: np.ndarray, tz: Optional[str] = None) -> "TradeLog":
+        """Build a log from parallel columns (dates as int64 ns or datetime64)."""
+        records = np.empty(len(amount), dtype=TRADE_DTYPE)
+        records["date"] = np.asarray(dates).astype("datetime64[ns]").view(np.int64)
+        records["amount"] = amount
+        records["price"] = price
+        records["fee"] = fee
+        records["asset_amount"] = asset_amount
+        return cls(records, tz)
+
+    @classmethod
+    def from_trades(cls, trades: Iterable[Trade]) -> "TradeLog":
+        trades = list(trades)
+        tz = None
+        if trades and getattr(trades[0].date, "tz", None) is not None:
+            tz = str(trades[0].date.tz)
+        records = np.array(
+            [(pd.Timestamp(t.date).value, t.amount, t.price, t.fee, t.asset_amount) for t in trades],
+            dtype=TRADE_DTYPE,
+        )
+        return cls(records, tz)
+
+    def _timestamp(self, ns: int) -> pd.Timestamp:
+        ts = pd.Timestamp(int(ns))
+        return ts.tz_localize("UTC").tz_convert(self.tz) if self.tz else ts
+
+    def _trade(self, record) -> Trade:
+        return Trade(self._timestamp(record["date"]), float(record["amount"]), float(record["price"]),
+                     float(record["fee"]), float(record["asset_amount"]))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return TradeLog(self.records[index], self.tz)
+        return self._trade(self.records[index])
+
+    def __iter__(self) -> Iterator[Trade]:
+        for record in self.records:
+            yield self._trade(record)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, TradeLog):
+            return self.tz == other.tz and np.array_equal(self.records, other.records)
+        if isinstance(other, (list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"TradeLog({len(self)} trades)"
+
+    @property
+    def nbytes(self) -> int:
+        return self.records.nbytes
+
+    def column(self, name: str) -> np.ndarray:
+        """One field as a NumPy array ('date' is returned as datetime64[ns])."""
+        values = self.records[name]
+        return values.view("datetime64[ns]") if name == "date" else values
+
+    def to_frame(self) -> pd.DataFrame:
+        frame = pd.DataFrame({name: self.records[name] for name in TRADE_DTYPE.names})
+        frame["date"] = pd.to_datetime(frame["date"], utc=self.tz is not None)
+        if self.tz:
+            frame["date"] = frame["date"].dt.tz_convert(self.tz)
+        return frame
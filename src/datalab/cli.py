@@ -2,9 +2,9 @@ import argparse
 import sys
 from datalab.utils.config import load_config
 
-import asyncio
 import logging
-from datalab.collector.manager import MultiExchangeCollector
+from datalab.collector.supervisor import CollectorSupervisor, run_collector
+from datalab.collector import loop as event_loop
 
 logging.basicConfig(level=logging.ERROR)
 
@@ -16,13 +16,29 @@ def collect_command(args):
     if args.spread_threshold:
         collector_config["spread_threshold"] = args.spread_threshold
     
-    collector = MultiExchangeCollector(collector_config)
-    
+    if args.processes:
+        collector_config["processes"] = args.processes
+    if args.uvloop:
+        collector_config["event_loop"] = "uvloop"
+    if args.metrics_file:
+        collector_config["metrics_file"] = args.metrics_file
+    if args.metrics_port is not None:
+        collector_config["metrics_port"] = args.metrics_port
+
+    if collector_config.get("processes", 1) > 1:
+        # Sharded mode: one collector process per shard, restarted on failure
+        supervisor = CollectorSupervisor(collector_config)
+        try:
+            supervisor.run()
+        except KeyboardInterrupt:
+            pass
+        return
+
     try:
-        asyncio.run(collector.start())
+        # Stops and flushes on SIGINT/SIGTERM within the collector's own event loop
+        event_loop.run(run_collector(collector_config), collector_config.get("event_loop", "asyncio"))
     except KeyboardInterrupt:
-        # Run stop logic
-        asyncio.run(collector.stop())
+        pass
 
 from datalab.strategy.library.dca import PeriodicDCA
 from datalab.backtest.engine import BacktestEngine
@@ -30,19 +46,55 @@ import pandas as pd
 from datetime import datetime
 
 from datalab.analysis.plotting import plot_backtest_results
+from datalab.analysis.downsample import DEFAULT_MAX_POINTS
+from datalab.backtest.features import FeatureCache, load_features
+from datalab.backtest.bars import MixedExchangesError, load_bars
+from datalab.backtest.ticks import TickBacktester
+
+def _load_backtest_data(args, indicators=None):
+    source = args.data if args.data and os.path.exists(args.data) else None
+
+    def build_bars() -> pd.DataFrame:
+        if source is not None:
+            return load_bars(source, args.asset, args.freq, start=args.start, end=args.end, exchange=args.exchange)
+        # No collected data: fall back to a synthetic constant-price series
+        print(f"Data path not found: {args.data}; using synthetic prices")
+        dates = pd.date_range(start=args.start, end=args.end, freq=args.freq)
+        return pd.DataFrame({
+            "timestamp": dates,
+            "bid_price": [100.0] * len(dates),
+            "ask_price": [101.0] * len(dates)
+        })
+
+    cache = FeatureCache(args.cache_dir, max_bytes=int(args.cache_mb * 1024 * 1024)) if args.cache_dir else None
+    try:
+        return load_features(build_bars, args.asset, args.freq, args.start, args.end, indicators or {},
+                             source=source, cache=cache, exchange=args.exchange)
+    except MixedExchangesError as e:
+        print(f"{e}: pass --exchange to select the venue")
+    except ValueError as e:
+        print(f"Error loading data: {e}")
+    return None, None
+
+def _max_points(args):
+    # 0 disables decimation
+    return args.max_points or None
+
+def _run_tick_backtest(args, strategy):
+    if not os.path.exists(args.data):
+        print(f"Data path not found: {args.data}")
+        return None
+    tester = TickBacktester(decision_interval=args.decision_interval or None, sample_freq=args.sample_freq)
+    exchanges = _parse_list(args.exchange, str) if args.exchange else None
+    result = tester.run(strategy, args.data, args.asset, exchanges=exchanges, start=args.start, end=args.end)
+    if result.events == 0:
+        print("No ticks in the selected range")
+        return None
+    return result
 
 def backtest_command(args):
     print(f"Starting backtest: Strategy={args.strategy}, Asset={args.asset}, Range={args.start} to {args.end}")
     
-    # TODO: Load real data
-    # For MVP/Prototype, generate dummy data if no file found
-    dates = pd.date_range(start=args.start, end=args.end, freq="D")
-    data = pd.DataFrame({
-        "timestamp": dates,
-        "bid_price": [100.0] * len(dates),
-        "ask_price": [101.0] * len(dates)
-    })
-    
     if args.strategy == "dca_daily":
         strategy = PeriodicDCA(100.0, 1)
     elif args.strategy == "dca_weekly":
@@ -50,8 +102,20 @@ def backtest_command(args):
     else:
         strategy = PeriodicDCA(100.0, 30) # Default monthly
         
-    engine = BacktestEngine()
-    result = engine.run(strategy, data)
+    if args.ticks:
+        result = _run_tick_backtest(args, strategy)
+        if result is None:
+            return
+    else:
+        data, indicators = _load_backtest_data(args, strategy.indicators())
+        if data is None:
+            return
+        if data.empty:
+            print("No data in the selected range")
+            return
+        
+        engine = BacktestEngine()
+        result = engine.run(strategy, data, vectorized=args.vectorized, indicators=indicators)
     
     print("\n=== Backtest Results ===")
     print(f"Strategy:       {result.strategy_name}")
@@ -71,35 +135,163 @@ def backtest_command(args):
     print(f"Worst Day:      {result.worst_day:.2f}%")
     print(f"VaR (95%):      {result.value_at_risk:.2f}%")
     print(f"Trades:         {len(result.history)}")
+    if args.ticks:
+        print(f"Ticks Replayed: {result.events:,}")
+        print(f"Rejected:       {result.rejected_orders}")
     
     # Generate Report
     report_path = f"backtest_report_{args.strategy}_{args.start}_{args.end}.html"
-    plot_backtest_results(result, report_path)
+    plot_backtest_results(result, report_path, max_points=_max_points(args))
     print(f"\nDetailed HTML report generated: {report_path}")
 
-from datalab.analysis.plotting import plot_spreads
+from datalab.backtest.sweep import run_sweep
+from datalab.strategy.library.momentum import MomentumDCA
+
+def _parse_list(value: str, cast):
+    return [cast(v) for v in value.split(",") if v.strip()]
+
+def sweep_command(args):
+    print(f"Starting sweep: Strategy={args.strategy}, Asset={args.asset}, Range={args.start} to {args.end}")
+    
+    # Bars only: indicator parameters vary across the grid
+    data, _ = _load_backtest_data(args)
+    if data is None:
+        return
+    if data.empty:
+        print("No data in the selected range")
+        return
+    
+    grid = {
+        "budget_per_period": _parse_list(args.budget, float),
+        "period_days": _parse_list(args.period, int),
+    }
+    if args.strategy == "momentum":
+        strategy_cls = MomentumDCA
+        grid["sma_period"] = _parse_list(args.sma_period, int)
+    else:
+        strategy_cls = PeriodicDCA
+    
+    table = run_sweep(data, strategy_cls, grid, workers=args.workers)
+    table = table.sort_values(args.sort_by, ascending=False)
+    
+    print(f"\n=== Sweep Results ({len(table)} runs) ===")
+    print(table.head(args.top).to_string(index=False))
+    
+    if args.output:
+        table.to_csv(args.output, index=False)
+        print(f"\nFull results written to: {args.output}")
+
+from datalab.backtest.portfolio import PortfolioEngine, align_prices
+
+def portfolio_command(args):
+    assets = _parse_list(args.assets, str)
+    weights = _parse_list(args.weights, float) if args.weights else None
+    if weights is not None and len(weights) != len(assets):
+        print(f"Expected {len(assets)} weights, got {len(weights)}")
+        return
+    print(f"Starting portfolio backtest: Strategy={args.strategy}, Assets={', '.join(assets)}, Range={args.start} to {args.end}")
+    
+    period = {"dca_daily": 1, "dca_weekly": 7}.get(args.strategy, 30)
+    frames = {}
+    for asset in assets:
+        data, _ = _load_backtest_data(argparse.Namespace(**{**vars(args), "asset": asset}))
+        if data is None:
+            return
+        if data.empty:
+            print(f"No data for {asset} in the selected range")
+            return
+        frames[asset] = data
+    
+    engine = PortfolioEngine(args.capital, args.commission)
+    result = engine.run(
+        {asset: PeriodicDCA(args.budget, period) for asset in assets},
+        align_prices(frames),
+        weights=dict(zip(assets, weights)) if weights else None,
+        rebalance_days=args.rebalance_days,
+    )
+    
+    table = result.to_frame()
+    print(f"\n=== Portfolio Results ({len(assets)} assets) ===")
+    print(table.to_string(index=False, float_format=lambda v: f"{v:,.2f}"))
+    
+    if args.output:
+        table.to_csv(args.output, index=False)
+        print(f"\nResults written to: {args.output}")
+
+from datalab.analysis.aggregate import SpreadAggregator
+from datalab.analysis.plotting import plot_spread_aggregates
+from datalab.utils.storage import iter_tick_batches
 import os
 
 def analyze_command(args):
     print(f"Starting analysis: Input={args.input}, Output={args.output}")
     
     if os.path.isdir(args.input) or os.path.isfile(args.input):
-        # Load all parquet files
-        # For MVP, simplified loading
+        # Stream record batches through the aggregator; memory stays bounded by batch size
         try:
-            df = pd.read_parquet(args.input)
-            # Ensure timestamp is datetime for plotting
-            if df['timestamp'].dtype == 'int64':
-                # Convert ns to datetime
-                df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ns')
+            batches = iter_tick_batches(
+                args.input,
+                exchanges=_parse_list(args.exchanges, str) if args.exchanges else None,
+                symbols=_parse_list(args.symbols, str) if args.symbols else None,
+                start=args.start,
+                end=args.end,
+                columns=["timestamp", "exchange", "symbol", "spread_10k"],
+                batch_size=args.batch_size,
+            )
+            aggregator = SpreadAggregator(pd.Timedelta(args.bucket).value)
+            aggregates = aggregator.consume(batches).result()
+            if aggregates.empty:
+                print("No ticks matched the selection")
+                return
                 
-            plot_spreads(df, args.output)
-            print(f"Report generated at {args.output}")
+            plot_spread_aggregates(aggregates, args.output, max_points=_max_points(args))
+            print(f"Report generated at {args.output} ({int(aggregates['count'].sum())} ticks, {len(aggregates)} buckets)")
         except Exception as e:
             print(f"Error loading data: {e}")
     else:
         print(f"Input path not found: {args.input}")
 
+from datalab.utils.storage import compact_dataset
+
+def compact_command(args):
+    print(f"Compacting dataset: {args.input}")
+    stats = compact_dataset(args.input, row_group_size=args.row_group_size, max_rows_per_file=args.max_rows_per_file)
+    print(f"Compacted {stats['partitions']} partitions: {stats['files_removed']} files -> {stats['files_written']} files")
+
+from datalab.utils.storage import load_latency_histograms
+from datalab.collector.latency import summarize_latency
+
+def latency_command(args):
+    table = load_latency_histograms(
+        args.input,
+        exchanges=_parse_list(args.exchanges, str) if args.exchanges else None,
+        symbols=_parse_list(args.symbols, str) if args.symbols else None,
+        start=args.start,
+        end=args.end,
+    )
+    if table.num_rows == 0:
+        print("No latency histograms matched the selection")
+        return
+    by = ["exchange", "kind"] if args.by_venue else ["exchange", "symbol", "kind"]
+    summary = summarize_latency(table, by=by)
+    print(summary.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+
+from datalab.utils.storage import load_arbitrage_events
+from datalab.collector.arbitrage import summarize_arbitrage
+
+def arbitrage_command(args):
+    table = load_arbitrage_events(
+        args.input,
+        symbols=_parse_list(args.symbols, str) if args.symbols else None,
+        start=args.start,
+        end=args.end,
+    )
+    if table.num_rows == 0:
+        print("No arbitrage opportunities matched the selection")
+        return
+    summary = summarize_arbitrage(table)
+    print(summary.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+
 def main():
     parser = argparse.ArgumentParser(description="DataLab Financial Analysis Platform")
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
@@ -108,6 +300,10 @@ def main():
     collect_parser = subparsers.add_parser("collect", help="Start data collection")
     collect_parser.add_argument("--config", required=True, help="Path to configuration JSON")
     collect_parser.add_argument("--spread-threshold", type=float, help="Alert threshold for spread")
+    collect_parser.add_argument("--processes", type=int, help="Run exchanges/symbol groups in N worker processes")
+    collect_parser.add_argument("--uvloop", action="store_true", help="Run on uvloop (if installed)")
+    collect_parser.add_argument("--metrics-file", help="Write Prometheus-format metrics to this file periodically")
+    collect_parser.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics at http://127.0.0.1:PORT/metrics")
     collect_parser.set_defaults(func=collect_command)
 
     # Backtest Command
@@ -116,14 +312,95 @@ def main():
     backtest_parser.add_argument("--asset", required=True, help="Asset symbol (e.g. BTC-USD)")
     backtest_parser.add_argument("--start", required=True, help="Start date (YYYY-MM-DD)")
     backtest_parser.add_argument("--end", required=True, help="End date (YYYY-MM-DD)")
+    backtest_parser.add_argument("--vectorized", action="store_true", help="Use the vectorized NumPy engine path")
+    backtest_parser.add_argument("--max-points", type=int, default=DEFAULT_MAX_POINTS, help="Point budget per plotted trace (0 = no decimation)")
+    backtest_parser.add_argument("--data", default="./market_data", help="Collected dataset root")
+    backtest_parser.add_argument("--exchange", help="Exchange to take quotes from (required if the asset was collected on several; comma-separated with --ticks)")
+    backtest_parser.add_argument("--freq", default="1D", help="Bar frequency (e.g. 1min, 1h, 1D)")
+    backtest_parser.add_argument("--cache-dir", help="Feature cache directory (reuses bars/indicators across runs)")
+    backtest_parser.add_argument("--cache-mb", type=float, default=2048, help="Feature cache disk budget in MB")
+    backtest_parser.add_argument("--ticks", action="store_true", help="Replay raw ticks across exchanges with depth-based fills")
+    backtest_parser.add_argument("--decision-interval", default="1min", help="With --ticks: how often the strategy is consulted ('' = every tick)")
+    backtest_parser.add_argument("--sample-freq", default="1h", help="With --ticks: equity sampling interval for metrics")
     backtest_parser.set_defaults(func=backtest_command)
 
+    # Sweep Command
+    sweep_parser = subparsers.add_parser("sweep", help="Run a parallel parameter sweep")
+    sweep_parser.add_argument("--strategy", choices=["periodic", "momentum"], default="periodic", help="Strategy family")
+    sweep_parser.add_argument("--asset", required=True, help="Asset symbol (e.g. BTC-USD)")
+    sweep_parser.add_argument("--start", required=True, help="Start date (YYYY-MM-DD)")
+    sweep_parser.add_argument("--end", required=True, help="End date (YYYY-MM-DD)")
+    sweep_parser.add_argument("--budget", default="100", help="Comma-separated budgets per period")
+    sweep_parser.add_argument("--period", default="1,7,30", help="Comma-separated periods in days")
+    sweep_parser.add_argument("--sma-period", default="10", help="Comma-separated SMA windows (momentum only)")
+    sweep_parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    sweep_parser.add_argument("--sort-by", default="sharpe_ratio", help="Metric to rank results by")
+    sweep_parser.add_argument("--top", type=int, default=10, help="Rows to print")
+    sweep_parser.add_argument("--output", help="Optional CSV path for the full results table")
+    sweep_parser.add_argument("--data", default="./market_data", help="Collected dataset root")
+    sweep_parser.add_argument("--exchange", help="Exchange to take quotes from (required if the asset was collected on several)")
+    sweep_parser.add_argument("--freq", default="1D", help="Bar frequency (e.g. 1min, 1h, 1D)")
+    sweep_parser.add_argument("--cache-dir", help="Feature cache directory (reuses bars/indicators across runs)")
+    sweep_parser.add_argument("--cache-mb", type=float, default=2048, help="Feature cache disk budget in MB")
+    sweep_parser.set_defaults(func=sweep_command)
+
+    # Portfolio Command
+    portfolio_parser = subparsers.add_parser("portfolio", help="Backtest DCA across several assets with shared cash")
+    portfolio_parser.add_argument("--strategy", default="dca_monthly", help="Strategy name (dca_daily, dca_weekly, dca_monthly)")
+    portfolio_parser.add_argument("--assets", required=True, help="Comma-separated asset symbols")
+    portfolio_parser.add_argument("--start", required=True, help="Start date (YYYY-MM-DD)")
+    portfolio_parser.add_argument("--end", required=True, help="End date (YYYY-MM-DD)")
+    portfolio_parser.add_argument("--weights", help="Comma-separated target weights, in --assets order (default: equal)")
+    portfolio_parser.add_argument("--rebalance-days", type=int, help="Rebalance to the target weights every N days")
+    portfolio_parser.add_argument("--budget", type=float, default=100.0, help="Amount invested per asset and period")
+    portfolio_parser.add_argument("--capital", type=float, default=10000.0, help="Initial cash shared by all assets")
+    portfolio_parser.add_argument("--commission", type=float, default=0.001, help="Fee rate for every asset")
+    portfolio_parser.add_argument("--output", help="Optional CSV path for the results table")
+    portfolio_parser.add_argument("--data", default="./market_data", help="Collected dataset root")
+    portfolio_parser.add_argument("--exchange", help="Exchange to take quotes from (required if an asset was collected on several)")
+    portfolio_parser.add_argument("--freq", default="1D", help="Bar frequency (e.g. 1min, 1h, 1D)")
+    portfolio_parser.add_argument("--cache-dir", help="Feature cache directory (reuses bars across runs)")
+    portfolio_parser.add_argument("--cache-mb", type=float, default=2048, help="Feature cache disk budget in MB")
+    portfolio_parser.set_defaults(func=portfolio_command)
+
     # Analyze Command
     analyze_parser = subparsers.add_parser("analyze", help="Analyze collected data")
     analyze_parser.add_argument("--input", required=True, help="Input directory or file")
     analyze_parser.add_argument("--output", required=True, help="Output report path")
+    analyze_parser.add_argument("--exchanges", help="Comma-separated exchanges to include")
+    analyze_parser.add_argument("--symbols", help="Comma-separated symbols to include")
+    analyze_parser.add_argument("--start", help="Start time (inclusive, UTC)")
+    analyze_parser.add_argument("--end", help="End time (exclusive, UTC)")
+    analyze_parser.add_argument("--bucket", default="1min", help="Aggregation bucket width (e.g. 1s, 1min, 1h)")
+    analyze_parser.add_argument("--batch-size", type=int, default=131_072, help="Rows per streamed record batch")
+    analyze_parser.add_argument("--max-points", type=int, default=DEFAULT_MAX_POINTS, help="Point budget per plotted trace (0 = no decimation)")
     analyze_parser.set_defaults(func=analyze_command)
 
+    # Latency Command
+    latency_parser = subparsers.add_parser("latency", help="Summarize recorded feed/processing latency")
+    latency_parser.add_argument("--input", required=True, help="Dataset root directory")
+    latency_parser.add_argument("--exchanges", help="Comma-separated exchanges to include")
+    latency_parser.add_argument("--symbols", help="Comma-separated symbols to include")
+    latency_parser.add_argument("--start", help="Start time (UTC)")
+    latency_parser.add_argument("--end", help="End time (UTC)")
+    latency_parser.add_argument("--by-venue", action="store_true", help="Merge symbols per exchange")
+    latency_parser.set_defaults(func=latency_command)
+
+    # Arbitrage Command
+    arbitrage_parser = subparsers.add_parser("arbitrage", help="Summarize detected cross-exchange opportunities")
+    arbitrage_parser.add_argument("--input", required=True, help="Dataset root directory")
+    arbitrage_parser.add_argument("--symbols", help="Comma-separated symbols to include")
+    arbitrage_parser.add_argument("--start", help="Start time (UTC)")
+    arbitrage_parser.add_argument("--end", help="End time (UTC)")
+    arbitrage_parser.set_defaults(func=arbitrage_command)
+
+    # Compact Command
+    compact_parser = subparsers.add_parser("compact", help="Merge small files in a collected dataset")
+    compact_parser.add_argument("--input", required=True, help="Dataset root directory")
+    compact_parser.add_argument("--row-group-size", type=int, default=1_000_000, help="Rows per row group")
+    compact_parser.add_argument("--max-rows-per-file", type=int, default=10_000_000, help="Rows per output file")
+    compact_parser.set_defaults(func=compact_command)
+
     args = parser.parse_args()
     
     if not args.command:
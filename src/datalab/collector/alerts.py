@@ -0,0 +1,297 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+FIRING = "firing"
+RESOLVED = "resolved"
+
+@dataclass
+class Alert:
+    """
+    Aggregated alert for one (exchange, symbol) over one dispatch window.
+
+    count and peak cover every tick above the threshold seen in the window;
+    first_at/last_at are tick timestamps (ns).
+    """
+    state: str  # "firing" or "resolved"
+    exchange: str
+    symbol: str
+    value: float
+    peak: float
+    threshold: float
+    count: int
+    first_at: int
+    last_at: int
+
+    def message(self) -> str:
+        if self.state == FIRING:
+            return (f"ALERT: High Spread detected on {self.exchange} {self.symbol}: {self.value} "
+                    f"(peak {self.peak}, {self.count} ticks above {self.threshold})")
+        return f"RESOLVED: Spread back to normal on {self.exchange} {self.symbol}: {self.value}"
+
+class AlertSink(ABC):
+    """Destination for alert batches. send() runs on the dispatcher task, never on the tick path."""
+
+    @abstractmethod
+    async def send(self, alerts: List[Alert]):
+        pass
+
+    async def close(self):
+        pass
+
+class LogSink(AlertSink):
+    """Logs every alert through the module logger (the collector's previous behaviour)."""
+
+    async def send(self, alerts: List[Alert]):
+        for alert in alerts:
+            if alert.state == FIRING:
+                logger.warning(alert.message())
+            else:
+                logger.info(alert.message())
+
+class StdoutSink(AlertSink):
+    """Prints one line per alert."""
+
+    async def send(self, alerts: List[Alert]):
+        sys.stdout.write("".join(f"{alert.message()}\n" for alert in alerts))
+        sys.stdout.flush()
+
+class FileSink(AlertSink):
+    """
+    Appends alerts to a file as JSON lines (written from a worker thread).
+
+    Args:
+        path: Output file; parent directories are created.
+    """
+    def __init__(self, path: str):
+        self.path = path
+
+    async def send(self, alerts: List[Alert]):
+        await asyncio.to_thread(self._append, "".join(json.dumps(asdict(a)) + "\n" for a in alerts))
+
+    def _append(self, text: str):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write(text)
+
+class WebhookSink(AlertSink):
+    """
+    POSTs each batch as {"alerts": [...]} JSON to a URL, e.g. a local relay.
+
+    Args:
+        url: Endpoint receiving the batches.
+        timeout_s: Request timeout; a failed post is logged and the batch dropped.
+    """
+    def __init__(self, url: str, timeout_s: float = 5.0):
+        self.url = url
+        self.timeout_s = timeout_s
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def send(self, alerts: List[Alert]):
+        if self._session is None:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout_s))
+        async with self._session.post(self.url, json={"alerts": [asdict(a) for a in alerts]}) as response:
+            response.raise_for_status()
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+def build_sinks(configs: Optional[Sequence[Dict[str, Any]]]) -> List[AlertSink]:
+    """
+    Create sinks from config entries such as {"type": "file", "path": "alerts.jsonl"}.
+
+    Types: log (default when configs is empty), stdout, file (path) and webhook (url, timeout_s).
+    """
+    sinks: List[AlertSink] = []
+    for conf in configs or [{"type": "log"}]:
+        kind = conf.get("type")
+        if kind == "log":
+            sinks.append(LogSink())
+        elif kind == "stdout":
+            sinks.append(StdoutSink())
+        elif kind == "file":
+            sinks.append(FileSink(conf["path"]))
+        elif kind == "webhook":
+            sinks.append(WebhookSink(conf["url"], timeout_s=conf.get("timeout_s", 5.0)))
+        else:
+            raise ValueError(f"Unknown alert sink type '{kind}' (expected log, stdout, file or webhook)")
+    return sinks
+
+class _KeyState:
+    __slots__ = ("active", "notified", "last_sent")
+
+    def __init__(self):
+        self.active = False
+        self.notified = False
+        self.last_sent = None
+
+class AlertDispatcher:
+    """
+    Threshold alerts per (exchange, symbol), evaluated on the tick path in O(1).
+
+    A key starts firing when its value exceeds threshold and only resolves
+    once it drops to clear_threshold or below (hysteresis), so a value
+    hovering around the threshold does not flap. A new firing alert for a key
+    is held back until cooldown_s (tick time) after the previous one; a breach
+    that is still active then fires on its next tick. Ticks are aggregated per key into one alert per window_s; a
+    background task hands each window's batch to a bounded queue, and a second
+    task sends batches to the sinks. When the queue is full the batch is
+    dropped and counted, so slow sinks never stall tick processing.
+
+    Args:
+        threshold: Value above which a key fires.
+        sinks: Destinations for alert batches.
+        clear_threshold: Value at or below which a firing key resolves
+            (default: threshold).
+        cooldown_s: Minimum time between firing notifications of one key.
+        window_s: Aggregation window.
+        queue_size: Batches that may wait for the sinks.
+    """
+    def __init__(self, threshold: float, sinks: Sequence[AlertSink], clear_threshold: Optional[float] = None,
+                 cooldown_s: float = 60.0, window_s: float = 1.0, queue_size: int = 100):
+        if clear_threshold is not None and clear_threshold > threshold:
+            raise ValueError(f"clear_threshold ({clear_threshold}) must not exceed threshold ({threshold})")
+        self.threshold = threshold
+        self.clear_threshold = threshold if clear_threshold is None else clear_threshold
+        self.cooldown_ns = int(cooldown_s * 1e9)
+        self.window_s = window_s
+        self.sinks = list(sinks)
+        self._states: Dict[Tuple[str, str], _KeyState] = {}
+        self._pending: Dict[Tuple[Tuple[str, str], str], Alert] = {}
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._tasks: List[asyncio.Task] = []
+        self.fired = 0
+        self.resolved = 0
+        self.suppressed = 0
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def evaluate(self, exchange: str, symbol: str, value: float, timestamp: int):
+        """Check one tick's value; only updates in-memory state."""
+        key = (exchange, symbol)
+        state = self._states.get(key)
+        if state is None:
+            if not value > self.threshold:
+                return
+            state = self._states[key] = _KeyState()
+
+        if state.active:
+            if value <= self.clear_threshold:
+                state.active = False
+                if state.notified:
+                    state.notified = False
+                    self.resolved += 1
+                    # Re-inserted so a batch lists a key's alerts in order
+                    self._pending.pop((key, RESOLVED), None)
+                    self._pending[(key, RESOLVED)] = Alert(RESOLVED, exchange, symbol, value, value,
+                                                           self.threshold, 0, timestamp, timestamp)
+            elif value > self.threshold:
+                if state.notified:
+                    self._aggregate(key, value, timestamp)
+                elif timestamp - state.last_sent >= self.cooldown_ns:
+                    # Breach outlasted the cooldown that suppressed it
+                    self._fire(state, key, value, timestamp)
+        elif value > self.threshold:
+            state.active = True
+            if state.last_sent is not None and timestamp - state.last_sent < self.cooldown_ns:
+                self.suppressed += 1
+                return
+            self._fire(state, key, value, timestamp)
+
+    def _fire(self, state: _KeyState, key: Tuple[str, str], value: float, timestamp: int):
+        state.notified = True
+        state.last_sent = timestamp
+        self.fired += 1
+        if (key, FIRING) in self._pending and self._pending.pop((key, RESOLVED), None) is not None:
+            # Resolved and fired again within one window: keep aggregating the first alert
+            self._aggregate(key, value, timestamp)
+        else:
+            self._pending[(key, FIRING)] = Alert(FIRING, key[0], key[1], value, value, self.threshold, 1,
+                                                 timestamp, timestamp)
+
+    def _aggregate(self, key: Tuple[str, str], value: float, timestamp: int):
+        alert = self._pending.get((key, FIRING))
+        if alert is None:
+            # Still firing from an earlier window: reported again only when it resolves
+            return
+        alert.count += 1
+        alert.value = value
+        alert.last_at = timestamp
+        if value > alert.peak:
+            alert.peak = value
+
+    def active(self) -> int:
+        return sum(1 for state in self._states.values() if state.active)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "alerts_fired": self.fired,
+            "alerts_resolved": self.resolved,
+            "alerts_suppressed": self.suppressed,
+            "alerts_sent": self.sent,
+            "alerts_dropped": self.dropped,
+            "alerts_failed": self.failed,
+        }
+
+    async def start(self):
+        self._tasks = [asyncio.create_task(self._window_loop()), asyncio.create_task(self._dispatch_loop())]
+
+    async def stop(self):
+        """Send the pending window, wait for queued batches and close the sinks."""
+        if not self._tasks:
+            return
+        window_task, dispatch_task = self._tasks
+        self._tasks = []
+        window_task.cancel()
+        await asyncio.gather(window_task, return_exceptions=True)
+        self._close_window()
+        await self._queue.join()
+        dispatch_task.cancel()
+        await asyncio.gather(dispatch_task, return_exceptions=True)
+        for sink in self.sinks:
+            try:
+                await sink.close()
+            except Exception as e:
+                logger.debug(f"Could not close alert sink {type(sink).__name__}: {e}")
+
+    def _close_window(self):
+        if not self._pending:
+            return
+        batch = list(self._pending.values())
+        self._pending = {}
+        try:
+            self._queue.put_nowait(batch)
+        except asyncio.QueueFull:
+            self.dropped += len(batch)
+
+    async def _window_loop(self):
+        while True:
+            await asyncio.sleep(self.window_s)
+            self._close_window()
+
+    async def _dispatch_loop(self):
+        while True:
+            batch = await self._queue.get()
+            try:
+                for sink in self.sinks:
+                    try:
+                        await sink.send(batch)
+                    except Exception as e:
+                        self.failed += len(batch)
+                        logger.error(f"Alert sink {type(sink).__name__} failed: {e}")
+                self.sent += len(batch)
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,242 @@
+import math
+from array import array
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, List, Mapping, Optional
+import pandas as pd
+import pyarrow as pa
+
+NEVER = -(2**63)
+
+@dataclass
+class ArbitrageEvent:
+    """
+    A cross-venue opportunity: buy on buy_exchange's ask, sell on sell_exchange's bid.
+
+    Open events carry closed_at=None; close events have the full lifetime.
+    Edges are in basis points of the ask, net of both venues' fees.
+    """
+    kind: str  # "open" or "close"
+    symbol: str
+    buy_exchange: str
+    sell_exchange: str
+    opened_at: int  # ns, tick timestamp
+    entry_edge_bps: float
+    peak_edge_bps: float
+    updates: int
+    closed_at: Optional[int] = None
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        return None if self.closed_at is None else (self.closed_at - self.opened_at) / 1e6
+
+class _Quotes:
+    """Latest bid/ask/timestamp per venue for one symbol, indexed by venue id."""
+    __slots__ = ("bids", "asks", "times")
+
+    def __init__(self):
+        self.bids = array("d")
+        self.asks = array("d")
+        self.times = array("q")
+
+    def grow(self, size: int):
+        while len(self.bids) < size:
+            self.bids.append(math.nan)
+            self.asks.append(math.nan)
+            self.times.append(NEVER)
+
+class _Open:
+    __slots__ = ("buy", "sell", "opened_at", "entry", "peak", "updates")
+
+    def __init__(self, buy: int, sell: int, opened_at: int, edge: float):
+        self.buy = buy
+        self.sell = sell
+        self.opened_at = opened_at
+        self.entry = edge
+        self.peak = edge
+        self.updates = 1
+
+class ArbitrageDetector:
+    """
+    Streaming cross-exchange spread monitor.
+
+    Keeps the latest best bid/ask of every (exchange, symbol) in flat arrays.
+    Each update rescans only that symbol's venues (O(venues)) and finds the
+    highest bid and lowest ask on different venues after fees, i.e. comparing
+    bid * (1 - fee) and ask * (1 + fee), so an expensive venue with a better
+    raw price does not hide a better net opportunity. The net edge
+    (bid * (1 - fee) - ask * (1 + fee)) / ask is compared with min_edge_bps. A
+    negative threshold also reports near-crossed markets. Quotes older than
+    max_quote_age_ms (in tick time) are ignored. Venues name the same market
+    differently (binance "BTCUSDT", dydx "BTC-USD"); symbol_map maps each
+    exchange's native symbols to the shared name quotes are compared under
+    (unmapped symbols are used as they are).
+
+    An opportunity opens when the edge reaches the threshold and closes when
+    it falls below, the best venue pair changes or a quote goes stale; close
+    events carry the duration, entry and peak edge. Closed events queue up
+    for snapshot() (bounded by max_pending).
+
+    Args:
+        min_edge_bps: Net edge at which an opportunity is reported.
+        max_quote_age_ms: Oldest quote still considered live.
+        fees_bps: Taker fee per exchange in basis points (default 0).
+        symbol_map: Per exchange, native symbol -> canonical symbol, e.g.
+            {"binance": {"BTCUSDT": "BTC-USD"}}.
+        on_event: Called with every open and close event (on the hot path; keep it cheap).
+        max_pending: Closed events kept until the next snapshot.
+    """
+    def __init__(
+        self,
+        min_edge_bps: float = 0.0,
+        max_quote_age_ms: float = 1000.0,
+        fees_bps: Optional[Mapping[str, float]] = None,
+        symbol_map: Optional[Mapping[str, Mapping[str, str]]] = None,
+        on_event: Optional[Callable[[ArbitrageEvent], None]] = None,
+        max_pending: int = 100_000,
+    ):
+        self.min_edge_bps = min_edge_bps
+        self.max_quote_age_ns = int(max_quote_age_ms * 1e6)
+        self.fees_bps = dict(fees_bps or {})
+        self.symbol_map = {exchange: dict(symbols) for exchange, symbols in (symbol_map or {}).items()}
+        self.on_event = on_event
+        self.opened = 0
+        self._venues: Dict[str, int] = {}
+        self._venue_names: List[str] = []
+        # Per-venue price multipliers after the taker fee
+        self._sell_after_fee = array("d")
+        self._buy_after_fee = array("d")
+        self._quotes: Dict[str, _Quotes] = {}
+        self._open: Dict[str, _Open] = {}
+        self._closed: Deque[ArbitrageEvent] = deque(maxlen=max_pending)
+
+    def _venue(self, exchange: str) -> int:
+        venue = self._venues.get(exchange)
+        if venue is None:
+            venue = self._venues[exchange] = len(self._venue_names)
+            self._venue_names.append(exchange)
+            fee = float(self.fees_bps.get(exchange, 0.0)) / 1e4
+            self._sell_after_fee.append(1.0 - fee)
+            self._buy_after_fee.append(1.0 + fee)
+        return venue
+
+    def update(self, exchange: str, symbol: str, bid: float, ask: float, timestamp: int):
+        """Record a venue's new best bid/ask and re-evaluate the symbol."""
+        native = self.symbol_map.get(exchange)
+        if native is not None:
+            symbol = native.get(symbol, symbol)
+        venue = self._venue(exchange)
+        quotes = self._quotes.get(symbol)
+        if quotes is None:
+            quotes = self._quotes[symbol] = _Quotes()
+        if venue >= len(quotes.bids):
+            quotes.grow(venue + 1)
+        quotes.bids[venue] = bid
+        quotes.asks[venue] = ask
+        quotes.times[venue] = timestamp
+
+        # Top two fee-adjusted bids and asks among live quotes
+        cutoff = timestamp - self.max_quote_age_ns
+        bid1 = bid2 = -math.inf
+        ask1 = ask2 = math.inf
+        b1 = b2 = a1 = a2 = -1
+        bids, asks, times = quotes.bids, quotes.asks, quotes.times
+        sell_after_fee, buy_after_fee = self._sell_after_fee, self._buy_after_fee
+        for i in range(len(bids)):
+            if times[i] < cutoff:
+                continue
+            b = bids[i] * sell_after_fee[i]
+            if b > bid1:
+                bid2, b2, bid1, b1 = bid1, b1, b, i
+            elif b > bid2:
+                bid2, b2 = b, i
+            a = asks[i] * buy_after_fee[i]
+            if a < ask1:
+                ask2, a2, ask1, a1 = ask1, a1, a, i
+            elif a < ask2:
+                ask2, a2 = a, i
+
+        sell, buy, edge = -1, -1, -math.inf
+        if b1 >= 0 and a1 >= 0:
+            if b1 != a1:
+                sell, buy, net_bid, net_ask = b1, a1, bid1, ask1
+            elif b2 >= 0 and (a2 < 0 or bid2 - ask1 >= bid1 - ask2):
+                sell, buy, net_bid, net_ask = b2, a1, bid2, ask1
+            elif a2 >= 0:
+                sell, buy, net_bid, net_ask = b1, a2, bid1, ask2
+            if sell >= 0:
+                edge = (net_bid - net_ask) / asks[buy] * 1e4
+
+        current = self._open.get(symbol)
+        if edge >= self.min_edge_bps:
+            if current is not None and current.buy == buy and current.sell == sell:
+                current.updates += 1
+                if edge > current.peak:
+                    current.peak = edge
+                return
+            if current is not None:
+                self._close(symbol, current, timestamp)
+            opened = self._open[symbol] = _Open(buy, sell, timestamp, edge)
+            self.opened += 1
+            if self.on_event is not None:
+                self.on_event(self._event("open", symbol, opened))
+        elif current is not None:
+            self._close(symbol, current, timestamp)
+
+    def _event(self, kind: str, symbol: str, state: _Open, closed_at: Optional[int] = None) -> ArbitrageEvent:
+        return ArbitrageEvent(
+            kind=kind,
+            symbol=symbol,
+            buy_exchange=self._venue_names[state.buy],
+            sell_exchange=self._venue_names[state.sell],
+            opened_at=state.opened_at,
+            entry_edge_bps=state.entry,
+            peak_edge_bps=state.peak,
+            updates=state.updates,
+            closed_at=closed_at,
+        )
+
+    def _close(self, symbol: str, state: _Open, timestamp: int):
+        del self._open[symbol]
+        event = self._event("close", symbol, state, timestamp)
+        self._closed.append(event)
+        if self.on_event is not None:
+            self.on_event(event)
+
+    def open_opportunities(self) -> List[ArbitrageEvent]:
+        """Opportunities that are currently open."""
+        return [self._event("open", symbol, state) for symbol, state in self._open.items()]
+
+    def snapshot(self) -> pa.Table:
+        """Closed opportunities since the last snapshot, as an Arrow table (drains the queue)."""
+        events = list(self._closed)
+        self._closed.clear()
+        return pa.table({
+            "symbol": pa.array([e.symbol for e in events], pa.string()),
+            "buy_exchange": pa.array([e.buy_exchange for e in events], pa.string()),
+            "sell_exchange": pa.array([e.sell_exchange for e in events], pa.string()),
+            "opened_at": pa.array([e.opened_at for e in events], pa.int64()),
+            "closed_at": pa.array([e.closed_at for e in events], pa.int64()),
+            "duration_ms": pa.array([e.duration_ms for e in events], pa.float64()),
+            "entry_edge_bps": pa.array([e.entry_edge_bps for e in events], pa.float64()),
+            "peak_edge_bps": pa.array([e.peak_edge_bps for e in events], pa.float64()),
+            "updates": pa.array([e.updates for e in events], pa.int64()),
+        })
+
+def summarize_arbitrage(table: pa.Table) -> pd.DataFrame:
+    """Per symbol and venue pair: opportunity count, duration percentiles and edges."""
+    df = table.to_pandas()
+    columns = ["symbol", "buy_exchange", "sell_exchange", "count", "p50_duration_ms", "p99_duration_ms",
+               "max_duration_ms", "mean_entry_bps", "max_peak_bps"]
+    if df.empty:
+        return pd.DataFrame(columns=columns)
+    grouped = df.groupby(["symbol", "buy_exchange", "sell_exchange"])
+    out = grouped.agg(
+        count=("duration_ms", "size"),
+        p50_duration_ms=("duration_ms", "median"),
+        p99_duration_ms=("duration_ms", lambda d: d.quantile(0.99)),
+        max_duration_ms=("duration_ms", "max"),
+        mean_entry_bps=("entry_edge_bps", "mean"),
+        max_peak_bps=("peak_edge_bps", "max"),
+    ).reset_index()
+    return out[columns].sort_values("count", ascending=False).reset_index(drop=True)
@@ -0,0 +1,136 @@
+from dataclasses import fields
+from typing import Dict, List, Optional
+import numpy as np
+import pyarrow as pa
+from datalab.collector.exchange import StandardizedTick
+
+# Column layout mirrors StandardizedTick; string fields are dictionary-encoded
+CATEGORY_FIELDS = ("exchange", "symbol")
+INT_FIELDS = ("timestamp", "exchange_timestamp", "sequence")
+# Optional integer fields store this sentinel for None and become nulls in Arrow
+NULL_INT = np.iinfo(np.int64).min
+FIELD_DTYPES = {
+    f.name: (np.int32 if f.name in CATEGORY_FIELDS else np.int64 if f.name in INT_FIELDS else np.float64)
+    for f in fields(StandardizedTick)
+}
+
+class TickDictionary:
+    """
+    Maps exchange/symbol strings to small integer codes.
+
+    Shared between buffers so codes stay stable across flushes.
+    """
+    def __init__(self):
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def encode(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self._codes[value] = code
+            self.values.append(value)
+        return code
+
+class TickBuffer:
+    """
+    Preallocated columnar ring buffer of ticks.
+
+    Holds one NumPy array per StandardizedTick field. When full, new ticks
+    overwrite the oldest ones (like deque(maxlen=...)) and are counted in
+    `dropped`. to_arrow() wraps the arrays without copying the data.
+    """
+    def __init__(self, capacity: int, dictionaries: Optional[Dict[str, TickDictionary]] = None):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.dictionaries = dictionaries or {name: TickDictionary() for name in CATEGORY_FIELDS}
+        self.columns: Dict[str, np.ndarray] = {
+            name: np.empty(capacity, dtype=dtype) for name, dtype in FIELD_DTYPES.items()
+        }
+        self._start = 0
+        self._count = 0
+        self.dropped = 0
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, np.ndarray], dictionaries: Dict[str, TickDictionary]) -> "TickBuffer":
+        """Build a full buffer from per-field arrays of equal length (e.g. replayed ticks)."""
+        count = len(columns["timestamp"])
+        buffer = cls(max(count, 1), dictionaries)
+        for name in FIELD_DTYPES:
+            buffer.columns[name][:count] = columns[name]
+        buffer._count = count
+        return buffer
+
+    def __len__(self) -> int:
+        return self._count
+
+    def is_full(self) -> bool:
+        return self._count >= self.capacity
+
+    def append(self, tick: StandardizedTick, latency_ms: Optional[float] = None):
+        """
+        Write a tick's fields straight into the column arrays.
+
+        latency_ms, if given, overrides tick.latency_ms.
+        """
+        if self._count < self.capacity:
+            pos = (self._start + self._count) % self.capacity
+            self._count += 1
+        else:
+            pos = self._start
+            self._start = (self._start + 1) % self.capacity
+            self.dropped += 1
+
+        cols = self.columns
+        cols["timestamp"][pos] = tick.timestamp
+        cols["exchange"][pos] = self.dictionaries["exchange"].encode(tick.exchange)
+        cols["symbol"][pos] = self.dictionaries["symbol"].encode(tick.symbol)
+        cols["bid_price"][pos] = tick.bid_price
+        cols["ask_price"][pos] = tick.ask_price
+        cols["spread_10k"][pos] = tick.spread_10k
+        cols["spread_50k"][pos] = tick.spread_50k
+        cols["spread_100k"][pos] = tick.spread_100k
+        cols["spread_500k"][pos] = tick.spread_500k
+        cols["liquidity_bid"][pos] = tick.liquidity_bid
+        cols["liquidity_ask"][pos] = tick.liquidity_ask
+        if latency_ms is None:
+            latency_ms = tick.latency_ms
+        cols["latency_ms"][pos] = np.nan if latency_ms is None else latency_ms
+        cols["exchange_timestamp"][pos] = NULL_INT if tick.exchange_timestamp is None else tick.exchange_timestamp
+        cols["sequence"][pos] = NULL_INT if tick.sequence is None else tick.sequence
+
+    def clear(self):
+        self._start = 0
+        self._count = 0
+
+    def _segments(self, values: np.ndarray) -> List[np.ndarray]:
+        # One slice if contiguous, two if the ring has wrapped
+        end = self._start + self._count
+        if end <= self.capacity:
+            return [values[self._start:end]]
+        return [values[self._start:], values[:end - self.capacity]]
+
+    def _arrow_column(self, name: str, values: np.ndarray) -> pa.Array:
+        if name in CATEGORY_FIELDS:
+            dictionary = pa.array(self.dictionaries[name].values, type=pa.string())
+            return pa.DictionaryArray.from_arrays(pa.array(values), dictionary)
+        if name == "latency_ms":
+            # NaN marks a missing latency; only the validity bitmap is allocated
+            return pa.array(values, from_pandas=True)
+        if name in ("exchange_timestamp", "sequence"):
+            return pa.array(values, mask=values == NULL_INT)
+        return pa.array(values)
+
+    def to_arrow(self) -> pa.Table:
+        """
+        Return the buffered ticks as an Arrow table (oldest first).
+
+        Column data is not copied, so the buffer must not be written to while
+        the table is in use.
+        """
+        columns = {}
+        for name, values in self.columns.items():
+            chunks = [self._arrow_column(name, seg) for seg in self._segments(values)]
+            columns[name] = pa.chunked_array(chunks)
+        return pa.table(columns)
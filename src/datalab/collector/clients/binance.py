@@ -1,27 +1,32 @@
 import asyncio
-import json
 import logging
 import time
 import aiohttp
-from typing import List, AsyncGenerator
+from typing import Dict, List, AsyncGenerator
 from datalab.collector.exchange import Exchange, StandardizedTick
+from datalab.collector.orderbook import OrderBook
+from datalab.collector.decoding import BookLevels, get_decoder, BINANCE_DEPTH_SUFFIX
 
 logger = logging.getLogger(__name__)
 
 class BinanceExchange(Exchange):
-    WS_BASE_URL = "wss://stream.binance.com:9443/ws"
+    # Combined-stream endpoint: every message is wrapped as {"stream": ..., "data": ...}
+    WS_BASE_URL = "wss://stream.binance.com:9443/stream"
+    # Binance caps a connection at 1024 streams; each symbol uses bookTicker + depth
+    MAX_STREAMS_PER_CONNECTION = 1024
+    STREAMS_PER_SYMBOL = 2
 
-    def __init__(self, symbols: List[str], api_key: str = None, api_secret: str = None):
+    def __init__(self, symbols: List[str], api_key: str = None, api_secret: str = None, decoder: str = "auto"):
         super().__init__("binance", symbols, api_key, api_secret)
-        self.session = None
-        self.ws = None
+        self.books: Dict[str, OrderBook] = {}
+        self.decoder = get_decoder(decoder)
 
     async def connect(self):
         # Binance streams are often part of URL
         # e.g. /ws/btcusdt@depth5
         # But for multi-stream we subscribe after connect
-        self.session = aiohttp.ClientSession()
-        self.ws = await self.session.ws_connect(self.WS_BASE_URL)
+        session = self._get_session()
+        self.ws = await session.ws_connect(self.WS_BASE_URL)
         logger.info("Connected to Binance WebSocket")
 
     async def subscribe(self, symbols: List[str]):
@@ -29,7 +34,12 @@ class BinanceExchange(Exchange):
             raise RuntimeError("WebSocket not connected")
         
         # Convert symbols to binance format (lowercase, no hyphen)
-        params = [f"{s.lower().replace('-', '')}@bookTicker" for s in symbols]
+        # bookTicker gives real-time best bid/ask, partial depth gives the levels behind it
+        params = []
+        for s in symbols:
+            stream = s.lower().replace('-', '')
+            params.append(f"{stream}@bookTicker")
+            params.append(f"{stream}{BINANCE_DEPTH_SUFFIX}")
         
         msg = {
             "method": "SUBSCRIBE",
@@ -46,30 +56,42 @@ class BinanceExchange(Exchange):
         try:
             async for msg in self.ws:
                 if msg.type == aiohttp.WSMsgType.TEXT:
-                    data = json.loads(msg.data)
-                    # Handle bookTicker event
-                    # {"u":400900217,"s":"BNBBTC","b":"25.35190000","B":"31.21000000","a":"25.36520000","A":"40.66000000"}
-                    if "s" in data and "b" in data and "a" in data:
-                        bid = float(data["b"])
-                        ask = float(data["a"])
-                        
-                        yield StandardizedTick(
-                            timestamp=time.time_ns(),
-                            exchange=self.name,
-                            symbol=data["s"],
-                            bid_price=bid,
-                            ask_price=ask,
-                            spread_10k=ask - bid, # Placeholder
-                            spread_50k=ask - bid,
-                            spread_100k=ask - bid,
-                            spread_500k=ask - bid,
-                            liquidity_bid=float(data["B"]),
-                            liquidity_ask=float(data["A"])
-                        )
+                    received = time.time_ns()
+                    try:
+                        update = self.decoder.binance(msg.data)
+                    except (ValueError, KeyError, TypeError) as e:
+                        logger.debug(f"Skipping undecodable Binance message: {e}")
+                        continue
+                    if update is None:
+                        continue
+                    
+                    book = self._book(update.symbol)
+                    if isinstance(update, BookLevels):
+                        book.apply_snapshot(update.bids, update.asks)
+                        sequence = update.offset
+                    elif book.apply_top(update.bid, update.bid_size, update.ask, update.ask_size):
+                        sequence = update.update_id
+                    else:
+                        continue
+                    
+                    # Event time (ms) is only present on some streams (e.g. futures)
+                    event_ns = update.event_time * 1_000_000 if update.event_time is not None else None
+                    tick = book.tick(self.name, received, event_ns, sequence)
+                    if tick is not None:
+                        yield tick
                 elif msg.type == aiohttp.WSMsgType.ERROR:
                     break
         except Exception as e:
             logger.error(f"Error in Binance listen: {e}")
         finally:
-            if self.session:
-                await self.session.close()
+            await self.close()
+
+    def reset(self):
+        super().reset()
+        self.books = {}
+
+    def _book(self, symbol: str) -> OrderBook:
+        book = self.books.get(symbol)
+        if book is None:
+            book = self.books[symbol] = OrderBook(symbol)
+        return book
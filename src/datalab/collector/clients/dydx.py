@@ -1,25 +1,28 @@
 import asyncio
-import json
 import logging
 import time
 import aiohttp
-from typing import List, AsyncGenerator
+from typing import Dict, List, AsyncGenerator
 from datalab.collector.exchange import Exchange, StandardizedTick
+from datalab.collector.orderbook import OrderBook
+from datalab.collector.decoding import get_decoder
 
 logger = logging.getLogger(__name__)
 
 class DydxExchange(Exchange):
     WS_URL = "wss://api.dydx.exchange/v3/ws"
+    # No hard cap, but v3_orderbook deltas are heavy; spread markets over several sockets
+    MAX_STREAMS_PER_CONNECTION = 20
 
-    def __init__(self, symbols: List[str], api_key: str = None, api_secret: str = None):
+    def __init__(self, symbols: List[str], api_key: str = None, api_secret: str = None, decoder: str = "auto"):
         super().__init__("dydx", symbols, api_key, api_secret)
-        self.session = None
-        self.ws = None
+        self.books: Dict[str, OrderBook] = {}
+        self.decoder = get_decoder(decoder)
 
     async def connect(self):
-        self.session = aiohttp.ClientSession()
+        session = self._get_session()
         try:
-            self.ws = await self.session.ws_connect(self.WS_URL)
+            self.ws = await session.ws_connect(self.WS_URL)
             logger.info("Connected to dYdX WebSocket")
         except Exception as e:
             logger.error(f"Failed to connect to dYdX: {e}")
@@ -47,36 +50,41 @@ class DydxExchange(Exchange):
         try:
             async for msg in self.ws:
                 if msg.type == aiohttp.WSMsgType.TEXT:
-                    data = json.loads(msg.data)
-                    if data.get("type") == "channel_data":
-                        # Parse orderbook data
-                        # This is simplified for prototype
-                        contents = data.get("contents", {})
-                        bids = contents.get("bids", [])
-                        asks = contents.get("asks", [])
-                        
-                        if bids and asks:
-                            bid_price = float(bids[0]["price"])
-                            ask_price = float(asks[0]["price"])
-                            
-                            yield StandardizedTick(
-                                timestamp=time.time_ns(),
-                                exchange=self.name,
-                                symbol=data.get("id", "unknown"),
-                                bid_price=bid_price,
-                                ask_price=ask_price,
-                                spread_10k=abs(ask_price - bid_price), # Placeholder calculation
-                                spread_50k=abs(ask_price - bid_price),
-                                spread_100k=abs(ask_price - bid_price),
-                                spread_500k=abs(ask_price - bid_price),
-                                liquidity_bid=100000.0, # Placeholder
-                                liquidity_ask=100000.0
-                            )
+                    received = time.time_ns()
+                    try:
+                        update = self.decoder.dydx(msg.data)
+                    except (ValueError, KeyError, TypeError) as e:
+                        logger.debug(f"Skipping undecodable dYdX message: {e}")
+                        continue
+                    if update is None:
+                        continue
+
+                    if update.is_snapshot:
+                        book = OrderBook(update.symbol)
+                        book.apply_snapshot(update.bids, update.asks)
+                        self.books[update.symbol] = book
+                        # Snapshot levels carry their own offsets; the newest one sequences the book
+                        sequence = max((l[2] for l in update.bids + update.asks if len(l) > 2), default=None)
+                    else:
+                        book = self.books.get(update.symbol)
+                        if book is None:
+                            continue
+                        if not book.apply_delta(update.bids, update.asks, update.offset):
+                            continue
+                        sequence = update.offset
+
+                    # v3_orderbook messages carry offsets but no event time
+                    tick = book.tick(self.name, received, sequence=sequence)
+                    if tick is not None:
+                        yield tick
                 elif msg.type == aiohttp.WSMsgType.ERROR:
                     logger.error("WebSocket connection closed with error")
                     break
         except Exception as e:
             logger.error(f"Error in dYdX listen: {e}")
         finally:
-            if self.session:
-                await self.session.close()
+            await self.close()
+
+    def reset(self):
+        super().reset()
+        self.books = {}
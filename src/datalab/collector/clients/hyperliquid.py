@@ -3,6 +3,7 @@ import time
 import random
 from typing import List, AsyncGenerator
 from datalab.collector.exchange import Exchange, StandardizedTick
+from datalab.collector.orderbook import OrderBook
 
 class SimulatedExchange(Exchange):
     """
@@ -10,6 +11,8 @@ class SimulatedExchange(Exchange):
     """
     def __init__(self, symbols: List[str], api_key: str = None, api_secret: str = None):
         super().__init__("simulated", symbols, api_key, api_secret)
+        self.books = {symbol: OrderBook(symbol) for symbol in symbols}
+        self.sequence = 0
 
     async def connect(self):
         pass
@@ -23,17 +26,15 @@ class SimulatedExchange(Exchange):
                 price = 100.0 + random.random() * 10
                 spread = random.random() * 0.5
                 
-                yield StandardizedTick(
-                    timestamp=time.time_ns(),
-                    exchange=self.name,
-                    symbol=symbol,
-                    bid_price=price,
-                    ask_price=price + spread,
-                    spread_10k=spread,
-                    spread_50k=spread * 1.1,
-                    spread_100k=spread * 1.2,
-                    spread_500k=spread * 1.5,
-                    liquidity_bid=1000000.0,
-                    liquidity_ask=1000000.0
+                # Synthetic 20-level ladder around the mid
+                step = 0.01
+                book = self.books[symbol]
+                book.apply_snapshot(
+                    [(price - i * step, random.random() * 2000) for i in range(20)],
+                    [(price + spread + i * step, random.random() * 2000) for i in range(20)]
                 )
+                # Pretend the update left the venue 1-5ms before it was received
+                received = time.time_ns()
+                self.sequence += 1
+                yield book.tick(self.name, received, received - random.randint(1_000_000, 5_000_000), self.sequence)
             await asyncio.sleep(0.1) # 100ms
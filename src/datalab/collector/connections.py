@@ -0,0 +1,56 @@
+import logging
+import ssl
+from typing import List, Optional
+import aiohttp
+from datalab.collector.exchange import Exchange
+
+logger = logging.getLogger(__name__)
+
+class ConnectionManager:
+    """
+    Owns the process-wide aiohttp session and shards exchanges into connections.
+
+    All connectors share one session, so DNS results (cached for
+    dns_cache_ttl seconds) and the TLS context are reused across sockets and
+    reconnects. Each exchange is split into shards that respect the venue's
+    per-connection stream limit; every shard owns its own WebSocket, so a drop
+    only resubscribes the symbols on that shard.
+    """
+    def __init__(self, dns_cache_ttl: int = 300):
+        self.dns_cache_ttl = dns_cache_ttl
+        self._ssl_context = ssl.create_default_context()
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def session(self) -> aiohttp.ClientSession:
+        """Return the shared session, creating it on first use (inside the event loop)."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=0,
+                ttl_dns_cache=self.dns_cache_ttl,
+                ssl=self._ssl_context,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    def shards(self, exchange: Exchange, symbols_per_connection: Optional[int] = None) -> List[Exchange]:
+        """
+        Split an exchange into connectors of at most symbols_per_connection
+        symbols (default: the venue limit), all attached to the shared session.
+        """
+        per_connection = symbols_per_connection or exchange.symbols_per_connection()
+        symbols = list(exchange.symbols)
+        if not per_connection or len(symbols) <= per_connection:
+            shards = [exchange]
+        else:
+            shards = [exchange.shard(symbols[i:i + per_connection]) for i in range(0, len(symbols), per_connection)]
+            logger.info(f"Sharding {exchange.name}: {len(symbols)} symbols over {len(shards)} connections")
+
+        session = self.session()
+        for shard in shards:
+            shard.attach_session(session)
+        return shards
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
@@ -0,0 +1,233 @@
+import json
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None
+
+BINANCE_DEPTH_SUFFIX = "@depth20@100ms"
+
+class BookTop(NamedTuple):
+    symbol: str
+    bid: float
+    bid_size: float
+    ask: float
+    ask_size: float
+    update_id: Optional[int] = None
+    event_time: Optional[int] = None  # Venue event time (ms), when the stream carries one
+
+class BookLevels(NamedTuple):
+    symbol: str
+    bids: List[Tuple]  # (price, size) or (price, size, offset)
+    asks: List[Tuple]
+    is_snapshot: bool
+    offset: Optional[int] = None  # Update id / offset, used as the tick sequence number
+    event_time: Optional[int] = None
+
+Update = Union[BookTop, BookLevels]
+
+class StdlibDecoder:
+    """Reference decoder built on json.loads and float()."""
+    name = "stdlib"
+
+    def loads(self, raw: Union[str, bytes]) -> Any:
+        return json.loads(raw)
+
+    def binance(self, raw: Union[str, bytes]) -> Optional[Update]:
+        message = self.loads(raw)
+        stream = message.get("stream")
+        data = message.get("data")
+        if not stream or not data:
+            return None
+        if stream.endswith(BINANCE_DEPTH_SUFFIX):
+            # {"lastUpdateId":160,"bids":[["0.0024","10"]],"asks":[["0.0026","100"]]}
+            return BookLevels(
+                stream.split("@", 1)[0].upper(),
+                [(float(p), float(q)) for p, q in data.get("bids", [])],
+                [(float(p), float(q)) for p, q in data.get("asks", [])],
+                True,
+                data.get("lastUpdateId"),
+                data.get("E"),
+            )
+        if "s" in data and "b" in data and "a" in data:
+            # {"u":400900217,"s":"BNBBTC","b":"25.35190000","B":"31.21000000","a":"25.36520000","A":"40.66000000"}
+            return BookTop(data["s"], float(data["b"]), float(data["B"]), float(data["a"]), float(data["A"]),
+                           data.get("u"), data.get("E"))
+        return None
+
+    def dydx(self, raw: Union[str, bytes]) -> Optional[Update]:
+        data = self.loads(raw)
+        msg_type = data.get("type")
+        symbol = data.get("id", "unknown")
+        contents = data.get("contents", {})
+        if msg_type == "subscribed":
+            # Initial snapshot: levels are {"price", "size", "offset"} objects
+            return BookLevels(
+                symbol,
+                [(float(l["price"]), float(l["size"]), int(l.get("offset", 0))) for l in contents.get("bids", [])],
+                [(float(l["price"]), float(l["size"]), int(l.get("offset", 0))) for l in contents.get("asks", [])],
+                True,
+            )
+        if msg_type == "channel_data":
+            # Deltas: levels are [price, size] pairs, size 0 removes the level
+            return BookLevels(
+                symbol,
+                [(float(p), float(s)) for p, s in contents.get("bids", [])],
+                [(float(p), float(s)) for p, s in contents.get("asks", [])],
+                False,
+                int(contents["offset"]) if "offset" in contents else None,
+            )
+        return None
+
+class OrjsonDecoder(StdlibDecoder):
+    """Same parsing as StdlibDecoder with orjson for the JSON step."""
+    name = "orjson"
+
+    def loads(self, raw: Union[str, bytes]) -> Any:
+        return orjson.loads(raw)
+
+if msgspec is not None:
+    # Typed schemas; strict=False lets msgspec parse the string-encoded numbers directly
+    class _BinanceEnvelope(msgspec.Struct):
+        stream: str = ""
+        data: msgspec.Raw = msgspec.Raw(b"null")
+
+    class _BinanceBookTicker(msgspec.Struct):
+        s: str
+        b: float
+        B: float
+        a: float
+        A: float
+        u: Optional[int] = None
+        E: Optional[int] = None
+
+    class _BinanceDepth(msgspec.Struct):
+        bids: List[Tuple[float, float]] = []
+        asks: List[Tuple[float, float]] = []
+        lastUpdateId: Optional[int] = None
+        E: Optional[int] = None
+
+    class _DydxEnvelope(msgspec.Struct):
+        type: str = ""
+        id: str = "unknown"
+        contents: msgspec.Raw = msgspec.Raw(b"{}")
+
+    class _DydxLevel(msgspec.Struct):
+        price: float
+        size: float
+        offset: int = 0
+
+    class _DydxSnapshot(msgspec.Struct):
+        bids: List[_DydxLevel] = []
+        asks: List[_DydxLevel] = []
+
+    class _DydxDelta(msgspec.Struct):
+        bids: List[Tuple[float, float]] = []
+        asks: List[Tuple[float, float]] = []
+        offset: Optional[int] = None
+
+class MsgspecDecoder:
+    """Decodes frames directly into typed msgspec structs."""
+    name = "msgspec"
+
+    def __init__(self):
+        json_decoder = msgspec.json.Decoder
+        self._binance_envelope = json_decoder(_BinanceEnvelope)
+        self._binance_ticker = json_decoder(_BinanceBookTicker, strict=False)
+        self._binance_depth = json_decoder(_BinanceDepth, strict=False)
+        self._dydx_envelope = json_decoder(_DydxEnvelope)
+        self._dydx_snapshot = json_decoder(_DydxSnapshot, strict=False)
+        self._dydx_delta = json_decoder(_DydxDelta, strict=False)
+
+    def binance(self, raw: Union[str, bytes]) -> Optional[Update]:
+        envelope = self._binance_envelope.decode(raw)
+        stream = envelope.stream
+        if not stream:
+            return None
+        if stream.endswith(BINANCE_DEPTH_SUFFIX):
+            depth = self._binance_depth.decode(envelope.data)
+            return BookLevels(stream.split("@", 1)[0].upper(), depth.bids, depth.asks, True, depth.lastUpdateId, depth.E)
+        if stream.endswith("@bookTicker"):
+            t = self._binance_ticker.decode(envelope.data)
+            return BookTop(t.s, t.b, t.B, t.a, t.A, t.u, t.E)
+        return None
+
+    def dydx(self, raw: Union[str, bytes]) -> Optional[Update]:
+        envelope = self._dydx_envelope.decode(raw)
+        if envelope.type == "subscribed":
+            snap = self._dydx_snapshot.decode(envelope.contents)
+            return BookLevels(
+                envelope.id,
+                [(l.price, l.size, l.offset) for l in snap.bids],
+                [(l.price, l.size, l.offset) for l in snap.asks],
+                True,
+            )
+        if envelope.type == "channel_data":
+            delta = self._dydx_delta.decode(envelope.contents)
+            return BookLevels(envelope.id, delta.bids, delta.asks, False, delta.offset)
+        return None
+
+_DECODERS: Dict[str, Callable[[], Any]] = {"stdlib": StdlibDecoder}
+if orjson is not None:
+    _DECODERS["orjson"] = OrjsonDecoder
+if msgspec is not None:
+    _DECODERS["msgspec"] = MsgspecDecoder
+
+def available_decoders() -> List[str]:
+    return list(_DECODERS)
+
+def get_decoder(name: str = "auto"):
+    """
+    Return a decoder by name ('msgspec', 'orjson', 'stdlib').
+
+    Decoders turn a raw frame into a BookTop or BookLevels update with numeric
+    fields already parsed. 'auto' picks the fastest installed one; stdlib is
+    always available.
+    """
+    if name == "auto":
+        for candidate in ("msgspec", "orjson", "stdlib"):
+            if candidate in _DECODERS:
+                return _DECODERS[candidate]()
+    if name not in _DECODERS:
+        raise ValueError(f"Decoder '{name}' is not available (installed: {available_decoders()})")
+    return _DECODERS[name]()
+
+SAMPLE_MESSAGES = {
+    "binance_bookTicker": json.dumps({"stream": "bnbbtc@bookTicker", "data": {
+        "u": 400900217, "s": "BNBBTC", "b": "25.35190000", "B": "31.21000000", "a": "25.36520000", "A": "40.66000000"}}),
+    "binance_depth20": json.dumps({"stream": "btcusdt@depth20@100ms", "data": {
+        "lastUpdateId": 160,
+        "bids": [[f"{30000 - i * 0.1:.2f}", "1.5"] for i in range(20)],
+        "asks": [[f"{30000.1 + i * 0.1:.2f}", "2.0"] for i in range(20)]}}),
+    "dydx_delta": json.dumps({"type": "channel_data", "id": "BTC-USD", "channel": "v3_orderbook", "contents": {
+        "offset": "178", "bids": [["30000.5", "0.25"]], "asks": [["30001", "0"], ["30002", "1.1"]]}}),
+}
+
+def benchmark(n: int = 200_000, decoders: Optional[Sequence[str]] = None) -> Dict[str, Dict[str, float]]:
+    """
+    Measure messages/sec for each decoder on the sample messages.
+
+    Run as `python -m datalab.collector.decoding`.
+    """
+    results: Dict[str, Dict[str, float]] = {}
+    for name in decoders or available_decoders():
+        decoder = get_decoder(name)
+        results[name] = {}
+        for label, raw in SAMPLE_MESSAGES.items():
+            decode = decoder.dydx if label.startswith("dydx") else decoder.binance
+            start = time.perf_counter()
+            for _ in range(n):
+                decode(raw)
+            results[name][label] = n / (time.perf_counter() - start)
+    return results
+
+if __name__ == "__main__":
+    for name, rates in benchmark().items():
+        print(f"{name:8s} " + "  ".join(f"{label}={rate:,.0f}/s" for label, rate in rates.items()))
@@ -1,13 +1,15 @@
+import copy
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from typing import List, AsyncGenerator, Dict, Optional
+import aiohttp
 
 @dataclass(frozen=True)
 class StandardizedTick:
     """
     Represents a normalized snapshot of market state from any exchange.
     """
-    timestamp: int  # Unix timestamp of receipt (nanoseconds)
+    timestamp: int  # Unix timestamp of local receipt (nanoseconds)
     exchange: str   # Normalized exchange name
     symbol: str     # Normalized symbol pair
     bid_price: float
@@ -21,17 +23,62 @@ class StandardizedTick:
     
     # Optional metadata for debugging/latency tracking
     latency_ms: Optional[float] = None
+    exchange_timestamp: Optional[int] = None  # Venue event time (nanoseconds), if the feed provides one
+    sequence: Optional[int] = None  # Venue update id / offset of the update that produced this tick
 
 class Exchange(ABC):
     """
     Interface for exchange connectors.
     """
+    # Venue stream limit per WebSocket connection (None: one connection carries every symbol)
+    MAX_STREAMS_PER_CONNECTION: Optional[int] = None
+    # Streams each subscribed symbol consumes
+    STREAMS_PER_SYMBOL = 1
     
     def __init__(self, name: str, symbols: List[str], api_key: str = None, api_secret: str = None):
         self.name = name
         self.symbols = symbols
         self.api_key = api_key
         self.api_secret = api_secret
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.ws = None
+        self._owns_session = False
+
+    def attach_session(self, session: aiohttp.ClientSession):
+        """Use a shared session instead of creating (and closing) a private one."""
+        self.session = session
+        self._owns_session = False
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession()
+            self._owns_session = True
+        return self.session
+
+    async def close(self):
+        """Close the WebSocket, and the session if this connector owns it."""
+        if self.ws is not None and not self.ws.closed:
+            await self.ws.close()
+        self.ws = None
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def reset(self):
+        """Drop per-connection state before a (re)connect."""
+        self.ws = None
+
+    def symbols_per_connection(self) -> Optional[int]:
+        if self.MAX_STREAMS_PER_CONNECTION is None:
+            return None
+        return max(1, self.MAX_STREAMS_PER_CONNECTION // self.STREAMS_PER_SYMBOL)
+
+    def shard(self, symbols: List[str]) -> "Exchange":
+        """Return a copy of this connector for a subset of symbols, with its own connection."""
+        clone = copy.copy(self)
+        clone.symbols = list(symbols)
+        clone.reset()
+        return clone
 
     @abstractmethod
     async def connect(self):
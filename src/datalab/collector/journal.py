@@ -0,0 +1,237 @@
+import asyncio
+import glob
+import logging
+import mmap
+import os
+import struct
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pyarrow as pa
+from datalab.collector.buffer import CATEGORY_FIELDS, NULL_INT, TickBuffer, TickDictionary
+from datalab.collector.exchange import StandardizedTick
+from datalab.utils.storage import PartitionedParquetWriter
+
+logger = logging.getLogger(__name__)
+
+# One fixed-width little-endian record per tick. timestamp is stored last:
+# a zero timestamp marks the unwritten tail of a preallocated segment.
+JOURNAL_DTYPE = np.dtype([
+    ("exchange", "<i4"),
+    ("symbol", "<i4"),
+    ("bid_price", "<f8"),
+    ("ask_price", "<f8"),
+    ("spread_10k", "<f8"),
+    ("spread_50k", "<f8"),
+    ("spread_100k", "<f8"),
+    ("spread_500k", "<f8"),
+    ("liquidity_bid", "<f8"),
+    ("liquidity_ask", "<f8"),
+    ("latency_ms", "<f8"),
+    ("exchange_timestamp", "<i8"),
+    ("sequence", "<i8"),
+    ("timestamp", "<i8"),
+])
+_RECORD = struct.Struct("<ii9dqqq")
+assert _RECORD.size == JOURNAL_DTYPE.itemsize
+
+NAMES_FILE = "names.tsv"
+SEGMENT_GLOB = "segment-*.wal"
+
+class TickJournal:
+    """
+    Append-only write-ahead journal of collected ticks.
+
+    Ticks are packed into fixed-width records in a memory-mapped, preallocated
+    segment file as they arrive, so they survive a crash of the collector
+    process without any syscall on the tick path. Durability against OS
+    crashes comes from group commit: a background task fsyncs the segments
+    every sync_interval_ms (one fsync for all ticks since the last one).
+
+    Each flushed buffer seals its segment(s); the collector deletes them once
+    every parquet file holding the buffer's ticks has been closed. Segments
+    left behind by a crash are turned back into parquet by recover_journal()
+    on the next start. Exchange and symbol names are journalled once, in
+    names.tsv, as they are first seen.
+
+    Args:
+        directory: Journal directory (one per collector process).
+        capacity: Records per segment (the collector uses its buffer_size).
+        dictionaries: Exchange/symbol dictionaries shared with the tick buffers.
+        sync_interval_ms: Group-commit interval.
+    """
+    def __init__(self, directory: str, capacity: int, dictionaries: Dict[str, TickDictionary],
+                 sync_interval_ms: float = 100.0):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.directory = directory
+        self.capacity = capacity
+        self.dictionaries = dictionaries
+        self.sync_interval_s = sync_interval_ms / 1000.0
+        self._names = None
+        self._named = {name: 0 for name in CATEGORY_FIELDS}
+        self._segment = 0
+        self._path: Optional[str] = None
+        self._fd = -1
+        self._mm: Optional[mmap.mmap] = None
+        self._pos = 0
+        self._unsealed: List[str] = []
+        # Rotated segments still to be fsynced and unmapped
+        self._retired: List[Tuple[int, mmap.mmap]] = []
+        self._dirty = False
+        self.syncs = 0
+
+    def open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        existing = sorted(glob.glob(os.path.join(self.directory, SEGMENT_GLOB)))
+        if existing:
+            raise RuntimeError(f"Journal {self.directory} has unrecovered segments; run recover_journal() first")
+        self._names = open(os.path.join(self.directory, NAMES_FILE), "w")
+        self._named = {name: 0 for name in CATEGORY_FIELDS}
+        self._rotate()
+
+    def _rotate(self):
+        if self._mm is not None:
+            self._retired.append((self._fd, self._mm))
+        self._segment += 1
+        self._path = os.path.join(self.directory, f"segment-{self._segment:012d}.wal")
+        self._fd = os.open(self._path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        os.ftruncate(self._fd, self.capacity * _RECORD.size)
+        self._mm = mmap.mmap(self._fd, self.capacity * _RECORD.size)
+        self._pos = 0
+        self._unsealed.append(self._path)
+
+    def _code(self, field: str, value: str) -> int:
+        dictionary = self.dictionaries[field]
+        code = dictionary.encode(value)
+        if code >= self._named[field]:
+            # New names reach the page cache before any record that uses them
+            for name in dictionary.values[self._named[field]:]:
+                self._names.write(f"{field}\t{name}\n")
+            self._names.flush()
+            self._named[field] = len(dictionary.values)
+        return code
+
+    def append(self, tick: StandardizedTick, latency_ms: Optional[float] = None):
+        """Journal one tick (latency_ms overrides tick.latency_ms, as in TickBuffer.append)."""
+        if self._pos >= self.capacity:
+            self._rotate()
+        if latency_ms is None:
+            latency_ms = tick.latency_ms
+        _RECORD.pack_into(
+            self._mm, self._pos * _RECORD.size,
+            self._code("exchange", tick.exchange),
+            self._code("symbol", tick.symbol),
+            tick.bid_price, tick.ask_price,
+            tick.spread_10k, tick.spread_50k, tick.spread_100k, tick.spread_500k,
+            tick.liquidity_bid, tick.liquidity_ask,
+            np.nan if latency_ms is None else latency_ms,
+            NULL_INT if tick.exchange_timestamp is None else tick.exchange_timestamp,
+            NULL_INT if tick.sequence is None else tick.sequence,
+            tick.timestamp,
+        )
+        self._pos += 1
+        self._dirty = True
+
+    def seal(self) -> List[str]:
+        """Close the ticks journalled since the last seal; returns their segment paths for release()."""
+        sealed = self._unsealed
+        self._unsealed = []
+        self._rotate()
+        return sealed
+
+    def release(self, segments: List[str]):
+        """Delete sealed segments whose ticks are in closed parquet files (may run on any thread)."""
+        for path in segments:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    async def sync(self):
+        """Group commit: fsync the names file and every segment written since the last sync."""
+        if not self._dirty and not self._retired:
+            return
+        self._dirty = False
+        retired, self._retired = self._retired, []
+        fds = [self._names.fileno(), *(fd for fd, _ in retired), self._fd]
+        await asyncio.to_thread(_fsync_all, fds)
+        self.syncs += 1
+        for fd, mm in retired:
+            mm.close()
+            os.close(fd)
+
+    async def run(self):
+        """Group-commit loop; runs until cancelled."""
+        while True:
+            await asyncio.sleep(self.sync_interval_s)
+            try:
+                await self.sync()
+            except OSError as e:
+                logger.error(f"Journal sync failed: {e}")
+
+    async def close(self):
+        """Final sync, then unmap everything. Segments not yet released stay for recovery."""
+        if self._mm is None:
+            return
+        await self.sync()
+        self._mm.close()
+        os.close(self._fd)
+        self._mm = None
+        self._fd = -1
+        if self._pos == 0:
+            self.release([self._path])
+        self._names.close()
+        self._names = None
+        if not glob.glob(os.path.join(self.directory, SEGMENT_GLOB)):
+            os.remove(os.path.join(self.directory, NAMES_FILE))
+
+def _fsync_all(fds: List[int]):
+    for fd in fds:
+        os.fsync(fd)
+
+def _read_names(directory: str) -> Dict[str, TickDictionary]:
+    dictionaries = {name: TickDictionary() for name in CATEGORY_FIELDS}
+    path = os.path.join(directory, NAMES_FILE)
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                field, sep, value = line.rstrip("\n").partition("\t")
+                if sep and field in dictionaries:
+                    dictionaries[field].encode(value)
+    return dictionaries
+
+def read_segment(path: str, dictionaries: Dict[str, TickDictionary]) -> pa.Table:
+    """Ticks of one journal segment as an Arrow table in the collector's layout."""
+    records = np.fromfile(path, dtype=JOURNAL_DTYPE)
+    written = records["timestamp"] != 0
+    count = len(records) if written.all() else int(np.argmin(written))
+    records = records[:count]
+    buffer = TickBuffer.from_columns({name: records[name] for name in JOURNAL_DTYPE.names}, dictionaries)
+    return buffer.to_arrow()
+
+def recover_journal(directory: str, dataset: PartitionedParquetWriter) -> int:
+    """
+    Replay segments left by an unclean shutdown into dataset, oldest first.
+
+    The dataset is closed before any segment is deleted, so the recovered
+    rows are in finished parquet files first; a crash during recovery leaves
+    the segments for the next attempt (which may then write them twice).
+    Returns the number of recovered ticks.
+    """
+    segments = sorted(glob.glob(os.path.join(directory, SEGMENT_GLOB)))
+    if not segments:
+        return 0
+    dictionaries = _read_names(directory)
+    recovered = 0
+    for path in segments:
+        table = read_segment(path, dictionaries)
+        if table.num_rows:
+            dataset.write(table)
+            recovered += table.num_rows
+    dataset.close()
+    for path in segments:
+        os.remove(path)
+    names = os.path.join(directory, NAMES_FILE)
+    if os.path.exists(names):
+        os.remove(names)
+    return recovered
@@ -0,0 +1,151 @@
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# Sub-bucket resolution: 2**SUB_BUCKET_BITS linear buckets per power of two,
+# i.e. values are recorded with a relative error below 1 / 2**(SUB_BUCKET_BITS - 1)
+SUB_BUCKET_BITS = 7
+_SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+_HALF = _SUB_BUCKETS >> 1
+
+# Latency kinds recorded by the collector
+FEED = "feed"        # venue event time -> local receipt
+PROCESS = "process"  # local receipt -> handled by the collector
+
+LATENCY_PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+def bucket_index(value: int) -> int:
+    """Log-linear (HDR-style) bucket of a non-negative integer value."""
+    if value < _SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    return _SUB_BUCKETS + (shift - 1) * _HALF + ((value >> shift) - _HALF)
+
+def bucket_bounds(index: int) -> Tuple[int, int]:
+    """Inclusive [lowest, highest] value mapped to a bucket."""
+    if index < _SUB_BUCKETS:
+        return index, index
+    shift = (index - _SUB_BUCKETS) // _HALF + 1
+    mantissa = (index - _SUB_BUCKETS) % _HALF + _HALF
+    return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+class LatencyHistogram:
+    """
+    HDR-style histogram of integer latencies (microseconds).
+
+    Buckets are exact below 128us and log-linear above, so every value is
+    kept to ~1.6% relative precision across any range. Recording is a
+    bit_length, a shift and a dict increment; only non-empty buckets are stored.
+    """
+    __slots__ = ("counts", "count", "min", "max")
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.min: Optional[int] = None
+        self.max = 0
+
+    def record(self, value: int):
+        if value < 0:
+            value = 0
+        index = value if value < _SUB_BUCKETS else bucket_index(value)
+        counts = self.counts
+        counts[index] = counts.get(index, 0) + 1
+        self.count += 1
+        if value > self.max:
+            self.max = value
+        if self.min is None or value < self.min:
+            self.min = value
+
+    def percentile(self, q: float) -> Optional[int]:
+        """Highest value equivalent to the q-th percentile (0-100), or None if empty."""
+        if not self.count:
+            return None
+        rank = max(1, int(np.ceil(q / 100.0 * self.count)))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(bucket_bounds(index)[1], self.max)
+        return self.max
+
+class LatencyRecorder:
+    """
+    Per (exchange, symbol, kind) latency histograms for the current flush interval.
+
+    snapshot() returns the interval's non-empty buckets as an Arrow table and
+    starts a new interval, so each persisted table covers exactly the ticks
+    flushed with it.
+    """
+    def __init__(self):
+        self.histograms: Dict[Tuple[str, str, str], LatencyHistogram] = {}
+        self._interval_start = time.time_ns()
+
+    def record(self, exchange: str, symbol: str, kind: str, latency_ns: int):
+        key = (exchange, symbol, kind)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = LatencyHistogram()
+        histogram.record(latency_ns // 1000)
+
+    def snapshot(self) -> pa.Table:
+        end = time.time_ns()
+        columns: Dict[str, List] = {name: [] for name in (
+            "exchange", "symbol", "kind", "bucket", "lower_us", "upper_us", "count")}
+        for (exchange, symbol, kind), histogram in self.histograms.items():
+            for index, count in histogram.counts.items():
+                lower, upper = bucket_bounds(index)
+                columns["exchange"].append(exchange)
+                columns["symbol"].append(symbol)
+                columns["kind"].append(kind)
+                columns["bucket"].append(index)
+                columns["lower_us"].append(lower)
+                columns["upper_us"].append(upper)
+                columns["count"].append(count)
+        n = len(columns["count"])
+        table = pa.table({
+            "interval_start": pa.array([self._interval_start] * n, type=pa.int64()),
+            "interval_end": pa.array([end] * n, type=pa.int64()),
+            "exchange": pa.array(columns["exchange"], type=pa.string()),
+            "symbol": pa.array(columns["symbol"], type=pa.string()),
+            "kind": pa.array(columns["kind"], type=pa.string()),
+            "bucket": pa.array(columns["bucket"], type=pa.int32()),
+            "lower_us": pa.array(columns["lower_us"], type=pa.int64()),
+            "upper_us": pa.array(columns["upper_us"], type=pa.int64()),
+            "count": pa.array(columns["count"], type=pa.int64()),
+        })
+        self.histograms = {}
+        self._interval_start = end
+        return table
+
+def summarize_latency(table: pa.Table, percentiles: Sequence[float] = LATENCY_PERCENTILES,
+                      by: Iterable[str] = ("exchange", "symbol", "kind")) -> pd.DataFrame:
+    """
+    Merge persisted histogram buckets and report count and percentiles (ms).
+
+    Args:
+        table: Bucket rows as written by LatencyRecorder.snapshot().
+        percentiles: Percentiles to report (0-100).
+        by: Grouping columns; drop 'symbol' to compare venues.
+    """
+    by = list(by)
+    df = table.select(by + ["bucket", "upper_us", "count"]).to_pandas()
+    merged = df.groupby(by + ["bucket", "upper_us"], as_index=False, observed=True)["count"].sum()
+    merged = merged.sort_values(by + ["bucket"])
+
+    rows = []
+    for key, group in merged.groupby(by, sort=True, observed=True):
+        counts = group["count"].to_numpy()
+        cumulative = np.cumsum(counts)
+        total = int(cumulative[-1])
+        row = dict(zip(by, key if isinstance(key, tuple) else (key,)))
+        row["count"] = total
+        uppers = group["upper_us"].to_numpy()
+        for q in percentiles:
+            rank = max(1, int(np.ceil(q / 100.0 * total)))
+            row[f"p{q:g}_ms"] = uppers[np.searchsorted(cumulative, rank)] / 1000.0
+        row["max_ms"] = uppers[-1] / 1000.0
+        rows.append(row)
+    return pd.DataFrame(rows, columns=by + ["count"] + [f"p{q:g}_ms" for q in percentiles] + ["max_ms"])
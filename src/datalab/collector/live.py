@@ -0,0 +1,257 @@
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from aiohttp import web
+from datalab.collector.exchange import StandardizedTick
+
+logger = logging.getLogger(__name__)
+
+# Tick fields kept per series, next to the receive timestamp
+LIVE_FIELDS = ("bid_price", "ask_price", "spread_10k", "spread_50k", "spread_100k", "spread_500k",
+               "liquidity_bid", "liquidity_ask")
+SPREAD_FIELDS = ("spread_10k", "spread_50k", "spread_100k", "spread_500k")
+
+class _Series:
+    """Ring buffer of one (exchange, symbol): sorted timestamps plus one row of LIVE_FIELDS per tick."""
+    __slots__ = ("capacity", "timestamps", "values", "start", "count", "last_ts")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.timestamps = np.empty(capacity, dtype=np.int64)
+        self.values = np.empty((capacity, len(LIVE_FIELDS)), dtype=np.float64)
+        self.start = 0
+        self.count = 0
+        self.last_ts = -(2**63)
+
+    def append(self, timestamp: int, row: Tuple[float, ...]):
+        if self.count < self.capacity:
+            pos = self.count
+            self.count += 1
+        else:
+            pos = self.start
+            self.start = (self.start + 1) % self.capacity
+        # Keep the index sorted if the wall clock steps back
+        if timestamp < self.last_ts:
+            timestamp = self.last_ts
+        self.last_ts = timestamp
+        self.timestamps[pos] = timestamp
+        self.values[pos] = row
+
+    def last(self) -> int:
+        return (self.start + self.count - 1) % self.capacity
+
+    def _segments(self) -> List[slice]:
+        # Physical slices in time order (two once the ring has wrapped)
+        if self.count < self.capacity:
+            return [slice(0, self.count)]
+        return [slice(self.start, self.capacity), slice(0, self.start)]
+
+    def between(self, start: int, end: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Timestamps and rows with start <= timestamp < end, oldest first."""
+        ts, rows = [], []
+        for seg in self._segments():
+            seg_ts = self.timestamps[seg]
+            lo, hi = np.searchsorted(seg_ts, [start, end], side="left")
+            ts.append(seg_ts[lo:hi])
+            rows.append(self.values[seg][lo:hi])
+        return np.concatenate(ts), np.concatenate(rows)
+
+class LiveIndex:
+    """
+    Bounded in-memory time index of recent ticks per (exchange, symbol).
+
+    Each series is a preallocated ring of capacity ticks (the oldest are
+    overwritten), ordered by receive time, so range lookups are two binary
+    searches. Appending costs two array writes per tick.
+
+    Args:
+        capacity: Ticks kept per series.
+    """
+    def __init__(self, capacity: int = 100_000):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._series: Dict[Tuple[str, str], _Series] = {}
+
+    def append(self, tick: StandardizedTick):
+        series = self._series.get((tick.exchange, tick.symbol))
+        if series is None:
+            series = self._series[(tick.exchange, tick.symbol)] = _Series(self.capacity)
+        series.append(tick.timestamp, (
+            tick.bid_price, tick.ask_price, tick.spread_10k, tick.spread_50k, tick.spread_100k,
+            tick.spread_500k, tick.liquidity_bid, tick.liquidity_ask,
+        ))
+
+    def series(self) -> List[Dict[str, Any]]:
+        """Every indexed series with its tick count and time span."""
+        out = []
+        for (exchange, symbol), s in sorted(self._series.items()):
+            first = s.timestamps[s.start if s.count == s.capacity else 0]
+            out.append({"exchange": exchange, "symbol": symbol, "count": s.count,
+                        "first": int(first), "last": int(s.timestamps[s.last()])})
+        return out
+
+    def _select(self, symbol: str, exchange: Optional[str]) -> List[Tuple[str, _Series]]:
+        return [(ex, s) for (ex, sym), s in sorted(self._series.items())
+                if sym == symbol and (exchange is None or ex == exchange)]
+
+    def latest(self, symbol: str, exchange: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Most recent tick of symbol on each exchange (or only on exchange)."""
+        out = []
+        for ex, s in self._select(symbol, exchange):
+            i = s.last()
+            out.append({"exchange": ex, "symbol": symbol, "timestamp": int(s.timestamps[i]),
+                        **dict(zip(LIVE_FIELDS, _json_floats(s.values[i])))})
+        return out
+
+    def range(self, exchange: str, symbol: str, start: int, end: int,
+              limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Ticks of one series with start <= timestamp < end, as columns.
+
+        Args:
+            start: Inclusive lower bound (ns).
+            end: Exclusive upper bound (ns).
+            limit: Return at most this many ticks (the most recent ones);
+                'truncated' tells whether rows were left out.
+        """
+        series = self._series.get((exchange, symbol))
+        if series is None:
+            ts, rows = np.empty(0, dtype=np.int64), np.empty((0, len(LIVE_FIELDS)))
+        else:
+            ts, rows = series.between(start, end)
+        truncated = limit is not None and len(ts) > limit
+        if truncated:
+            ts, rows = ts[len(ts) - limit:], rows[len(rows) - limit:]
+        return {
+            "exchange": exchange,
+            "symbol": symbol,
+            "truncated": truncated,
+            "timestamp": ts.tolist(),
+            **{name: _json_floats(rows[:, i]) for i, name in enumerate(LIVE_FIELDS)},
+        }
+
+    def spread_stats(self, symbol: str, window_ns: int, exchange: Optional[str] = None,
+                     now: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Rolling spread statistics over the last window_ns per exchange.
+
+        Returns count, mean, min, p50, p99 and max of every spread column
+        (NaN spreads, i.e. books too thin for the size, are skipped).
+        """
+        end = time.time_ns() if now is None else now
+        out = []
+        for ex, s in self._select(symbol, exchange):
+            ts, rows = s.between(end - window_ns, end + 1)
+            stats = {"exchange": ex, "symbol": symbol, "ticks": len(ts)}
+            for name in SPREAD_FIELDS:
+                values = rows[:, LIVE_FIELDS.index(name)]
+                values = values[np.isfinite(values)]
+                if len(values):
+                    p50, p99 = np.percentile(values, [50, 99])
+                    stats[name] = {"count": len(values), "mean": float(values.mean()), "min": float(values.min()),
+                                   "p50": float(p50), "p99": float(p99), "max": float(values.max())}
+                else:
+                    stats[name] = {"count": 0}
+            out.append(stats)
+        return out
+
+def _json_floats(values: np.ndarray) -> List[Optional[float]]:
+    # NaN is not valid JSON
+    return [None if v != v else v for v in values.tolist()]
+
+def _parse_time(value: Optional[str], default: int) -> int:
+    if value is None:
+        return default
+    if value.lstrip("-").isdigit():
+        return int(value)
+    ts = pd.Timestamp(value)
+    return (ts.tz_localize("UTC") if ts.tzinfo is None else ts).value
+
+class LiveQueryServer:
+    """
+    Read-only HTTP API over a LiveIndex, served on the collector's event loop.
+
+    Endpoints (all GET, JSON):
+
+    - /series: indexed (exchange, symbol) pairs
+    - /latest?symbol=S[&exchange=E]: last quote per exchange
+    - /range?exchange=E&symbol=S[&start=&end=&limit=]: ticks in [start, end)
+      (ns or ISO-8601 UTC; default the last minute)
+    - /stats?symbol=S[&exchange=E&window=1min]: rolling spread statistics
+
+    Args:
+        index: Index to serve.
+        port: TCP port (None to skip TCP).
+        host: Interface the TCP endpoint binds to.
+        path: Unix socket path (None to skip).
+        max_rows: Upper bound on the rows one range query returns.
+    """
+    def __init__(self, index: LiveIndex, port: Optional[int] = None, host: str = "127.0.0.1",
+                 path: Optional[str] = None, max_rows: int = 100_000):
+        if port is None and path is None:
+            raise ValueError("LiveQueryServer needs a port or a Unix socket path")
+        self.index = index
+        self.port = port
+        self.host = host
+        self.path = path
+        self.max_rows = max_rows
+        self._runner: Optional[web.AppRunner] = None
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/series", self._handle_series)
+        app.router.add_get("/latest", self._handle_latest)
+        app.router.add_get("/range", self._handle_range)
+        app.router.add_get("/stats", self._handle_stats)
+        return app
+
+    async def start(self):
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        if self.port is not None:
+            await web.TCPSite(self._runner, self.host, self.port).start()
+            logger.info(f"Serving live queries on http://{self.host}:{self.port}")
+        if self.path is not None:
+            await web.UnixSite(self._runner, self.path).start()
+            logger.info(f"Serving live queries on unix:{self.path}")
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @staticmethod
+    def _require(request: web.Request, name: str) -> str:
+        value = request.query.get(name)
+        if not value:
+            raise web.HTTPBadRequest(text=f"Missing query parameter '{name}'")
+        return value
+
+    async def _handle_series(self, request: web.Request) -> web.Response:
+        return web.json_response(self.index.series())
+
+    async def _handle_latest(self, request: web.Request) -> web.Response:
+        symbol = self._require(request, "symbol")
+        return web.json_response(self.index.latest(symbol, request.query.get("exchange")))
+
+    async def _handle_range(self, request: web.Request) -> web.Response:
+        exchange = self._require(request, "exchange")
+        symbol = self._require(request, "symbol")
+        try:
+            end = _parse_time(request.query.get("end"), time.time_ns())
+            start = _parse_time(request.query.get("start"), end - 60 * 10**9)
+            limit = min(int(request.query.get("limit", self.max_rows)), self.max_rows)
+        except ValueError as e:
+            raise web.HTTPBadRequest(text=str(e))
+        return web.json_response(self.index.range(exchange, symbol, start, end, limit))
+
+    async def _handle_stats(self, request: web.Request) -> web.Response:
+        symbol = self._require(request, "symbol")
+        try:
+            window = pd.Timedelta(request.query.get("window", "1min")).value
+        except ValueError as e:
+            raise web.HTTPBadRequest(text=str(e))
+        return web.json_response(self.index.spread_stats(symbol, window, request.query.get("exchange")))
@@ -0,0 +1,45 @@
+import asyncio
+import logging
+from typing import Callable, Coroutine, List
+
+try:
+    import uvloop
+except ImportError:  # pragma: no cover - optional dependency
+    uvloop = None
+
+logger = logging.getLogger(__name__)
+
+EVENT_LOOPS = ("asyncio", "uvloop")
+
+def available_loops() -> List[str]:
+    return ["asyncio"] + (["uvloop"] if uvloop is not None else [])
+
+def run(main: Coroutine, event_loop: str = "asyncio"):
+    """
+    Run a coroutine on the requested event loop implementation.
+
+    'uvloop' falls back to the default asyncio loop (with a warning) when
+    uvloop is not installed.
+    """
+    if event_loop not in EVENT_LOOPS:
+        raise ValueError(f"Unknown event loop '{event_loop}' (expected one of {EVENT_LOOPS})")
+    if event_loop == "uvloop":
+        if uvloop is not None:
+            # Event loop policy rather than asyncio.Runner, which needs Python 3.11
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+            return asyncio.run(main)
+        logger.warning("uvloop is not installed; using the default asyncio event loop")
+    return asyncio.run(main)
+
+async def monitor_loop_lag(observe: Callable[[float], None], interval_s: float = 0.5):
+    """
+    Measure event-loop lag until cancelled.
+
+    Sleeps for interval_s and reports how late the wake-up was (seconds), i.e.
+    how long ready callbacks had to wait behind other work on the loop.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval_s)
+        observe(max(0.0, loop.time() - start - interval_s))
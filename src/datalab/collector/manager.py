@@ -1,12 +1,21 @@
 import asyncio
 import logging
-from collections import deque
-from typing import Dict, Any, List
+import time
+from typing import Dict, Any, List, Optional
 from datalab.collector.exchange import Exchange, StandardizedTick
+from datalab.collector.writer import FlushWriter
+from datalab.collector.connections import ConnectionManager
+from datalab.collector.metrics import CollectorMetrics, MetricsReporter
+from datalab.collector.loop import monitor_loop_lag
+from datalab.collector.latency import LatencyRecorder, FEED, PROCESS
+from datalab.collector.arbitrage import ArbitrageDetector, ArbitrageEvent
+from datalab.collector.alerts import AlertDispatcher, build_sinks
+from datalab.collector.journal import TickJournal, recover_journal
+from datalab.collector.live import LiveIndex, LiveQueryServer
 from datalab.collector.clients.dydx import DydxExchange
 from datalab.collector.clients.binance import BinanceExchange
 from datalab.collector.clients.hyperliquid import SimulatedExchange
-from datalab.utils.storage import save_to_parquet, get_timestamped_filename
+from datalab.utils.storage import PartitionedParquetWriter, write_arbitrage_events, write_latency_histograms
 import os
 
 logger = logging.getLogger(__name__)
@@ -17,8 +26,91 @@ class MultiExchangeCollector:
         self.buffer_size = config.get("buffer_size", 100000)
         self.data_dir = config.get("data_dir", "./data")
         self.spread_threshold = config.get("spread_threshold", 0.0)
-        self.buffer: deque = deque(maxlen=self.buffer_size)
+        self.file_prefix = config.get("file_prefix", "part")
+        self.dataset = PartitionedParquetWriter(
+            self.data_dir,
+            max_file_bytes=int(config.get("max_file_mb", 128) * 1024 * 1024),
+            max_file_age_s=config.get("max_file_age_s", 60.0),
+            file_prefix=self.file_prefix,
+            on_closed=self._release_journal,
+        )
+        self.writer = FlushWriter(
+            self._write_table,
+            self.buffer_size,
+            queue_size=config.get("flush_queue_size", 4),
+            policy=config.get("backpressure", "block"),
+            spill_dir=config.get("spill_dir", os.path.join(self.data_dir, "_spill")),
+            on_dropped=self._release_journal,
+            on_idle=self.dataset.roll_expired,
+        )
+        self.buffer = self.writer.acquire_buffer()
+        journal_config = config.get("journal")
+        journal_config = journal_config if isinstance(journal_config, dict) else {}
+        # One journal per file prefix, so sharded workers never share segments
+        self.journal_dir = os.path.join(journal_config.get("dir", os.path.join(self.data_dir, "_journal")), self.file_prefix)
+        self.journal = None
+        if config.get("journal"):
+            self.journal = TickJournal(
+                self.journal_dir,
+                self.buffer_size,
+                self.writer.dictionaries,
+                sync_interval_ms=journal_config.get("sync_interval_ms", 100.0),
+            )
+        self._journal_task = None
+        # Latest write of the latency/arbitrage side tables (each one waits for the previous)
+        self._side_task: Optional[asyncio.Task] = None
         self.exchanges: List[Exchange] = []
+        self.connections = ConnectionManager()
+        self._symbols_per_connection: Dict[str, int] = {}
+        self.metrics = CollectorMetrics()
+        self.latency = LatencyRecorder() if config.get("record_latency", True) else None
+        self.arbitrage = None
+        arbitrage_config = config.get("arbitrage")
+        if arbitrage_config:
+            arbitrage_config = arbitrage_config if isinstance(arbitrage_config, dict) else {}
+            self.arbitrage = ArbitrageDetector(
+                min_edge_bps=arbitrage_config.get("min_edge_bps", 0.0),
+                max_quote_age_ms=arbitrage_config.get("max_quote_age_ms", 1000.0),
+                fees_bps=arbitrage_config.get("fees_bps"),
+                symbol_map=arbitrage_config.get("symbol_map"),
+                on_event=self._on_arbitrage,
+            )
+        self.alerts = None
+        if self.spread_threshold > 0:
+            alert_config = config.get("alerts", {})
+            self.alerts = AlertDispatcher(
+                self.spread_threshold,
+                build_sinks(alert_config.get("sinks")),
+                clear_threshold=alert_config.get("clear_threshold"),
+                cooldown_s=alert_config.get("cooldown_s", 60.0),
+                window_s=alert_config.get("window_s", 1.0),
+                queue_size=alert_config.get("queue_size", 100),
+            )
+        self.live = None
+        self.live_server = None
+        live_config = config.get("live")
+        if live_config:
+            live_config = live_config if isinstance(live_config, dict) else {}
+            self.live = LiveIndex(live_config.get("capacity", 100_000))
+            if live_config.get("port") is not None or live_config.get("path"):
+                self.live_server = LiveQueryServer(
+                    self.live,
+                    port=live_config.get("port"),
+                    host=live_config.get("host", "127.0.0.1"),
+                    path=live_config.get("path"),
+                    max_rows=live_config.get("max_rows", 100_000),
+                )
+        self.reporter = None
+        if config.get("metrics_file") or config.get("metrics_port") is not None:
+            self.reporter = MetricsReporter(
+                self.metrics,
+                path=config.get("metrics_file"),
+                port=config.get("metrics_port"),
+                host=config.get("metrics_host", "127.0.0.1"),
+                interval_s=config.get("metrics_interval_s", 10.0),
+                gauges=self._metric_gauges,
+            )
+        self._lag_task = None
         self._running = False
         
         self._init_exchanges()
@@ -31,10 +123,14 @@ class MultiExchangeCollector:
             api_key = ex_conf.get("api_key")
             api_secret = ex_conf.get("api_secret")
             
+            decoder = ex_conf.get("decoder", self.config.get("decoder", "auto"))
+            if "symbols_per_connection" in ex_conf:
+                self._symbols_per_connection[name] = ex_conf["symbols_per_connection"]
+            
             if name == "dydx":
-                self.exchanges.append(DydxExchange(symbols, api_key, api_secret))
+                self.exchanges.append(DydxExchange(symbols, api_key, api_secret, decoder=decoder))
             elif name == "binance":
-                self.exchanges.append(BinanceExchange(symbols, api_key, api_secret))
+                self.exchanges.append(BinanceExchange(symbols, api_key, api_secret, decoder=decoder))
             elif name == "simulated" or name == "hyperliquid":
                 self.exchanges.append(SimulatedExchange(symbols, api_key, api_secret))
             else:
@@ -42,15 +138,37 @@ class MultiExchangeCollector:
 
     async def start(self):
         self._running = True
+        orphans = await asyncio.to_thread(self.dataset.recover_orphans)
+        if orphans["renamed"] or orphans["removed"]:
+            logger.warning(f"Found in-progress files from an earlier run: {orphans['renamed']} renamed, "
+                           f"{orphans['removed']} unreadable and removed")
+        # Ticks journalled by a previous run that died before flushing them
+        recovered = await asyncio.to_thread(recover_journal, self.journal_dir, self.dataset)
+        if recovered:
+            logger.info(f"Recovered {recovered} journalled ticks from {self.journal_dir}")
+        if self.journal is not None:
+            self.journal.open()
+            self._journal_task = asyncio.create_task(self.journal.run())
+        self.writer.start()
+        self._lag_task = asyncio.create_task(monitor_loop_lag(self.metrics.observe_loop_lag))
+        if self.alerts is not None:
+            await self.alerts.start()
+        if self.live_server is not None:
+            await self.live_server.start()
+        if self.reporter is not None:
+            await self.reporter.start()
         tasks = []
         for ex in self.exchanges:
-            tasks.append(self._run_exchange(ex))
+            # One task per connection shard; a failure only reconnects that shard
+            for shard in self.connections.shards(ex, self._symbols_per_connection.get(ex.name)):
+                tasks.append(self._run_exchange(shard))
             
         await asyncio.gather(*tasks, return_exceptions=True)
 
     async def _run_exchange(self, exchange: Exchange):
         while self._running:
             try:
+                exchange.reset()
                 await exchange.connect()
                 await exchange.subscribe(exchange.symbols)
                 async for tick in exchange.listen():
@@ -58,35 +176,131 @@ class MultiExchangeCollector:
                         break
                     await self._process_tick(tick)
             except Exception as e:
-                logger.error(f"Error in exchange {exchange.name}: {e}")
+                logger.error(f"Error in exchange {exchange.name} ({len(exchange.symbols)} symbols): {e}")
+                await exchange.close()
                 await asyncio.sleep(5) # Backoff
 
     async def _process_tick(self, tick: StandardizedTick):
-        # Check alerts
-        if self.spread_threshold > 0 and tick.spread_10k > self.spread_threshold:
-            self._send_alert(tick)
+        # tick.timestamp is the receive time; the gap is decode + book + queueing on the loop
+        process_ns = time.time_ns() - tick.timestamp
+        latency_ms = process_ns / 1e6
+        self.metrics.observe_tick(tick.exchange, latency_ms)
+        if self.journal is not None:
+            self.journal.append(tick, latency_ms)
+        if self.latency is not None:
+            self.latency.record(tick.exchange, tick.symbol, PROCESS, process_ns)
+            if tick.exchange_timestamp is not None:
+                self.latency.record(tick.exchange, tick.symbol, FEED, tick.timestamp - tick.exchange_timestamp)
+
+        if self.live is not None:
+            self.live.append(tick)
+
+        if self.arbitrage is not None:
+            self.arbitrage.update(tick.exchange, tick.symbol, tick.bid_price, tick.ask_price, tick.timestamp)
+
+        if self.alerts is not None:
+            self.alerts.evaluate(tick.exchange, tick.symbol, tick.spread_10k, tick.timestamp)
 
-        self.buffer.append(tick)
-        if len(self.buffer) >= self.buffer_size:
+        self.buffer.append(tick, latency_ms)
+        if self.buffer.is_full():
             await self._flush_buffer()
             
-    def _send_alert(self, tick: StandardizedTick):
-        logger.warning(f"ALERT: High Spread detected on {tick.exchange} {tick.symbol}: {tick.spread_10k}")
+    def _on_arbitrage(self, event: ArbitrageEvent):
+        if event.kind == "open":
+            logger.info(f"Arbitrage open on {event.symbol}: buy {event.buy_exchange}, sell {event.sell_exchange}, "
+                        f"{event.entry_edge_bps:.2f} bps")
 
     async def _flush_buffer(self):
-        if not self.buffer:
+        if len(self.buffer) == 0:
             return
             
-        ticks = list(self.buffer)
-        self.buffer.clear()
-        
-        filename = get_timestamped_filename()
-        filepath = os.path.join(self.data_dir, filename)
-        
-        # Offload blocking I/O to thread
-        await asyncio.to_thread(save_to_parquet, ticks, filepath)
-        logger.info(f"Flushed {len(ticks)} ticks to {filepath}")
+        # Swap in an empty buffer and hand the full one to the writer thread
+        full = self.buffer
+        self.buffer = self.writer.acquire_buffer()
+        segments = self.journal.seal() if self.journal is not None else None
+        await self.writer.submit(full, segments)
+        self._flush_side_tables()
+
+    def _flush_side_tables(self):
+        # Each flush persists the latency histograms and closed opportunities of the interval it
+        # closes. Snapshots are taken here; the parquet writes run in the background, off the tick path.
+        writes = []
+        if self.latency is not None:
+            table = self.latency.snapshot()
+            if table.num_rows:
+                writes.append((write_latency_histograms, table, f"latency-{self.file_prefix}"))
+        if self.arbitrage is not None:
+            table = self.arbitrage.snapshot()
+            if table.num_rows:
+                writes.append((write_arbitrage_events, table, f"arbitrage-{self.file_prefix}"))
+        if writes:
+            self._side_task = asyncio.create_task(self._write_side_tables(writes, self._side_task))
+
+    async def _write_side_tables(self, writes, previous: Optional[asyncio.Task]):
+        if previous is not None:
+            await previous
+        for write, table, prefix in writes:
+            try:
+                await asyncio.to_thread(write, self.data_dir, table, prefix)
+            except Exception as e:
+                logger.error(f"Failed to write {table.num_rows} rows with {write.__name__}: {e}")
+
+    def _release_journal(self, segments):
+        # Called once every parquet file holding the buffer's ticks is closed, or when the buffer was dropped
+        if self.journal is not None:
+            self.journal.release(segments)
+
+    def _write_table(self, table, segments=None):
+        # Runs on the writer thread
+        self.dataset.write(table, segments)
+        logger.info(f"Flushed {table.num_rows} ticks to {self.data_dir}")
+
+    def _metric_gauges(self) -> Dict[str, float]:
+        stats = self.writer.stats()
+        stats["buffered_ticks"] = len(self.buffer)
+        if self.arbitrage is not None:
+            stats["arbitrage_open"] = len(self.arbitrage.open_opportunities())
+            stats["arbitrage_opened_total"] = self.arbitrage.opened
+        if self.alerts is not None:
+            stats.update(self.alerts.stats())
+            stats["alerts_active"] = self.alerts.active()
+        return stats
 
     async def stop(self):
         self._running = False
+        if self._lag_task is not None:
+            self._lag_task.cancel()
+            self._lag_task = None
         await self._flush_buffer()
+        if self._side_task is not None:
+            await self._side_task
+            self._side_task = None
+        await asyncio.to_thread(self.writer.close)
+        self.dataset.close()
+        if self._journal_task is not None:
+            self._journal_task.cancel()
+            await asyncio.gather(self._journal_task, return_exceptions=True)
+            self._journal_task = None
+        if self.journal is not None:
+            await self.journal.close()
+        if self.alerts is not None:
+            try:
+                await self.alerts.stop()
+            except RuntimeError as e:
+                logger.debug(f"Could not stop alert dispatcher cleanly: {e}")
+        if self.live_server is not None:
+            try:
+                await self.live_server.stop()
+            except RuntimeError as e:
+                logger.debug(f"Could not stop live query server cleanly: {e}")
+        if self.reporter is not None:
+            try:
+                await self.reporter.stop()
+            except RuntimeError as e:
+                logger.debug(f"Could not stop metrics reporter cleanly: {e}")
+        try:
+            await self.connections.close()
+        except RuntimeError as e:
+            # Session may belong to a loop that is already closed (e.g. after Ctrl+C)
+            logger.debug(f"Could not close shared session: {e}")
+        logger.info(f"Writer stats: {self.writer.stats()}")
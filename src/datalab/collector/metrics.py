@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import os
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the receive-to-process latency histogram buckets
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0)
+
+class LatencyStats:
+    """Fixed-bucket latency histogram with sum, count and max."""
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS_MS):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)  # last bucket is +Inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.buckets[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+class CollectorMetrics:
+    """
+    Event-loop health counters for one collector process.
+
+    Tracks ticks and receive-to-process latency per exchange, event-loop lag
+    and ticks/sec (recomputed on every roll()). All updates happen on the
+    event loop thread, so no locking is needed.
+    """
+    def __init__(self, latency_buckets_ms: Tuple[float, ...] = LATENCY_BUCKETS_MS):
+        self.latency_buckets_ms = latency_buckets_ms
+        self.ticks: Dict[str, int] = {}
+        self.latency: Dict[str, LatencyStats] = {}
+        self.ticks_per_sec: Dict[str, float] = {}
+        self.loop_lag_s = 0.0
+        self.loop_lag_max_s = 0.0
+        self._lag_window_max_s = 0.0
+        self._last_ticks: Dict[str, int] = {}
+        self._last_roll = time.monotonic()
+
+    def observe_tick(self, exchange: str, latency_ms: float):
+        stats = self.latency.get(exchange)
+        if stats is None:
+            stats = self.latency[exchange] = LatencyStats(self.latency_buckets_ms)
+            self.ticks[exchange] = 0
+        self.ticks[exchange] += 1
+        stats.observe(latency_ms)
+
+    def observe_loop_lag(self, lag_s: float):
+        self.loop_lag_s = lag_s
+        if lag_s > self._lag_window_max_s:
+            self._lag_window_max_s = lag_s
+
+    def roll(self):
+        """Close the current reporting window: update ticks/sec and the windowed max loop lag."""
+        now = time.monotonic()
+        elapsed = max(now - self._last_roll, 1e-9)
+        self.ticks_per_sec = {ex: (n - self._last_ticks.get(ex, 0)) / elapsed for ex, n in self.ticks.items()}
+        self._last_ticks = dict(self.ticks)
+        self._last_roll = now
+        self.loop_lag_max_s = self._lag_window_max_s
+        self._lag_window_max_s = 0.0
+
+    def render_prometheus(self, gauges: Optional[Dict[str, float]] = None) -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+
+        def header(name: str, kind: str, help_text: str):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        header("datalab_loop_lag_seconds", "gauge", "Most recent event-loop wake-up delay.")
+        lines.append(f"datalab_loop_lag_seconds {self.loop_lag_s:.6f}")
+        header("datalab_loop_lag_max_seconds", "gauge", "Largest event-loop delay in the last reporting window.")
+        lines.append(f"datalab_loop_lag_max_seconds {self.loop_lag_max_s:.6f}")
+
+        header("datalab_ticks_total", "counter", "Ticks processed.")
+        for ex, n in sorted(self.ticks.items()):
+            lines.append(f'datalab_ticks_total{{exchange="{ex}"}} {n}')
+        header("datalab_ticks_per_second", "gauge", "Ticks processed per second over the last reporting window.")
+        for ex, rate in sorted(self.ticks_per_sec.items()):
+            lines.append(f'datalab_ticks_per_second{{exchange="{ex}"}} {rate:.3f}')
+
+        header("datalab_tick_latency_ms", "histogram", "Receive-to-process latency of ticks (ms).")
+        for ex, stats in sorted(self.latency.items()):
+            cumulative = 0
+            for bound, n in zip(self.latency_buckets_ms + (float("inf"),), stats.buckets):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f'datalab_tick_latency_ms_bucket{{exchange="{ex}",le="{le}"}} {cumulative}')
+            lines.append(f'datalab_tick_latency_ms_sum{{exchange="{ex}"}} {stats.total:.6f}')
+            lines.append(f'datalab_tick_latency_ms_count{{exchange="{ex}"}} {stats.count}')
+        header("datalab_tick_latency_max_ms", "gauge", "Largest receive-to-process latency seen (ms).")
+        for ex, stats in sorted(self.latency.items()):
+            lines.append(f'datalab_tick_latency_max_ms{{exchange="{ex}"}} {stats.max:.6f}')
+
+        for name, value in sorted((gauges or {}).items()):
+            header(f"datalab_{name}", "gauge", f"Collector {name.replace('_', ' ')}.")
+            lines.append(f"datalab_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+class MetricsReporter:
+    """
+    Periodically publishes CollectorMetrics.
+
+    Every interval_s the reporting window is rolled and, if path is set, the
+    Prometheus text is written to that file (atomically, node-exporter
+    textfile style). If port is set, the same text is served at /metrics by
+    an aiohttp server running on the collector's own event loop.
+
+    Args:
+        metrics: Metrics to publish.
+        path: Optional output file.
+        port: Optional HTTP port for the /metrics endpoint.
+        host: Interface the endpoint binds to.
+        interval_s: Reporting interval in seconds.
+        gauges: Optional callable returning extra gauges (e.g. writer stats).
+    """
+    def __init__(self, metrics: CollectorMetrics, path: Optional[str] = None, port: Optional[int] = None,
+                 host: str = "127.0.0.1", interval_s: float = 10.0,
+                 gauges: Optional[Callable[[], Dict[str, float]]] = None):
+        self.metrics = metrics
+        self.path = path
+        self.port = port
+        self.host = host
+        self.interval_s = interval_s
+        self.gauges = gauges
+        self._task: Optional[asyncio.Task] = None
+        self._runner: Optional[web.AppRunner] = None
+
+    def render(self) -> str:
+        return self.metrics.render_prometheus(self.gauges() if self.gauges else None)
+
+    async def start(self):
+        if self.port is not None:
+            app = web.Application()
+            app.router.add_get("/metrics", self._handle_metrics)
+            self._runner = web.AppRunner(app, access_log=None)
+            await self._runner.setup()
+            await web.TCPSite(self._runner, self.host, self.port).start()
+            logger.info(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+        self._task = asyncio.create_task(self._report_loop())
+
+    async def stop(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        self.metrics.roll()
+        self._write_file()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _report_loop(self):
+        while True:
+            await asyncio.sleep(self.interval_s)
+            self.metrics.roll()
+            try:
+                self._write_file()
+            except OSError as e:
+                logger.error(f"Failed to write metrics to {self.path}: {e}")
+
+    def _write_file(self):
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.render())
+        os.replace(tmp_path, self.path)
+
+    async def _handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(text=self.render(), content_type="text/plain")
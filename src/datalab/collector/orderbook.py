@@ -0,0 +1,248 @@
+import math
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from datalab.collector.exchange import StandardizedTick
+
+# Notional sizes (quote currency) matching StandardizedTick.spread_* fields
+NOTIONAL_SIZES = (10_000.0, 50_000.0, 100_000.0, 500_000.0)
+
+Level = Tuple[float, float]
+
+class BookSide:
+    """
+    One side of an L2 book: sorted price levels with cumulative depth.
+
+    Levels are stored by key (price for asks, -price for bids) so index 0 is
+    always the best level, next to their sizes and the running notional and
+    quantity through each level. A change at level i only invalidates the
+    running sums from i on; they are repaired lazily, and only as deep as the
+    largest notional needs, before the fill prices are found by bisecting the
+    running notional. The fill prices are cached with the deepest level they
+    used, so changes below that level leave them valid.
+
+    Costs: locating a level is an O(log n) bisect; adding or removing one
+    shifts the arrays behind it (a memmove, O(n)); a repair walks from the
+    changed level to the depth of the largest notional, not the whole book.
+    """
+    def __init__(self, is_bid: bool, notionals: Sequence[float] = NOTIONAL_SIZES):
+        self.is_bid = is_bid
+        self.notionals = tuple(sorted(notionals))
+        self._keys: List[float] = []
+        self._sizes: List[float] = []
+        # Running notional/quantity through each level, valid for the first _valid levels
+        self._notional: List[float] = []
+        self._quantity: List[float] = []
+        self._valid = 0
+        self._offsets: Dict[float, int] = {}
+        self._fills: Optional[Tuple[float, ...]] = None
+        self._depth = math.inf
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _key(self, price: float) -> float:
+        return -price if self.is_bid else price
+
+    def clear(self):
+        self._keys.clear()
+        self._sizes.clear()
+        self._notional.clear()
+        self._quantity.clear()
+        self._offsets.clear()
+        self._touch(0)
+
+    def _touch(self, index: int) -> bool:
+        # Level index changed: drop running sums from there, and the fills if they used it
+        if index < self._valid:
+            self._valid = index
+        if index <= self._depth:
+            self._fills = None
+            self._depth = math.inf
+            return True
+        return False
+
+    def update(self, price: float, size: float, offset: Optional[int] = None) -> bool:
+        """
+        Set the size at a price level (size 0 removes it).
+
+        With offsets (dYdX), updates older than the level's last offset are
+        ignored. Returns True if the cached fill prices became stale.
+        """
+        key = self._key(price)
+        if offset is not None:
+            last = self._offsets.get(key)
+            if last is not None and offset <= last:
+                return False
+
+        keys = self._keys
+        i = bisect_left(keys, key)
+        exists = i < len(keys) and keys[i] == key
+        if size > 0:
+            if exists:
+                self._sizes[i] = size
+            else:
+                keys.insert(i, key)
+                self._sizes.insert(i, size)
+                self._notional.insert(i, 0.0)
+                self._quantity.insert(i, 0.0)
+            if offset is not None:
+                self._offsets[key] = offset
+        elif exists:
+            # Offsets are only kept for live levels so the map stays bounded
+            del keys[i], self._sizes[i], self._notional[i], self._quantity[i]
+            self._offsets.pop(key, None)
+        else:
+            return False
+        return self._touch(i)
+
+    def replace(self, levels: Iterable[Sequence]):
+        """Replace the whole side with a snapshot of (price, size[, offset]) levels."""
+        self.clear()
+        sizes = {}
+        for level in levels:
+            price, size = level[0], level[1]
+            if size > 0:
+                key = self._key(price)
+                sizes[key] = size
+                if len(level) > 2:
+                    self._offsets[key] = level[2]
+        self._keys = sorted(sizes)
+        self._sizes = [sizes[key] for key in self._keys]
+        self._notional = [0.0] * len(self._keys)
+        self._quantity = [0.0] * len(self._keys)
+
+    def set_best(self, price: float, size: float) -> bool:
+        """
+        Apply a top-of-book update: drop levels better than price, then set it.
+        """
+        cut = bisect_left(self._keys, self._key(price))
+        if cut:
+            for stale in self._keys[:cut]:
+                self._offsets.pop(stale, None)
+            del self._keys[:cut], self._sizes[:cut], self._notional[:cut], self._quantity[:cut]
+            self._touch(0)
+        return self.update(price, size) or cut > 0
+
+    def best(self) -> Optional[Level]:
+        if not self._keys:
+            return None
+        key = self._keys[0]
+        return (-key if self.is_bid else key), self._sizes[0]
+
+    def fill_prices(self) -> Tuple[float, ...]:
+        """
+        Volume-weighted price to fill each notional, NaN where the book is too thin.
+        """
+        if self._fills is None:
+            self._fills, self._depth = self._walk()
+        return self._fills
+
+    def _repair(self, target: float):
+        # Extend the running sums until they reach target notional (or the book ends)
+        keys, sizes, notional, quantity = self._keys, self._sizes, self._notional, self._quantity
+        i = self._valid
+        total = notional[i - 1] if i else 0.0
+        qty = quantity[i - 1] if i else 0.0
+        n = len(keys)
+        while i < n and total < target:
+            price = -keys[i] if self.is_bid else keys[i]
+            total += price * sizes[i]
+            qty += sizes[i]
+            notional[i] = total
+            quantity[i] = qty
+            i += 1
+        self._valid = i
+
+    def _walk(self) -> Tuple[Tuple[float, ...], float]:
+        if not self.notionals:
+            return (), -1
+        self._repair(self.notionals[-1])
+        notional, quantity, valid = self._notional, self._quantity, self._valid
+        fills = []
+        depth = -1
+        for target in self.notionals:
+            j = bisect_left(notional, target, 0, valid)
+            if j == valid:
+                # Not enough depth: any update on this side may change the result
+                fills.append(math.nan)
+                depth = math.inf
+                continue
+            before = notional[j - 1] if j else 0.0
+            held = quantity[j - 1] if j else 0.0
+            price = -self._keys[j] if self.is_bid else self._keys[j]
+            # Partially consume level j up to the target notional
+            fills.append(target / (held + (target - before) / price))
+            depth = max(depth, j)
+        return tuple(fills), depth
+
+class OrderBook:
+    """
+    L2 order book for one symbol, built from snapshots plus deltas.
+
+    Effective spreads for each notional are the difference between the
+    volume-weighted ask and bid fill prices and are recomputed lazily, only
+    after an update that touches the depth they depend on.
+    """
+    def __init__(self, symbol: str, notionals: Sequence[float] = NOTIONAL_SIZES):
+        self.symbol = symbol
+        self.bids = BookSide(True, notionals)
+        self.asks = BookSide(False, notionals)
+
+    def apply_snapshot(self, bids: Iterable[Sequence], asks: Iterable[Sequence]):
+        self.bids.replace(bids)
+        self.asks.replace(asks)
+
+    def apply_delta(self, bids: Iterable[Level] = (), asks: Iterable[Level] = (), offset: Optional[int] = None) -> bool:
+        """Apply level updates; returns True if the effective spreads may have changed."""
+        changed = False
+        for price, size in bids:
+            changed |= self.bids.update(price, size, offset)
+        for price, size in asks:
+            changed |= self.asks.update(price, size, offset)
+        return changed
+
+    def apply_top(self, bid: float, bid_size: float, ask: float, ask_size: float) -> bool:
+        """Apply a best bid/offer update (e.g. Binance bookTicker) on top of the depth."""
+        changed = self.bids.set_best(bid, bid_size)
+        changed |= self.asks.set_best(ask, ask_size)
+        return changed
+
+    def is_ready(self) -> bool:
+        return bool(self.bids) and bool(self.asks)
+
+    def effective_spreads(self) -> Tuple[float, ...]:
+        return tuple(a - b for a, b in zip(self.asks.fill_prices(), self.bids.fill_prices()))
+
+    def tick(self, exchange: str, timestamp: int, exchange_timestamp: Optional[int] = None,
+             sequence: Optional[int] = None) -> Optional[StandardizedTick]:
+        """
+        Build a StandardizedTick from the current book, or None if a side is empty.
+
+        Expects the four default notionals (spread_10k ... spread_500k).
+
+        Args:
+            exchange: Exchange name.
+            timestamp: Local receive time (ns).
+            exchange_timestamp: Venue event time (ns), if known.
+            sequence: Venue update id / offset of the last applied update.
+        """
+        if not self.is_ready():
+            return None
+        bid_price, bid_size = self.bids.best()
+        ask_price, ask_size = self.asks.best()
+        s10, s50, s100, s500 = self.effective_spreads()
+        return StandardizedTick(
+            timestamp=timestamp,
+            exchange=exchange,
+            symbol=self.symbol,
+            bid_price=bid_price,
+            ask_price=ask_price,
+            spread_10k=s10,
+            spread_50k=s50,
+            spread_100k=s100,
+            spread_500k=s500,
+            liquidity_bid=bid_size,
+            liquidity_ask=ask_size,
+            exchange_timestamp=exchange_timestamp,
+            sequence=sequence,
+        )
@@ -0,0 +1,190 @@
+import asyncio
+import copy
+import logging
+import multiprocessing as mp
+import os
+import signal
+import time
+from typing import Any, Dict, List, Optional
+from datalab.collector import loop as event_loop
+
+logger = logging.getLogger(__name__)
+
+def plan_shards(config: Dict[str, Any], processes: int) -> List[List[Dict[str, Any]]]:
+    """
+    Split the configured exchanges into per-process groups.
+
+    Whole exchanges are assigned first; when there are fewer exchanges than
+    processes, the largest symbol lists are halved until every process can
+    get work. Groups are balanced greedily by symbol count.
+
+    Returns:
+        One list of exchange configs per worker (empty workers are dropped).
+    """
+    if processes < 1:
+        raise ValueError("processes must be >= 1")
+    units = [dict(ex, symbols=list(ex.get("symbols", []))) for ex in config.get("exchanges", [])]
+    while len(units) < processes:
+        largest = max(units, key=lambda u: len(u["symbols"]), default=None)
+        if largest is None or len(largest["symbols"]) < 2:
+            break
+        half = len(largest["symbols"]) // 2
+        units.remove(largest)
+        units.append(dict(largest, symbols=largest["symbols"][:half]))
+        units.append(dict(largest, symbols=largest["symbols"][half:]))
+
+    groups: List[List[Dict[str, Any]]] = [[] for _ in range(processes)]
+    loads = [0] * processes
+    for unit in sorted(units, key=lambda u: len(u["symbols"]), reverse=True):
+        i = loads.index(min(loads))
+        groups[i].append(unit)
+        loads[i] += max(1, len(unit["symbols"]))
+    return [g for g in groups if g]
+
+def worker_config(config: Dict[str, Any], exchanges: List[Dict[str, Any]], worker_id: int) -> Dict[str, Any]:
+    """
+    Collector config for one worker: its exchanges plus a private file prefix,
+    spill dir and metrics target (metrics_port + worker_id, metrics file with a .w<id> suffix).
+    A live query endpoint is offset the same way (port + worker_id, socket path + .w<id>).
+    """
+    data_dir = config.get("data_dir", "./data")
+    spill_root = config.get("spill_dir", os.path.join(data_dir, "_spill"))
+    conf = copy.deepcopy(config)
+    conf.pop("processes", None)
+    conf["exchanges"] = exchanges
+    conf["file_prefix"] = f"part-w{worker_id}"
+    conf["spill_dir"] = os.path.join(spill_root, f"w{worker_id}")
+    # Each worker publishes its own metrics
+    if conf.get("metrics_file"):
+        root, ext = os.path.splitext(conf["metrics_file"])
+        conf["metrics_file"] = f"{root}.w{worker_id}{ext}"
+    if conf.get("metrics_port") is not None:
+        conf["metrics_port"] = conf["metrics_port"] + worker_id
+    live = conf.get("live")
+    if isinstance(live, dict):
+        if live.get("port") is not None:
+            live["port"] = live["port"] + worker_id
+        if live.get("path"):
+            live["path"] = f"{live['path']}.w{worker_id}"
+    return conf
+
+async def run_collector(config: Dict[str, Any]):
+    """
+    Run a collector until SIGINT/SIGTERM (or until all its exchanges stop), then flush and close.
+    """
+    from datalab.collector.manager import MultiExchangeCollector
+
+    collector = MultiExchangeCollector(config)
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # Not supported on this platform/thread
+
+    task = asyncio.create_task(collector.start())
+    waiter = asyncio.create_task(stop.wait())
+    await asyncio.wait({task, waiter}, return_when=asyncio.FIRST_COMPLETED)
+    waiter.cancel()
+    await collector.stop()
+    if not task.done():
+        task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+def _worker_main(config: Dict[str, Any], worker_id: int, log_level: int):
+    logging.basicConfig(level=log_level, format=f"%(asctime)s [w{worker_id}] %(name)s %(levelname)s: %(message)s")
+    event_loop.run(run_collector(config), config.get("event_loop", "asyncio"))
+
+class CollectorSupervisor:
+    """
+    Runs collector shards in separate processes and restarts the ones that die.
+
+    Each worker has its own event loop, tick buffer and writer thread, and
+    writes its own files (prefix part-w<id>) into the shared partitioned
+    dataset, so no data crosses process boundaries. A worker that exits
+    unexpectedly is restarted with exponential backoff (reset once it has
+    stayed up for healthy_after_s seconds).
+    """
+    def __init__(self, config: Dict[str, Any], processes: Optional[int] = None,
+                 restart_delay_s: float = 1.0, max_restart_delay_s: float = 60.0,
+                 healthy_after_s: float = 60.0, poll_interval_s: float = 1.0):
+        processes = processes or config.get("processes") or os.cpu_count() or 1
+        self.configs = [worker_config(config, group, i) for i, group in enumerate(plan_shards(config, processes))]
+        self.restart_delay_s = restart_delay_s
+        self.max_restart_delay_s = max_restart_delay_s
+        self.healthy_after_s = healthy_after_s
+        self.poll_interval_s = poll_interval_s
+        self._ctx = mp.get_context("spawn")
+        self._procs: List[Optional[mp.process.BaseProcess]] = [None] * len(self.configs)
+        self._started_at = [0.0] * len(self.configs)
+        self._delays = [restart_delay_s] * len(self.configs)
+        self._restart_at: Dict[int, float] = {}
+        self.restarts = [0] * len(self.configs)
+        self._running = False
+
+    def _spawn(self, worker_id: int):
+        config = self.configs[worker_id]
+        proc = self._ctx.Process(
+            target=_worker_main,
+            args=(config, worker_id, logging.getLogger().getEffectiveLevel()),
+            name=f"collector-w{worker_id}",
+            daemon=False,
+        )
+        proc.start()
+        self._procs[worker_id] = proc
+        self._started_at[worker_id] = time.monotonic()
+        names = ", ".join(f"{ex.get('name')}[{len(ex.get('symbols', []))}]" for ex in config["exchanges"])
+        logger.info(f"Started collector worker {worker_id} (pid {proc.pid}): {names}")
+
+    def start(self):
+        self._running = True
+        for i in range(len(self.configs)):
+            self._spawn(i)
+
+    def check(self):
+        """Restart workers that have exited; call periodically."""
+        now = time.monotonic()
+        for i, proc in enumerate(self._procs):
+            if not self._running:
+                return
+            if i in self._restart_at:
+                if now >= self._restart_at[i]:
+                    del self._restart_at[i]
+                    self.restarts[i] += 1
+                    self._spawn(i)
+                continue
+            if proc is None or proc.is_alive():
+                continue
+            if now - self._started_at[i] >= self.healthy_after_s:
+                self._delays[i] = self.restart_delay_s
+            delay = self._delays[i]
+            self._delays[i] = min(delay * 2, self.max_restart_delay_s)
+            self._restart_at[i] = now + delay
+            logger.error(f"Collector worker {i} exited with code {proc.exitcode}; restarting in {delay:.1f}s")
+
+    def run(self):
+        """Start all workers and supervise them until interrupted."""
+        self.start()
+        try:
+            while self._running:
+                time.sleep(self.poll_interval_s)
+                self.check()
+        finally:
+            self.stop()
+
+    def stop(self, timeout: float = 30.0):
+        """Ask every worker to flush and exit (SIGTERM), killing stragglers after timeout."""
+        self._running = False
+        self._restart_at.clear()
+        procs = [p for p in self._procs if p is not None]
+        for proc in procs:
+            if proc.is_alive():
+                proc.terminate()
+        deadline = time.monotonic() + timeout
+        for proc in procs:
+            proc.join(max(0.0, deadline - time.monotonic()))
+            if proc.is_alive():
+                logger.error(f"Collector worker {proc.name} did not stop in time; killing it")
+                proc.kill()
+                proc.join()
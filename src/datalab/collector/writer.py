@@ -0,0 +1,199 @@
+import asyncio
+import logging
+import os
+import queue
+import threading
+import uuid
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+import pyarrow as pa
+from datalab.collector.buffer import TickBuffer, TickDictionary
+
+logger = logging.getLogger(__name__)
+
+BACKPRESSURE_POLICIES = ("block", "drop_oldest", "spill")
+
+_STOP = object()
+
+class FlushWriter:
+    """
+    Background writer stage for the collector.
+
+    Full TickBuffers are handed over through a bounded queue and written by a
+    dedicated thread, so ingestion never waits on parquet encoding. Written
+    buffers are recycled through a free pool. When the queue is full the
+    backpressure policy decides what happens:
+
+    - block: the submitting coroutine waits for a free slot (ticks counted as late)
+    - drop_oldest: the oldest queued buffer is discarded (ticks counted as dropped)
+    - spill: the buffer is dumped to an Arrow IPC file and written later (ticks counted as late)
+
+    on_idle, if set, runs on the writer thread whenever the queue has been
+    empty for a while (e.g. to close files that have aged out).
+
+    A buffer may be submitted with a token, which is passed to the sink along
+    with the buffer's table. When a buffer is discarded by drop_oldest,
+    on_dropped(token) is called instead.
+    """
+    def __init__(
+        self,
+        sink: Callable[[pa.Table, Any], None],
+        capacity: int,
+        queue_size: int = 4,
+        policy: str = "block",
+        spill_dir: Optional[str] = None,
+        on_dropped: Optional[Callable[[Any], None]] = None,
+        on_idle: Optional[Callable[[], None]] = None,
+    ):
+        if policy not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"Unknown backpressure policy: {policy} (expected one of {BACKPRESSURE_POLICIES})")
+        if policy == "spill" and not spill_dir:
+            raise ValueError("spill policy requires spill_dir")
+
+        self.sink = sink
+        self.capacity = capacity
+        self.policy = policy
+        self.spill_dir = spill_dir
+        self.on_dropped = on_dropped
+        self.on_idle = on_idle
+        self.dictionaries: Dict[str, TickDictionary] = {name: TickDictionary() for name in ("exchange", "symbol")}
+
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._free: Deque[TickBuffer] = deque()
+        self._spilled: Deque[Tuple[str, Any]] = deque()
+        self._thread: Optional[threading.Thread] = None
+
+        self.flushed_ticks = 0
+        self.dropped_ticks = 0
+        self.late_ticks = 0
+        self.spilled_ticks = 0
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="datalab-flush-writer", daemon=True)
+        self._thread.start()
+
+    def acquire_buffer(self) -> TickBuffer:
+        """Return an empty buffer from the free pool, allocating if none is available."""
+        try:
+            return self._free.pop()
+        except IndexError:
+            return TickBuffer(self.capacity, self.dictionaries)
+
+    async def submit(self, buffer: TickBuffer, token: Any = None):
+        """Queue a filled buffer for writing, applying the backpressure policy."""
+        self.start()
+        if len(buffer) == 0:
+            self._recycle(buffer)
+            return
+        self.dropped_ticks += buffer.dropped
+        item = (buffer, token)
+
+        try:
+            self._queue.put_nowait(item)
+            return
+        except queue.Full:
+            pass
+
+        if self.policy == "block":
+            self.late_ticks += len(buffer)
+            await asyncio.to_thread(self._queue.put, item)
+        elif self.policy == "drop_oldest":
+            while True:
+                try:
+                    oldest, oldest_token = self._queue.get_nowait()
+                    self.dropped_ticks += len(oldest)
+                    self._recycle(oldest)
+                    self._dropped(oldest_token)
+                except queue.Empty:
+                    pass
+                try:
+                    self._queue.put_nowait(item)
+                    break
+                except queue.Full:
+                    continue
+        else:
+            self.late_ticks += len(buffer)
+            await asyncio.to_thread(self._spill, buffer, token)
+
+    def close(self):
+        """Write everything still queued or spilled, then stop the thread."""
+        self.start()
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+        self._drain_spill()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "flushed_ticks": self.flushed_ticks,
+            "dropped_ticks": self.dropped_ticks,
+            "late_ticks": self.late_ticks,
+            "spilled_ticks": self.spilled_ticks,
+            "queue_depth": self._queue.qsize(),
+        }
+
+    def _recycle(self, buffer: TickBuffer):
+        buffer.clear()
+        buffer.dropped = 0
+        self._free.append(buffer)
+
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                self._drain_spill()
+                self._idle()
+                continue
+            if item is _STOP:
+                break
+            buffer, token = item
+            self._write(buffer.to_arrow(), token)
+            self.flushed_ticks += len(buffer)
+            self._recycle(buffer)
+            if self._queue.empty():
+                self._drain_spill()
+
+    def _write(self, table: pa.Table, token: Any = None):
+        try:
+            self.sink(table, token)
+        except Exception as e:
+            logger.error(f"Flush writer failed to write {table.num_rows} ticks: {e}")
+
+    def _idle(self):
+        if self.on_idle is None:
+            return
+        try:
+            self.on_idle()
+        except Exception as e:
+            logger.error(f"Flush writer idle callback failed: {e}")
+
+    def _dropped(self, token: Any):
+        if token is None or self.on_dropped is None:
+            return
+        try:
+            self.on_dropped(token)
+        except Exception as e:
+            logger.error(f"Flush writer drop callback failed: {e}")
+
+    def _spill(self, buffer: TickBuffer, token: Any = None):
+        os.makedirs(self.spill_dir, exist_ok=True)
+        path = os.path.join(self.spill_dir, f"spill_{uuid.uuid4().hex}.arrow")
+        table = buffer.to_arrow()
+        with pa.OSFile(path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        self.spilled_ticks += table.num_rows
+        self._recycle(buffer)
+        self._spilled.append((path, token))
+
+    def _drain_spill(self):
+        while self._spilled:
+            path, token = self._spilled.popleft()
+            with pa.memory_map(path, "r") as source:
+                table = pa.ipc.open_file(source).read_all()
+                self._write(table, token)
+            self.flushed_ticks += table.num_rows
+            os.remove(path)
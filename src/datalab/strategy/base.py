@@ -1,6 +1,11 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
+import numpy as np
+import pandas as pd
+from datalab.strategy.indicators import Indicator
+
+NS_PER_DAY = 86_400 * 10**9
 
 class BaseDCAStrategy(ABC):
     """
@@ -22,3 +27,61 @@ class BaseDCAStrategy(ABC):
         # Default implementation can be provided or left abstract.
         # Based on spec: "Default is budget + accumulated"
         pass
+
+    def indicators(self) -> Dict[str, Indicator]:
+        """
+        Indicators this strategy needs, by name.
+
+        The engine computes them once per run (vectorized) and passes the
+        current values to should_invest through its `indicators` argument,
+        and the full arrays to generate_signals.
+        """
+        return {}
+
+    def generate_signals(self, data: pd.DataFrame,
+                         indicators: Optional[Dict[str, np.ndarray]] = None) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Vectorized counterpart of should_invest/get_investment_amount.
+
+        Returns a boolean signal array and the requested amount per row
+        (before the engine caps it at available cash), or None if the
+        strategy only supports per-row evaluation.
+
+        Args:
+            data: Sorted market data.
+            indicators: Precomputed arrays for the declared indicators.
+        """
+        return None
+
+def timestamps_ns(data: pd.DataFrame) -> np.ndarray:
+    """Return the 'timestamp' column as int64 nanoseconds since epoch."""
+    return data["timestamp"].to_numpy(dtype="datetime64[ns]").view("int64")
+
+def period_gate(timestamps: np.ndarray, candidates: np.ndarray, period_days: int) -> np.ndarray:
+    """
+    Select the candidate rows that respect a minimum spacing of period_days.
+
+    Mirrors the `(date - last_invest_date).days >= period` rule: the first
+    candidate always fires, then the next one at least period_days later.
+    Runs in O(trades * log n) instead of O(rows).
+
+    Args:
+        timestamps: Sorted int64 nanosecond timestamps for every row.
+        candidates: Sorted row indices eligible for investment.
+        period_days: Minimum spacing between investments.
+    """
+    if len(candidates) == 0:
+        return np.zeros(len(timestamps), dtype=bool)
+
+    cand_ts = timestamps[candidates]
+    step = max(period_days, 0) * NS_PER_DAY
+    picked = []
+    pos = 0
+    while pos < len(candidates):
+        picked.append(candidates[pos])
+        nxt = int(np.searchsorted(cand_ts, cand_ts[pos] + step, side="left"))
+        pos = max(nxt, pos + 1)
+
+    signals = np.zeros(len(timestamps), dtype=bool)
+    signals[picked] = True
+    return signals
@@ -0,0 +1,221 @@
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Dict, Mapping
+import numpy as np
+import pandas as pd
+
+class Indicator(ABC):
+    """
+    Technical indicator with two interchangeable implementations.
+
+    update() consumes one value at a time in O(1) (live or event-driven use);
+    compute() evaluates a whole series at once with NumPy/pandas (backtests).
+    Both return NaN until the indicator has enough history, and agree up to
+    floating-point rounding.
+
+    Args:
+        source: Data column the engine feeds to the indicator.
+    """
+    def __init__(self, source: str = "ask_price"):
+        self.source = source
+
+    @abstractmethod
+    def update(self, value: float) -> float:
+        """Consume the next value and return the current indicator value."""
+        pass
+
+    @abstractmethod
+    def compute(self, values: np.ndarray) -> np.ndarray:
+        """Return the indicator for every element of values (does not touch streaming state)."""
+        pass
+
+    @abstractmethod
+    def reset(self):
+        """Clear the streaming state."""
+        pass
+
+def _check_window(window: int):
+    if window < 1:
+        raise ValueError(f"window must be >= 1, got {window}")
+
+class SMA(Indicator):
+    """Simple moving average over the last `window` values."""
+    def __init__(self, window: int, source: str = "ask_price"):
+        super().__init__(source)
+        _check_window(window)
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self._values = deque(maxlen=self.window)
+        self._sum = 0.0
+        self._since_resum = 0
+
+    def update(self, value: float) -> float:
+        if len(self._values) == self.window:
+            self._sum -= self._values[0]
+        self._values.append(value)
+        self._sum += value
+        self._since_resum += 1
+        if self._since_resum >= self.window:
+            # Re-add the window periodically so the running sum cannot drift
+            self._sum = math.fsum(self._values)
+            self._since_resum = 0
+        if len(self._values) < self.window:
+            return math.nan
+        return self._sum / self.window
+
+    def compute(self, values: np.ndarray) -> np.ndarray:
+        values = np.asarray(values, dtype=np.float64)
+        out = np.full(len(values), np.nan)
+        if len(values) >= self.window:
+            csum = np.cumsum(np.concatenate(([0.0], values)))
+            out[self.window - 1:] = (csum[self.window:] - csum[:-self.window]) / self.window
+        return out
+
+class EMA(Indicator):
+    """
+    Exponential moving average with alpha = 2 / (span + 1), seeded with the first value.
+
+    Values before `span` observations are NaN.
+    """
+    def __init__(self, span: int, source: str = "ask_price"):
+        super().__init__(source)
+        _check_window(span)
+        self.span = span
+        self.alpha = 2.0 / (span + 1.0)
+        self.reset()
+
+    def reset(self):
+        self._ema = math.nan
+        self._count = 0
+
+    def update(self, value: float) -> float:
+        self._count += 1
+        if self._count == 1:
+            self._ema = value
+        else:
+            self._ema += self.alpha * (value - self._ema)
+        return self._ema if self._count >= self.span else math.nan
+
+    def compute(self, values: np.ndarray) -> np.ndarray:
+        values = np.asarray(values, dtype=np.float64)
+        out = pd.Series(values).ewm(alpha=self.alpha, adjust=False).mean().to_numpy(copy=True)
+        out[:self.span - 1] = np.nan
+        return out
+
+class RollingStd(Indicator):
+    """Sample standard deviation (ddof=1) over the last `window` values."""
+    def __init__(self, window: int, source: str = "ask_price"):
+        super().__init__(source)
+        if window < 2:
+            raise ValueError(f"window must be >= 2, got {window}")
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self._values = deque(maxlen=self.window)
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, value: float) -> float:
+        # Welford's algorithm with removal of the value leaving the window
+        if len(self._values) == self.window:
+            old = self._values[0]
+            old_mean = self._mean
+            self._mean += (value - old) / self.window
+            self._m2 += (value - old) * (value - self._mean + old - old_mean)
+        else:
+            delta = value - self._mean
+            self._mean += delta / (len(self._values) + 1)
+            self._m2 += delta * (value - self._mean)
+        self._values.append(value)
+        if len(self._values) < self.window:
+            return math.nan
+        return math.sqrt(max(self._m2, 0.0) / (self.window - 1))
+
+    def compute(self, values: np.ndarray) -> np.ndarray:
+        values = np.asarray(values, dtype=np.float64)
+        return pd.Series(values).rolling(self.window).std().to_numpy()
+
+class RSI(Indicator):
+    """
+    Wilder's relative strength index (0-100).
+
+    The first average gain/loss is the plain mean of the first `period`
+    changes; later ones use Wilder smoothing. RSI is 100 when there were no
+    losses in the averaging window.
+    """
+    def __init__(self, period: int = 14, source: str = "ask_price"):
+        super().__init__(source)
+        _check_window(period)
+        self.period = period
+        self.reset()
+
+    def reset(self):
+        self._prev = None
+        self._count = 0
+        self._gain = 0.0
+        self._loss = 0.0
+
+
+    def update(self, value: float) -> float:
+        prev, self._prev = self._prev, value
+        if prev is None:
+            return math.nan
+        change = value - prev
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+        self._count += 1
+        if self._count <= self.period:
+            self._gain += gain / self.period
+            self._loss += loss / self.period
+            if self._count < self.period:
+                return math.nan
+        else:
+            self._gain += (gain - self._gain) / self.period
+            self._loss += (loss - self._loss) / self.period
+        if self._loss == 0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + self._gain / self._loss)
+
+    def compute(self, values: np.ndarray) -> np.ndarray:
+        values = np.asarray(values, dtype=np.float64)
+        out = np.full(len(values), np.nan)
+        if len(values) <= self.period:
+            return out
+        changes = np.diff(values)
+        averages = []
+        for moves in (np.maximum(changes, 0.0), np.maximum(-changes, 0.0)):
+            seeded = np.concatenate(([moves[:self.period].mean()], moves[self.period:]))
+            averages.append(pd.Series(seeded).ewm(alpha=1.0 / self.period, adjust=False).mean().to_numpy())
+        gain, loss = averages
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out[self.period:] = np.where(loss == 0, 100.0, 100.0 - 100.0 / (1.0 + gain / loss))
+        return out
+
+class Drawdown(Indicator):
+    """Fractional drawdown from the running high: (high - value) / high."""
+    def __init__(self, source: str = "ask_price"):
+        super().__init__(source)
+        self.reset()
+
+    def reset(self):
+        self._high = -math.inf
+
+    def update(self, value: float) -> float:
+        if value > self._high:
+            self._high = value
+        return (self._high - value) / self._high
+
+    def compute(self, values: np.ndarray) -> np.ndarray:
+        values = np.asarray(values, dtype=np.float64)
+        highs = np.maximum.accumulate(values)
+        return (highs - values) / highs
+
+def compute_indicators(indicators: Mapping[str, Indicator], data: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Evaluate every named indicator over its source column of data (vectorized)."""
+    return {
+        name: indicator.compute(data[indicator.source].to_numpy(dtype=np.float64))
+        for name, indicator in indicators.items()
+    }
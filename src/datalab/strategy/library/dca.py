@@ -1,5 +1,7 @@
-from datalab.strategy.base import BaseDCAStrategy
+from datalab.strategy.base import BaseDCAStrategy, period_gate, timestamps_ns
 from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
 
 class PeriodicDCA(BaseDCAStrategy):
     """
@@ -23,3 +25,9 @@ class PeriodicDCA(BaseDCAStrategy):
     def get_investment_amount(self, date: datetime, available_cash: float) -> float:
         # Try to invest budget, capped by available
         return min(self.budget, available_cash)
+
+    def generate_signals(self, data: pd.DataFrame, indicators=None):
+        ts = timestamps_ns(data)
+        signals = period_gate(ts, np.arange(len(ts)), self.period)
+        amounts = np.full(len(ts), self.budget, dtype=np.float64)
+        return signals, amounts
@@ -1,7 +1,9 @@
-from datalab.strategy.base import BaseDCAStrategy
+from datalab.strategy.base import BaseDCAStrategy, period_gate, timestamps_ns
+from datalab.strategy.indicators import SMA
 from datetime import datetime
-from collections import deque
+import math
 import numpy as np
+import pandas as pd
 
 class MomentumDCA(BaseDCAStrategy):
     """
@@ -10,17 +12,19 @@ class MomentumDCA(BaseDCAStrategy):
     def __init__(self, budget_per_period: float, period_days: int, sma_period: int = 10):
         super().__init__(budget_per_period, period_days)
         self.sma_period = sma_period
-        self.prices = deque(maxlen=sma_period)
+        # Streaming O(1) fallback when the caller does not supply indicator values
+        self.sma = SMA(sma_period)
         self.last_invest_date = None
 
+    def indicators(self):
+        return {"sma": SMA(self.sma_period)}
+
     def should_invest(self, date: datetime, price: float, indicators: dict) -> bool:
-        self.prices.append(price)
+        sma = indicators["sma"] if "sma" in indicators else self.sma.update(price)
         
         # Need full history for SMA
-        if len(self.prices) < self.sma_period:
+        if math.isnan(sma):
             return False
-            
-        sma = np.mean(self.prices)
         
         # Momentum condition: Price > SMA
         if price > sma:
@@ -37,3 +41,16 @@ class MomentumDCA(BaseDCAStrategy):
 
     def get_investment_amount(self, date: datetime, available_cash: float) -> float:
         return min(self.budget, available_cash)
+
+    def generate_signals(self, data: pd.DataFrame, indicators=None):
+        prices = data["ask_price"].to_numpy(dtype=np.float64)
+        ts = timestamps_ns(data)
+        n = len(prices)
+
+        sma = indicators["sma"] if indicators and "sma" in indicators else SMA(self.sma_period).compute(prices)
+        # NaN warm-up rows compare False
+        above = prices > sma
+
+        signals = period_gate(ts, np.flatnonzero(above), self.period)
+        amounts = np.full(n, self.budget, dtype=np.float64)
+        return signals, amounts
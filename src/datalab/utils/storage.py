@@ -1,28 +1,44 @@
 import pandas as pd
+import numpy as np
 import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
 import pyarrow.parquet as pq
-from typing import List, Any
+from typing import List, Any, Callable, Union, Dict, Tuple, Optional, Iterator, Sequence
+from urllib.parse import quote
+import logging
 import os
-from datetime import datetime
+import re
+import time
+from datetime import datetime, date, timedelta
 
-def save_to_parquet(data: List[Any], filepath: str, compression: str = 'snappy'):
+logger = logging.getLogger(__name__)
+
+NS_PER_DAY = 86_400 * 10**9
+PARTITION_KEYS = ("exchange", "symbol", "date")
+
+def save_to_parquet(data: Union[List[Any], pa.Table], filepath: str, compression: str = 'snappy'):
     """
-    Save a list of dataclass objects or dictionaries to a Parquet file.
+    Save an Arrow table, or a list of dataclass objects or dictionaries, to a Parquet file.
     
     Args:
-        data: List of objects to save.
+        data: Arrow table (written as-is) or list of objects to save.
         filepath: Destination path.
         compression: Compression codec (default: 'snappy').
     """
-    if not data:
-        return
-
-    df = pd.DataFrame([d.__dict__ if hasattr(d, '__dict__') else d for d in data])
+    if isinstance(data, pa.Table):
+        if data.num_rows == 0:
+            return
+        table = data
+    else:
+        if not data:
+            return
+        df = pd.DataFrame([d.__dict__ if hasattr(d, '__dict__') else d for d in data])
+        table = pa.Table.from_pandas(df)
     
     # Ensure parent directory exists
     os.makedirs(os.path.dirname(filepath), exist_ok=True)
     
-    table = pa.Table.from_pandas(df)
     pq.write_table(table, filepath, compression=compression)
 
 def load_from_parquet(filepath: str) -> pd.DataFrame:
@@ -31,7 +47,510 @@ def load_from_parquet(filepath: str) -> pd.DataFrame:
     """
     return pd.read_parquet(filepath)
 
+TimeLike = Union[int, str, datetime, pd.Timestamp]
+
+def open_tick_dataset(path: str) -> ds.Dataset:
+    """
+    Open collected ticks as a pyarrow dataset.
+
+    Works for a single parquet file, a flat directory of files or the
+    Hive-partitioned layout written by PartitionedParquetWriter.
+    """
+    return ds.dataset(path, format="parquet", partitioning="hive")
+
+def _to_ns(value: TimeLike) -> int:
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert("UTC").tz_localize(None)
+    return int(ts.as_unit("ns").value)
+
+def tick_filter(
+    dataset: ds.Dataset,
+    exchanges: Optional[Sequence[str]] = None,
+    symbols: Optional[Sequence[str]] = None,
+    start: Optional[TimeLike] = None,
+    end: Optional[TimeLike] = None,
+) -> Optional[ds.Expression]:
+    """
+    Build a dataset filter for the given exchanges, symbols and [start, end) range.
+
+    Partition fields prune whole directories; the timestamp bounds are checked
+    against row-group statistics so non-overlapping row groups are skipped.
+    """
+    names = set(dataset.schema.names)
+    conditions = []
+    if exchanges is not None:
+        conditions.append(ds.field("exchange").isin(list(exchanges)))
+    if symbols is not None:
+        conditions.append(ds.field("symbol").isin(list(symbols)))
+
+    ts_type = dataset.schema.field("timestamp").type
+    for bound, is_start in ((start, True), (end, False)):
+        if bound is None:
+            continue
+        ns = _to_ns(bound)
+        value = pa.scalar(ns, type=ts_type) if pa.types.is_timestamp(ts_type) else ns
+        conditions.append(ds.field("timestamp") >= value if is_start else ds.field("timestamp") < value)
+        if "date" in names:
+            # ISO dates compare correctly as strings
+            day = (date(1970, 1, 1) + timedelta(days=ns // NS_PER_DAY)).isoformat()
+            conditions.append(ds.field("date") >= day if is_start else ds.field("date") <= day)
+
+    if not conditions:
+        return None
+    expression = conditions[0]
+    for condition in conditions[1:]:
+        expression = expression & condition
+    return expression
+
+def tick_scanner(
+    path: str,
+    exchanges: Optional[Sequence[str]] = None,
+    symbols: Optional[Sequence[str]] = None,
+    start: Optional[TimeLike] = None,
+    end: Optional[TimeLike] = None,
+    columns: Optional[Sequence[str]] = None,
+    batch_size: int = 131_072,
+) -> ds.Scanner:
+    """Create a scanner reading only the requested columns and matching rows."""
+    dataset = open_tick_dataset(path)
+    return dataset.scanner(
+        columns=list(columns) if columns is not None else None,
+        filter=tick_filter(dataset, exchanges, symbols, start, end),
+        batch_size=batch_size,
+    )
+
+def load_ticks(
+    path: str,
+    exchanges: Optional[Sequence[str]] = None,
+    symbols: Optional[Sequence[str]] = None,
+    start: Optional[TimeLike] = None,
+    end: Optional[TimeLike] = None,
+    columns: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+    """
+    Load collected ticks with predicate and column pushdown.
+
+    Args:
+        path: Parquet file or dataset directory.
+        exchanges: Keep only these exchanges.
+        symbols: Keep only these symbols.
+        start: Inclusive lower time bound (ns int, string or datetime; naive = UTC).
+        end: Exclusive upper time bound.
+        columns: Columns to read (default: all).
+    """
+    return tick_scanner(path, exchanges, symbols, start, end, columns).to_table().to_pandas()
+
+def iter_tick_batches(
+    path: str,
+    exchanges: Optional[Sequence[str]] = None,
+    symbols: Optional[Sequence[str]] = None,
+    start: Optional[TimeLike] = None,
+    end: Optional[TimeLike] = None,
+    columns: Optional[Sequence[str]] = None,
+    batch_size: int = 131_072,
+) -> Iterator[pa.RecordBatch]:
+    """Stream matching ticks as record batches of at most batch_size rows."""
+    scanner = tick_scanner(path, exchanges, symbols, start, end, columns, batch_size)
+    for batch in scanner.to_batches():
+        if batch.num_rows:
+            yield batch
+
 def get_timestamped_filename(prefix: str = "data", extension: str = "parquet") -> str:
     """Generate a filename with current timestamp (nanoseconds)."""
     timestamp = int(datetime.now().timestamp() * 1e9)
     return f"{prefix}_{timestamp}.{extension}"
+
+def _partition_dir(root: str, exchange: str, symbol: str, day: int) -> str:
+    day_str = (date(1970, 1, 1) + timedelta(days=int(day))).isoformat()
+    # Values are URI-encoded, matching pyarrow's hive partition decoding
+    return os.path.join(
+        root,
+        f"exchange={quote(str(exchange), safe='')}",
+        f"symbol={quote(str(symbol), safe='')}",
+        f"date={day_str}",
+    )
+
+def _dictionary_column(table: pa.Table, name: str) -> Tuple[np.ndarray, List[str]]:
+    column = table.column(name)
+    if not pa.types.is_dictionary(column.type):
+        column = pc.dictionary_encode(column)
+    array = column.unify_dictionaries().combine_chunks() if isinstance(column, pa.ChunkedArray) else column
+    return array.indices.to_numpy(zero_copy_only=False), array.dictionary.to_pylist()
+
+def split_by_partition(table: pa.Table):
+    """
+    Split a tick table into (exchange, symbol, day) groups.
+
+    Yields (exchange, symbol, day, sub_table) with the partition columns dropped
+    and rows kept in their original order within each group.
+    """
+    ex_codes, ex_values = _dictionary_column(table, "exchange")
+    sym_codes, sym_values = _dictionary_column(table, "symbol")
+    days = table.column("timestamp").to_numpy() // NS_PER_DAY
+
+    order = np.lexsort((days, sym_codes, ex_codes))
+    ex_sorted, sym_sorted, day_sorted = ex_codes[order], sym_codes[order], days[order]
+    change = (np.diff(ex_sorted) != 0) | (np.diff(sym_sorted) != 0) | (np.diff(day_sorted) != 0)
+    bounds = np.concatenate(([0], np.flatnonzero(change) + 1, [len(order)]))
+
+    data = table.drop_columns(["exchange", "symbol"])
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        if start == end:
+            continue
+        rows = order[start:end]
+        yield ex_values[ex_sorted[start]], sym_values[sym_sorted[start]], day_sorted[start], data.take(rows)
+
+class PartitionedParquetWriter:
+    """
+    Append-only writer for a Hive-partitioned tick dataset.
+
+    Layout: root/exchange=<ex>/symbol=<sym>/date=<YYYY-MM-DD>/<file_prefix>_<ns>.parquet.
+    One ParquetWriter is kept open per partition; each write appends a row
+    group. Files roll over once they exceed max_file_bytes or stay open longer
+    than max_file_age_s. In-progress files carry a leading '.' so dataset
+    readers skip them until they are closed and renamed. An in-progress file
+    has no footer, so a crash loses its rows: keep max_file_age_s short and
+    let compact_dataset merge the resulting small files.
+
+    A write may carry a token (e.g. the journal segments of its ticks);
+    on_closed(token) is called once every file holding rows of that write has
+    been closed and renamed, i.e. once the rows are durable and readable.
+
+    Not thread-safe: call it from a single writer thread. Several processes may
+    write to the same root as long as each uses a distinct file_prefix.
+    """
+    def __init__(self, root: str, max_file_bytes: int = 128 * 1024 * 1024,
+                 max_file_age_s: float = 60.0, compression: str = 'snappy',
+                 file_prefix: str = "part", on_closed: Optional[Callable[[Any], None]] = None):
+        self.root = root
+        self.file_prefix = file_prefix
+        self.max_file_bytes = max_file_bytes
+        self.max_file_age_s = max_file_age_s
+        self.compression = compression
+        self.on_closed = on_closed
+        # partition dir -> (writer, in-progress path, final path, opened at, tokens of its rows)
+        self._open: Dict[str, Tuple[pq.ParquetWriter, str, str, float, List[Any]]] = {}
+        # id(token) -> [token, open files holding its rows (+1 while its write is in progress)]
+        self._refs: Dict[int, List[Any]] = {}
+
+    def write(self, table: pa.Table, token: Any = None):
+        if token is not None:
+            # Held until the write completes, so a failed write never releases its token
+            self._hold(token)
+        for exchange, symbol, day, part in split_by_partition(table) if table.num_rows else ():
+            directory = _partition_dir(self.root, exchange, symbol, day)
+            writer, tmp_path, _, _, tokens = self._writer_for(directory, part.schema)
+            writer.write_table(part)
+            if token is not None and not any(t is token for t in tokens):
+                tokens.append(token)
+                self._hold(token)
+            if os.path.getsize(tmp_path) >= self.max_file_bytes:
+                self._roll(directory)
+        if token is not None:
+            self._unhold(token)
+        self.roll_expired()
+
+    def _hold(self, token: Any):
+        ref = self._refs.setdefault(id(token), [token, 0])
+        ref[1] += 1
+
+    def _unhold(self, token: Any):
+        ref = self._refs[id(token)]
+        ref[1] -= 1
+        if ref[1] > 0:
+            return
+        del self._refs[id(token)]
+        if self.on_closed is not None:
+            try:
+                self.on_closed(token)
+            except Exception as e:
+                logger.error(f"Dataset close callback failed: {e}")
+
+    def roll_expired(self):
+        """Close files that have been open longer than max_file_age_s."""
+        now = time.monotonic()
+        for directory, (_, _, _, opened, _) in list(self._open.items()):
+            if now - opened >= self.max_file_age_s:
+                self._roll(directory)
+
+    def close(self):
+        for directory in list(self._open):
+            self._roll(directory)
+
+    def recover_orphans(self) -> Dict[str, int]:
+        """
+        Deal with in-progress files this file_prefix left behind after a crash.
+
+        Files that are still readable (closed but not yet renamed) are renamed
+        into place; files without a footer cannot be read and are removed.
+        Other prefixes' files are left alone, since another process may be
+        writing them. Call before the first write.
+
+        Returns:
+            Counts of files renamed and removed.
+        """
+        stats = {"renamed": 0, "removed": 0}
+        pattern = re.compile(rf"^\.({re.escape(self.file_prefix)}_\d+\.parquet)\.inprogress$")
+        for directory, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if not d.startswith(("_", "."))]
+            for name in filenames:
+                match = pattern.match(name)
+                if match is None:
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    pq.ParquetFile(path).close()
+                except (pa.ArrowException, OSError):
+                    logger.warning(f"Removing unreadable in-progress file {path} ({os.path.getsize(path)} bytes)")
+                    os.remove(path)
+                    stats["removed"] += 1
+                    continue
+                os.replace(path, os.path.join(directory, match.group(1)))
+                stats["renamed"] += 1
+        return stats
+
+    def _writer_for(self, directory: str, schema: pa.Schema):
+        entry = self._open.get(directory)
+        if entry is not None and not entry[0].schema.equals(schema):
+            self._roll(directory)
+            entry = None
+        if entry is None:
+            os.makedirs(directory, exist_ok=True)
+            name = get_timestamped_filename(prefix=self.file_prefix)
+            final_path = os.path.join(directory, name)
+            tmp_path = os.path.join(directory, f".{name}.inprogress")
+            writer = pq.ParquetWriter(tmp_path, schema, compression=self.compression)
+            entry = (writer, tmp_path, final_path, time.monotonic(), [])
+            self._open[directory] = entry
+        return entry
+
+    def _roll(self, directory: str):
+        writer, tmp_path, final_path, _, tokens = self._open.pop(directory)
+        writer.close()
+        os.replace(tmp_path, final_path)
+        logger.info(f"Closed dataset file {final_path}")
+        for token in tokens:
+            self._unhold(token)
+
+def compact_dataset(root: str, row_group_size: int = 1_000_000, max_rows_per_file: int = 10_000_000,
+                    min_files: int = 2, compression: str = 'snappy',
+                    large_file_rows: Optional[int] = None) -> Dict[str, int]:
+    """
+    Merge small files in each leaf partition of a tick dataset.
+
+    Files with at least large_file_rows rows (default half of
+    max_rows_per_file) are left alone, so new data never causes an already
+    compacted partition to be rewritten. The small files of a partition, if
+    there are at least min_files of them, are streamed row group by row group,
+    in order of their first timestamp, through a ParquetWriter into files of
+    row_group_size-row groups, split at max_rows_per_file. Memory is bounded
+    by one row group, not by the partition. The merged files are renamed into
+    place before the originals are removed, so readers briefly see duplicates
+    rather than missing data.
+
+    Returns:
+        Counts of partitions compacted, files removed and files written.
+    """
+    if large_file_rows is None:
+        large_file_rows = max(1, max_rows_per_file // 2)
+    stats = {"partitions": 0, "files_removed": 0, "files_written": 0}
+    for directory, dirnames, filenames in os.walk(root):
+        # Skip spill/latency side directories and everything below them
+        dirnames[:] = [d for d in dirnames if not d.startswith(("_", "."))]
+        if os.path.basename(directory).startswith(("_", ".")):
+            continue
+        small = []
+        for name in sorted(filenames):
+            if not name.endswith(".parquet") or name.startswith((".", "_")):
+                continue
+            path = os.path.join(directory, name)
+            metadata = pq.read_metadata(path)
+            if metadata.num_rows < large_file_rows:
+                small.append((_first_timestamp(metadata), path))
+        if len(small) < min_files:
+            continue
+
+        files = [path for _, path in sorted(small)]
+        written = _merge_files(files, directory, row_group_size, max_rows_per_file, compression)
+        for f in files:
+            os.remove(f)
+        stats["partitions"] += 1
+        stats["files_removed"] += len(files)
+        stats["files_written"] += len(written)
+    return stats
+
+def _first_timestamp(metadata: pq.FileMetaData) -> int:
+    # Smallest timestamp from the row group statistics (0 when they are missing)
+    names = [metadata.schema.column(i).name for i in range(metadata.num_columns)]
+    if "timestamp" not in names:
+        return 0
+    column = names.index("timestamp")
+    lows = []
+    for i in range(metadata.num_row_groups):
+        statistics = metadata.row_group(i).column(column).statistics
+        if statistics is None or not statistics.has_min_max:
+            return 0
+        low = statistics.min
+        lows.append(low if isinstance(low, int) else pd.Timestamp(low).value)
+    return min(lows, default=0)
+
+def _conform(table: pa.Table, schema: pa.Schema) -> pa.Table:
+    # Add columns older files lack (as nulls) and order/cast columns like schema
+    columns = [
+        table.column(field.name).cast(field.type) if field.name in table.column_names
+        else pa.nulls(table.num_rows, field.type)
+        for field in schema
+    ]
+    return pa.Table.from_arrays(columns, schema=schema)
+
+def _merge_files(files: List[str], directory: str, row_group_size: int, max_rows_per_file: int,
+                 compression: str) -> List[str]:
+    """Stream files' row groups into new compacted files; returns their paths."""
+    schema = pa.unify_schemas([pq.read_schema(f) for f in files], promote_options="default")
+    written: List[str] = []
+    writer: Optional[pq.ParquetWriter] = None
+    tmp_path = final_path = None
+    file_rows = 0
+    pending: List[pa.Table] = []
+    pending_rows = 0
+
+    def emit(table: pa.Table):
+        nonlocal writer, tmp_path, final_path, file_rows
+        while table.num_rows:
+            if writer is None:
+                name = get_timestamped_filename(prefix="compacted")
+                final_path = os.path.join(directory, name)
+                tmp_path = os.path.join(directory, f".{name}.inprogress")
+                writer = pq.ParquetWriter(tmp_path, schema, compression=compression)
+                file_rows = 0
+            part = table.slice(0, max_rows_per_file - file_rows)
+            writer.write_table(part, row_group_size=row_group_size)
+            file_rows += part.num_rows
+            table = table.slice(part.num_rows)
+            if file_rows >= max_rows_per_file:
+                close()
+
+    def close():
+        nonlocal writer
+        writer.close()
+        writer = None
+        os.replace(tmp_path, final_path)
+        written.append(final_path)
+
+    for f in files:
+        parquet_file = pq.ParquetFile(f)
+        for i in range(parquet_file.num_row_groups):
+            group = _conform(parquet_file.read_row_group(i), schema)
+            pending.append(group)
+            pending_rows += group.num_rows
+            if pending_rows >= row_group_size:
+                # Emit whole row groups and keep the remainder for the next one
+                merged = pa.concat_tables(pending)
+                full = pending_rows - pending_rows % row_group_size
+                emit(merged.slice(0, full))
+                pending = [merged.slice(full)]
+                pending_rows -= full
+    if pending_rows:
+        emit(pa.concat_tables(pending))
+    if writer is not None:
+        close()
+    return written
+
+LATENCY_DIR = "_latency"
+ARBITRAGE_DIR = "_arbitrage"
+
+def _write_side_table(root: str, subdir: str, table: pa.Table, day_ns: int, file_prefix: str,
+                      compression: str) -> str:
+    # Side tables live under root/<subdir>/date=<YYYY-MM-DD>/; the leading underscore keeps them out of tick scans
+    day = (date(1970, 1, 1) + timedelta(days=day_ns // NS_PER_DAY)).isoformat()
+    directory = os.path.join(root, subdir, f"date={day}")
+    os.makedirs(directory, exist_ok=True)
+    name = get_timestamped_filename(prefix=file_prefix)
+    final_path = os.path.join(directory, name)
+    tmp_path = os.path.join(directory, f".{name}.inprogress")
+    pq.write_table(table, tmp_path, compression=compression)
+    os.replace(tmp_path, final_path)
+    return final_path
+
+def _side_dataset(root: str, subdir: str) -> Optional[ds.Dataset]:
+    # None when nothing has been written yet (e.g. the feature was never enabled)
+    path = os.path.join(root, subdir)
+    if not os.path.isdir(path):
+        return None
+    return ds.dataset(path, format="parquet", partitioning="hive")
+
+def _side_filter(conditions: List[ds.Expression]) -> Optional[ds.Expression]:
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return expression
+
+def write_latency_histograms(root: str, table: pa.Table, file_prefix: str = "latency",
+                             compression: str = 'snappy') -> Optional[str]:
+    """
+    Persist one interval of latency histogram buckets next to a tick dataset.
+
+    Files go to root/_latency/date=<YYYY-MM-DD>/<file_prefix>_<ns>.parquet,
+    dated by the interval end; the leading underscore keeps them out of tick
+    dataset scans. Returns the written path, or None for an empty table.
+    """
+    if table.num_rows == 0:
+        return None
+    end_ns = table.column("interval_end")[0].as_py()
+    return _write_side_table(root, LATENCY_DIR, table, end_ns, file_prefix, compression)
+
+def load_latency_histograms(
+    root: str,
+    exchanges: Optional[Sequence[str]] = None,
+    symbols: Optional[Sequence[str]] = None,
+    start: Optional[TimeLike] = None,
+    end: Optional[TimeLike] = None,
+) -> pa.Table:
+    """Load persisted latency histogram buckets whose interval overlaps [start, end) (empty if none exist)."""
+    dataset = _side_dataset(root, LATENCY_DIR)
+    if dataset is None:
+        return pa.table({})
+    conditions = []
+    if exchanges is not None:
+        conditions.append(ds.field("exchange").isin(list(exchanges)))
+    if symbols is not None:
+        conditions.append(ds.field("symbol").isin(list(symbols)))
+    if start is not None:
+        conditions.append(ds.field("interval_end") > _to_ns(start))
+    if end is not None:
+        conditions.append(ds.field("interval_start") < _to_ns(end))
+    return dataset.to_table(filter=_side_filter(conditions))
+
+def write_arbitrage_events(root: str, table: pa.Table, file_prefix: str = "arbitrage",
+                           compression: str = 'snappy') -> Optional[str]:
+    """
+    Persist closed cross-exchange opportunities under root/_arbitrage/date=<YYYY-MM-DD>/.
+
+    Dated by the last close in the table. Returns the written path, or None for an empty table.
+    """
+    if table.num_rows == 0:
+        return None
+    end_ns = pc.max(table.column("closed_at")).as_py()
+    return _write_side_table(root, ARBITRAGE_DIR, table, end_ns, file_prefix, compression)
+
+def load_arbitrage_events(
+    root: str,
+    symbols: Optional[Sequence[str]] = None,
+    start: Optional[TimeLike] = None,
+    end: Optional[TimeLike] = None,
+) -> pa.Table:
+    """Load persisted opportunities that were open at some point in [start, end) (empty if none exist)."""
+    dataset = _side_dataset(root, ARBITRAGE_DIR)
+    if dataset is None:
+        return pa.table({})
+    conditions = []
+    if symbols is not None:
+        conditions.append(ds.field("symbol").isin(list(symbols)))
+    if start is not None:
+        conditions.append(ds.field("closed_at") > _to_ns(start))
+    if end is not None:
+        conditions.append(ds.field("opened_at") < _to_ns(end))
+    return dataset.to_table(filter=_side_filter(conditions))
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+from datalab.analysis.aggregate import SpreadAggregator
+
+NOW = 1_760_000_000 * 10**9  # 2025 timestamps, far from the epoch
+
+def _batch(ts, values, exchange="binance", symbol="BTC-USD"):
+    n = len(ts)
+    return pa.record_batch({
+        "timestamp": pa.array(ts, pa.int64()),
+        "exchange": pa.array([exchange] * n),
+        "symbol": pa.array([symbol] * n),
+        "spread_10k": pa.array(values, pa.float64()),
+    })
+
+def test_matches_pandas_across_batches():
+    rng = np.random.default_rng(5)
+    ts = NOW + np.sort(rng.integers(0, 10 * 60 * 10**9, 5000))
+    values = rng.lognormal(0, 1, 5000)
+    aggregator = SpreadAggregator(60 * 10**9)
+    for i in range(0, 5000, 700):
+        aggregator.update(_batch(ts[i:i + 700], values[i:i + 700]))
+    result = aggregator.result()
+
+    frame = pd.DataFrame({"bucket": ts // (60 * 10**9), "v": values})
+    expected = frame.groupby("bucket")["v"].agg(["count", "mean", "min", "max", "median"])
+    assert result["timestamp"].astype("int64").tolist() == (expected.index * 60 * 10**9).tolist()
+    assert result["count"].tolist() == expected["count"].tolist()
+    np.testing.assert_allclose(result["mean"], expected["mean"])
+    np.testing.assert_array_equal(result["min"], expected["min"])
+    np.testing.assert_array_equal(result["max"], expected["max"])
+    np.testing.assert_allclose(result["p50"], expected["median"], rtol=0.03)
+
+@pytest.mark.parametrize("bucket_ns", [10**6, 100 * 10**6, 10**9])
+def test_narrow_buckets_on_current_timestamps(bucket_ns):
+    aggregator = SpreadAggregator(bucket_ns)
+    aggregator.update(_batch([NOW, NOW + bucket_ns, NOW + 5 * bucket_ns], [1.0, 2.0, 3.0]))
+    # Later batches may also reach before the first timestamp seen
+    aggregator.update(_batch([NOW - 3 * bucket_ns], [4.0]))
+    result = aggregator.result()
+    assert result["timestamp"].astype("int64").tolist() == [
+        (NOW // bucket_ns + k) * bucket_ns for k in (-3, 0, 1, 5)
+    ]
+    assert result["max"].tolist() == [4.0, 1.0, 2.0, 3.0]
+
+def test_range_beyond_the_bucket_budget_is_rejected():
+    aggregator = SpreadAggregator(1)
+    aggregator.update(_batch([NOW], [1.0]))
+    with pytest.raises(ValueError):
+        aggregator.update(_batch([NOW + (1 << 34)], [1.0]))
+
+def test_groups_and_nans():
+    aggregator = SpreadAggregator(10**9)
+    aggregator.update(_batch([NOW, NOW + 1], [1.0, float("nan")], exchange="dydx"))
+    aggregator.update(_batch([NOW], [-2.0], symbol="ETH-USD"))
+    result = aggregator.result()
+    assert list(zip(result["exchange"], result["symbol"], result["count"])) == [
+        ("binance", "ETH-USD", 1), ("dydx", "BTC-USD", 1),
+    ]
+    assert result["p50"].tolist() == [-2.0, 1.0]
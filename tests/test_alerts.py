@@ -0,0 +1,87 @@
+import asyncio
+import json
+import pytest
+from datalab.collector.alerts import FIRING, RESOLVED, AlertDispatcher, AlertSink, FileSink, LogSink, build_sinks
+
+SEC = 10**9
+
+class _Recorder(AlertSink):
+    def __init__(self, delay=0.0):
+        self.batches = []
+        self.delay = delay
+
+    async def send(self, alerts):
+        await asyncio.sleep(self.delay)
+        self.batches.append(alerts)
+
+def _window(dispatcher):
+    # Close the current window and return its batch as (state, count, peak) tuples
+    dispatcher._close_window()
+    if dispatcher._queue.empty():
+        return []
+    return [(a.state, a.count, a.peak) for a in dispatcher._queue.get_nowait()]
+
+def test_hysteresis_keeps_a_hovering_value_firing():
+    dispatcher = AlertDispatcher(10.0, [], clear_threshold=8.0, cooldown_s=0.0)
+    for i, value in enumerate([11.0, 9.5, 10.5, 9.0, 12.0]):
+        dispatcher.evaluate("binance", "BTC-USD", value, i * SEC)
+    assert _window(dispatcher) == [(FIRING, 3, 12.0)]
+    assert dispatcher.active() == 1
+
+    dispatcher.evaluate("binance", "BTC-USD", 8.0, 5 * SEC)
+    assert _window(dispatcher) == [(RESOLVED, 0, 8.0)]
+    assert dispatcher.active() == 0
+    assert (dispatcher.fired, dispatcher.resolved) == (1, 1)
+
+def test_cooldown_holds_back_a_new_alert_until_it_expires():
+    dispatcher = AlertDispatcher(10.0, [], cooldown_s=60.0)
+    dispatcher.evaluate("dydx", "ETH-USD", 11.0, 0)
+    dispatcher.evaluate("dydx", "ETH-USD", 5.0, 1 * SEC)
+    assert [s for s, _, _ in _window(dispatcher)] == [FIRING, RESOLVED]
+
+    # Breaches again inside the cooldown: suppressed
+    dispatcher.evaluate("dydx", "ETH-USD", 11.0, 10 * SEC)
+    dispatcher.evaluate("dydx", "ETH-USD", 12.0, 30 * SEC)
+    assert _window(dispatcher) == []
+    assert dispatcher.suppressed == 1
+
+    # Still breaching once the cooldown is over: fires on the next tick
+    dispatcher.evaluate("dydx", "ETH-USD", 13.0, 60 * SEC)
+    assert _window(dispatcher) == [(FIRING, 1, 13.0)]
+    assert dispatcher.fired == 2
+
+def test_resolve_and_refire_in_one_window_stay_one_alert():
+    dispatcher = AlertDispatcher(10.0, [], cooldown_s=0.0)
+    dispatcher.evaluate("binance", "BTC-USD", 11.0, 0)
+    dispatcher.evaluate("binance", "BTC-USD", 5.0, 1)
+    dispatcher.evaluate("binance", "BTC-USD", 15.0, 2)
+    dispatcher.evaluate("dydx", "BTC-USD", 20.0, 3)
+    assert _window(dispatcher) == [(FIRING, 2, 15.0), (FIRING, 1, 20.0)]
+
+def test_full_queue_drops_batches_and_sinks_get_the_rest(tmp_path):
+    path = tmp_path / "alerts" / "out.jsonl"
+
+    async def run():
+        recorder = _Recorder(delay=0.05)
+        dispatcher = AlertDispatcher(10.0, [recorder, FileSink(str(path))], cooldown_s=0.0, window_s=60.0,
+                                     queue_size=1)
+        await dispatcher.start()
+        for i in range(4):
+            dispatcher.evaluate(f"venue{i}", "BTC-USD", 11.0, i)
+            dispatcher._close_window()
+        await dispatcher.stop()
+        return recorder, dispatcher
+
+    recorder, dispatcher = asyncio.run(run())
+    delivered = [a.exchange for batch in recorder.batches for a in batch]
+    assert dispatcher.sent == len(delivered)
+    assert dispatcher.sent + dispatcher.dropped == 4
+    assert dispatcher.dropped >= 1
+    assert [json.loads(line)["exchange"] for line in path.read_text().splitlines()] == delivered
+
+def test_sink_config():
+    assert [type(s) for s in build_sinks(None)] == [LogSink]
+    with pytest.raises(ValueError):
+        build_sinks([{"type": "pager"}])
+    with pytest.raises(ValueError):
+        AlertDispatcher(10.0, [], clear_threshold=11.0)
@@ -0,0 +1,55 @@
+from datalab.collector.arbitrage import ArbitrageDetector
+
+MS = 10**6
+
+def test_native_symbols_of_both_venues_are_compared():
+    events = []
+    detector = ArbitrageDetector(
+        min_edge_bps=5.0,
+        symbol_map={"binance": {"BTCUSDT": "BTC-USD"}},
+        on_event=events.append,
+    )
+    detector.update("binance", "BTCUSDT", 100.0, 100.1, 0)
+    detector.update("dydx", "BTC-USD", 100.3, 100.4, 1 * MS)
+
+    assert [(e.kind, e.symbol, e.buy_exchange, e.sell_exchange) for e in events] == [
+        ("open", "BTC-USD", "binance", "dydx"),
+    ]
+
+def test_unmapped_native_symbols_never_match():
+    events = []
+    detector = ArbitrageDetector(min_edge_bps=5.0, on_event=events.append)
+    detector.update("binance", "BTCUSDT", 100.0, 100.1, 0)
+    detector.update("dydx", "BTC-USD", 100.3, 100.4, 1 * MS)
+    assert events == []
+
+def test_venue_pair_is_chosen_after_fees():
+    events = []
+    # A has the best raw bid but its fee makes C the better place to sell
+    detector = ArbitrageDetector(min_edge_bps=0.0, fees_bps={"A": 100.0}, on_event=events.append)
+    detector.update("B", "X", 99.0, 100.0, 0)
+    detector.update("C", "X", 100.9, 101.0, 1 * MS)
+    detector.update("A", "X", 101.0, 102.0, 2 * MS)
+
+    assert [(e.kind, e.buy_exchange, e.sell_exchange) for e in events] == [("open", "B", "C")]
+    assert round(events[0].entry_edge_bps, 6) == 90.0
+
+def test_close_reports_duration_and_peak():
+    detector = ArbitrageDetector(min_edge_bps=10.0)
+    detector.update("A", "X", 100.0, 100.1, 0)
+    detector.update("B", "X", 100.3, 100.4, 1 * MS)
+    detector.update("B", "X", 100.5, 100.6, 2 * MS)
+    detector.update("B", "X", 100.0, 100.1, 5 * MS)
+
+    table = detector.snapshot().to_pylist()
+    assert len(table) == 1
+    assert table[0]["duration_ms"] == 4.0
+    assert table[0]["peak_edge_bps"] > table[0]["entry_edge_bps"]
+    assert detector.snapshot().num_rows == 0
+
+def test_stale_quotes_are_ignored():
+    events = []
+    detector = ArbitrageDetector(min_edge_bps=0.0, max_quote_age_ms=100, on_event=events.append)
+    detector.update("A", "X", 100.0, 100.1, 0)
+    detector.update("B", "X", 100.3, 100.4, 200 * MS)
+    assert events == []
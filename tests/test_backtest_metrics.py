@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+from datalab.backtest.engine import BacktestEngine
+from datalab.backtest.metrics import METRIC_NAMES, compute_metrics, periods_per_year
+from datalab.strategy.library.dca import PeriodicDCA
+
+def _curves(runs=6, n=300, seed=5):
+    rng = np.random.default_rng(seed)
+    curves = 10_000.0 * np.cumprod(1 + rng.normal(0.0005, 0.01, (runs, n)), axis=1)
+    curves[0] = 10_000.0  # flat curve: zero volatility and drawdown
+    return curves
+
+def test_batched_metrics_equal_one_curve_at_a_time():
+    curves = _curves()
+    capital = np.full(len(curves), 10_000.0)
+    batched = compute_metrics(curves, capital, 1.2)
+    for i, curve in enumerate(curves):
+        single = compute_metrics(curve, 10_000.0, 1.2)
+        for name in METRIC_NAMES:
+            assert batched[name][i] == pytest.approx(single[name], rel=1e-12, abs=1e-12, nan_ok=True), name
+        np.testing.assert_allclose(batched["drawdown"][i], single["drawdown"])
+
+def test_metrics_match_the_pandas_reference():
+    curve = _curves()[1]
+    metrics = compute_metrics(curve, 10_000.0, 1.0)
+    returns = pd.Series(curve).pct_change().dropna()
+    assert metrics["volatility"] == pytest.approx(returns.std() * np.sqrt(252) * 100)
+    assert metrics["sharpe_ratio"] == pytest.approx(returns.mean() / returns.std() * np.sqrt(252))
+    peak = np.maximum.accumulate(curve)
+    assert metrics["max_drawdown"] == pytest.approx(((peak - curve) / peak).max() * 100)
+    assert metrics["value_at_risk"] == pytest.approx(np.percentile(returns, 5) * 100)
+
+    flat = compute_metrics(_curves()[0], 10_000.0, 1.0)
+    assert (flat["volatility"], flat["sharpe_ratio"], flat["max_drawdown"]) == (0.0, 0.0, 0.0)
+
+def test_annualization_follows_bar_spacing():
+    daily = pd.date_range("2024-01-01", periods=10, freq="D").as_unit("ns").asi8
+    hourly = pd.date_range("2024-01-01", periods=10, freq="h").as_unit("ns").asi8
+    assert periods_per_year(daily) == 252
+    assert periods_per_year(hourly) == 252 * 24
+    assert periods_per_year(daily[:1]) == 252
+
+def test_run_batch_equals_run():
+    rng = np.random.default_rng(1)
+    bid = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 200)))
+    data = pd.DataFrame({"timestamp": pd.date_range("2023-01-01", periods=200, freq="D"),
+                         "bid_price": bid, "ask_price": bid * 1.001})
+    engine = BacktestEngine(5_000.0, 0.001)
+    strategies = [PeriodicDCA(amount, days) for amount in (50.0, 200.0) for days in (1, 7)]
+    for batched, strategy in zip(engine.run_batch(strategies, data), strategies):
+        single = engine.run(strategy, data, vectorized=True)
+        for name in ("total_invested", "total_fees", "net_profit") + METRIC_NAMES:
+            assert getattr(batched, name) == pytest.approx(getattr(single, name), rel=1e-12, abs=1e-12), name
+    assert engine.run_batch([], data) == []
@@ -0,0 +1,45 @@
+import sys
+import pytest
+from datalab import cli
+from datalab.backtest.bars import MixedExchangesError, load_bars
+from datalab.collector.buffer import TickBuffer
+from datalab.collector.exchange import StandardizedTick
+from datalab.utils.storage import PartitionedParquetWriter
+
+MIN = 60 * 10**9
+T0 = 1_700_000_040 * 10**9  # a minute boundary
+
+def _write(root, ticks):
+    buffer = TickBuffer(len(ticks))
+    for ts, exchange, bid in ticks:
+        buffer.append(StandardizedTick(ts, exchange, "BTC-USD", bid, bid + 1.0, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0))
+    writer = PartitionedParquetWriter(root)
+    writer.write(buffer.to_arrow())
+    writer.close()
+
+def test_bars_are_ohlc_per_bucket(tmp_path):
+    root = str(tmp_path)
+    _write(root, [(T0 + 5, "binance", 10.0), (T0 + 1, "binance", 12.0), (T0 + 9, "binance", 11.0),
+                  (T0 + MIN, "binance", 20.0)])
+    bars = load_bars(root, "BTC-USD", "1min")
+
+    assert bars["timestamp"].astype("int64").tolist() == [T0, T0 + MIN]
+    first = bars.iloc[0]
+    assert (first["bid_open"], first["bid_high"], first["bid_low"], first["bid_close"]) == (12.0, 12.0, 10.0, 11.0)
+    assert first["bid_price"] == 11.0 and first["ask_price"] == 12.0
+    assert bars["ticks"].tolist() == [3, 1]
+
+def test_mixed_exchanges_need_a_choice(tmp_path):
+    root = str(tmp_path)
+    _write(root, [(T0, "binance", 10.0), (T0 + 1, "dydx", 11.0)])
+    with pytest.raises(MixedExchangesError):
+        load_bars(root, "BTC-USD", "1min")
+    assert load_bars(root, "BTC-USD", "1min", exchange="dydx")["bid_close"].tolist() == [11.0]
+
+def test_cli_asks_for_exchange_instead_of_failing(tmp_path, monkeypatch, capsys):
+    root = str(tmp_path)
+    _write(root, [(T0, "binance", 10.0), (T0 + 1, "dydx", 11.0)])
+    monkeypatch.setattr(sys, "argv", ["datalab", "backtest", "--strategy", "dca_daily", "--asset", "BTC-USD",
+                                      "--start", "2023-11-01", "--end", "2023-12-01", "--data", root])
+    cli.main()
+    assert "pass --exchange" in capsys.readouterr().out
@@ -0,0 +1,46 @@
+from dataclasses import replace
+import pytest
+from datalab.collector.buffer import TickBuffer, TickDictionary
+from datalab.collector.exchange import StandardizedTick
+
+TICK = StandardizedTick(1, "binance", "BTCUSDT", 100.0, 101.0, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0,
+                        latency_ms=0.5, exchange_timestamp=0, sequence=7)
+
+def test_round_trip_matches_the_ticks():
+    buffer = TickBuffer(4)
+    ticks = [TICK, replace(TICK, timestamp=2, exchange="dydx", symbol="BTC-USD", latency_ms=None,
+                           exchange_timestamp=None, sequence=None)]
+    for tick in ticks:
+        buffer.append(tick)
+    rows = buffer.to_arrow().to_pylist()
+    assert rows[0] == {**vars(TICK)}
+    assert rows[1]["exchange"] == "dydx" and rows[1]["symbol"] == "BTC-USD"
+    assert rows[1]["latency_ms"] is None
+    assert rows[1]["exchange_timestamp"] is None and rows[1]["sequence"] is None
+
+def test_latency_argument_overrides_the_tick():
+    buffer = TickBuffer(1)
+    buffer.append(TICK, latency_ms=2.5)
+    assert buffer.to_arrow().column("latency_ms").to_pylist() == [2.5]
+
+def test_full_buffer_overwrites_oldest_in_order():
+    buffer = TickBuffer(3)
+    for ts in range(5):
+        buffer.append(replace(TICK, timestamp=ts))
+    assert buffer.is_full() and len(buffer) == 3 and buffer.dropped == 2
+    assert buffer.to_arrow().column("timestamp").to_pylist() == [2, 3, 4]
+    buffer.clear()
+    assert len(buffer) == 0 and buffer.to_arrow().num_rows == 0
+
+def test_dictionaries_are_shared_across_buffers():
+    dictionaries = {"exchange": TickDictionary(), "symbol": TickDictionary()}
+    first, second = TickBuffer(2, dictionaries), TickBuffer(2, dictionaries)
+    first.append(TICK)
+    second.append(replace(TICK, symbol="ETHUSDT"))
+    second.append(TICK)
+    assert dictionaries["symbol"].values == ["BTCUSDT", "ETHUSDT"]
+    assert second.to_arrow().column("symbol").to_pylist() == ["ETHUSDT", "BTCUSDT"]
+
+def test_capacity_must_be_positive():
+    with pytest.raises(ValueError):
+        TickBuffer(0)
@@ -0,0 +1,38 @@
+import asyncio
+from datalab.collector.clients.binance import BinanceExchange
+from datalab.collector.clients.dydx import DydxExchange
+from datalab.collector.clients.hyperliquid import SimulatedExchange
+from datalab.collector.connections import ConnectionManager
+
+def test_shards_respect_the_venue_limit_and_share_one_session():
+    async def run():
+        connections = ConnectionManager()
+        symbols = [f"S{i}-USD" for i in range(45)]
+        shards = connections.shards(DydxExchange(symbols))
+        assert [len(s.symbols) for s in shards] == [20, 20, 5]
+        assert sum((s.symbols for s in shards), []) == symbols
+        # Every shard has its own per-connection state
+        assert len({id(s.books) for s in shards}) == 3
+
+        binance = connections.shards(BinanceExchange([f"S{i}USDT" for i in range(600)]))
+        assert [len(s.symbols) for s in binance] == [512, 88]
+
+        session = connections.session()
+        assert all(s.session is session and not s._owns_session for s in shards + binance)
+        # Closing a shard leaves the shared session open
+        await shards[0].close()
+        assert not session.closed
+        await connections.close()
+        assert session.closed
+
+    asyncio.run(run())
+
+def test_explicit_limit_and_unlimited_venues():
+    async def run():
+        connections = ConnectionManager()
+        exchange = SimulatedExchange(["A", "B", "C"])
+        assert connections.shards(exchange) == [exchange]
+        assert [s.symbols for s in connections.shards(exchange, symbols_per_connection=2)] == [["A", "B"], ["C"]]
+        await connections.close()
+
+    asyncio.run(run())
@@ -0,0 +1,46 @@
+import json
+import pytest
+from datalab.collector.decoding import (
+    SAMPLE_MESSAGES, BookLevels, BookTop, StdlibDecoder, available_decoders, get_decoder,
+)
+
+DYDX_SNAPSHOT = json.dumps({"type": "subscribed", "id": "ETH-USD", "contents": {
+    "bids": [{"price": "1800.5", "size": "2", "offset": "10"}],
+    "asks": [{"price": "1801", "size": "0.5", "offset": "12"}, {"price": "1802", "size": "1"}]}})
+IGNORED = {
+    "binance": json.dumps({"result": None, "id": 1}),
+    "dydx": json.dumps({"type": "connected", "connection_id": "abc"}),
+}
+
+def _messages():
+    for label, raw in SAMPLE_MESSAGES.items():
+        yield ("dydx" if label.startswith("dydx") else "binance"), raw
+    yield "dydx", DYDX_SNAPSHOT
+    yield from IGNORED.items()
+
+@pytest.mark.parametrize("name", available_decoders())
+def test_decoders_agree_with_stdlib(name):
+    decoder, reference = get_decoder(name), StdlibDecoder()
+    for venue, raw in _messages():
+        expected = getattr(reference, venue)(raw)
+        assert getattr(decoder, venue)(raw) == expected
+        assert getattr(decoder, venue)(raw.encode()) == expected
+
+def test_numbers_are_parsed():
+    decoder = StdlibDecoder()
+    top = decoder.binance(SAMPLE_MESSAGES["binance_bookTicker"])
+    assert top == BookTop("BNBBTC", 25.3519, 31.21, 25.3652, 40.66, 400900217)
+    depth = decoder.binance(SAMPLE_MESSAGES["binance_depth20"])
+    assert depth.symbol == "BTCUSDT" and depth.is_snapshot and depth.offset == 160
+    assert depth.bids[0] == (30000.0, 1.5) and len(depth.asks) == 20
+    delta = decoder.dydx(SAMPLE_MESSAGES["dydx_delta"])
+    assert delta == BookLevels("BTC-USD", [(30000.5, 0.25)], [(30001.0, 0.0), (30002.0, 1.1)], False, 178)
+    snapshot = decoder.dydx(DYDX_SNAPSHOT)
+    assert snapshot.asks == [(1801.0, 0.5, 12), (1802.0, 1.0, 0)]
+
+def test_auto_and_unknown_decoders():
+    fastest = next(n for n in ("msgspec", "orjson", "stdlib") if n in available_decoders())
+    assert get_decoder("auto").name == fastest
+    assert get_decoder("stdlib").name == "stdlib"
+    with pytest.raises(ValueError):
+        get_decoder("simdjson")
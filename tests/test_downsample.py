@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+from datalab.analysis.downsample import downsample, lttb_indices, minmax_indices
+
+def _series(n=100_000):
+    rng = np.random.default_rng(2)
+    x = pd.date_range("2024-01-01", periods=n, freq="s").to_numpy()
+    y = np.cumsum(rng.normal(0, 1, n))
+    y[31_337] = y.max() + 1000.0
+    y[77_777] = y.min() - 1000.0
+    return x, y
+
+def test_minmax_keeps_every_bucket_extreme():
+    x, y = _series()
+    idx = minmax_indices(x, y, 500)
+    assert len(idx) <= 1002
+    assert np.all(np.diff(idx) > 0)
+    assert idx[0] == 0 and idx[-1] == len(x) - 1
+    assert {31_337, 77_777} <= set(idx.tolist())
+    # Each of the 500 equal-width buckets contributes its min and max
+    buckets = np.minimum((np.arange(len(x)) / (len(x) - 1) * 500).astype(np.int64), 499)
+    for b in (0, 123, 499):
+        members = np.flatnonzero(buckets == b)
+        assert members[np.argmax(y[members])] in idx and members[np.argmin(y[members])] in idx
+
+def test_lttb_size_endpoints_and_spikes():
+    x, y = _series()
+    idx = lttb_indices(x, y, 2000)
+    assert len(idx) == 2000
+    assert np.all(np.diff(idx) > 0)
+    assert idx[0] == 0 and idx[-1] == len(x) - 1
+    assert {31_337, 77_777} <= set(idx.tolist())
+
+def test_small_series_and_no_budget_are_untouched():
+    x, y = np.arange(10), np.arange(10.0)
+    assert downsample(x, y, 100)[0] is x
+    assert len(downsample(*_series(), max_points=None)[0]) == 100_000
+    np.testing.assert_array_equal(lttb_indices(x, y, 20), np.arange(10))
+
+def test_downsample_respects_the_budget():
+    x, y = _series()
+    for method in ("minmax", "lttb"):
+        dx, dy = downsample(x, y, 5000, method=method)
+        assert len(dx) <= 5000 and dx.dtype == x.dtype
+    with pytest.raises(ValueError):
+        downsample(x, y, 10, method="every-nth")
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+from datalab.backtest.engine import BacktestEngine
+from datalab.strategy.library.dca import PeriodicDCA
+from datalab.strategy.library.momentum import MomentumDCA
+
+def _prices(n=400, seed=3):
+    rng = np.random.default_rng(seed)
+    bid = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({
+        "timestamp": pd.date_range("2022-01-01", periods=n, freq="D"),
+        "bid_price": bid,
+        "ask_price": bid * 1.001,
+    })
+
+def _assert_same(a, b):
+    for name in ("total_invested", "final_value", "total_fees", "net_profit", "return_pct", "cagr",
+                 "volatility", "sharpe_ratio", "sortino_ratio", "calmar_ratio", "max_drawdown", "win_rate"):
+        assert getattr(a, name) == pytest.approx(getattr(b, name), rel=1e-9, abs=1e-9), name
+    np.testing.assert_allclose(a.daily_values, b.daily_values, rtol=1e-12)
+    assert len(a.history) == len(b.history)
+    np.testing.assert_array_equal(a.history.column("date"), b.history.column("date"))
+    for name in ("amount", "price", "fee", "asset_amount"):
+        np.testing.assert_allclose(a.history.column(name), b.history.column(name), rtol=1e-12)
+
+@pytest.mark.parametrize("strategy", [
+    PeriodicDCA(100.0, 1),
+    PeriodicDCA(250.0, 7),
+    MomentumDCA(100.0, 3, sma_period=10),
+])
+def test_vectorized_matches_loop(strategy):
+    data = _prices()
+    engine = BacktestEngine(10_000.0, 0.001)
+    loop = engine.run(strategy, data)
+    vectorized = engine.run(strategy, data, vectorized=True)
+    assert len(loop.history) > 0
+    _assert_same(loop, vectorized)
+
+def test_cash_runs_out_the_same_way():
+    # Budget exhausts capital part-way through
+    data = _prices(120)
+    engine = BacktestEngine(1_000.0, 0.001)
+    _assert_same(engine.run(PeriodicDCA(100.0, 1), data), engine.run(PeriodicDCA(100.0, 1), data, vectorized=True))
+
+def test_unsorted_input_is_sorted_first():
+    data = _prices(60)
+    shuffled = data.sample(frac=1.0, random_state=1)
+    engine = BacktestEngine()
+    _assert_same(engine.run(PeriodicDCA(100.0, 7), data, vectorized=True),
+                 engine.run(PeriodicDCA(100.0, 7), shuffled, vectorized=True))
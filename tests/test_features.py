@@ -0,0 +1,53 @@
+import pandas as pd
+from datalab.backtest.features import FeatureCache, load_features
+from datalab.collector.buffer import TickBuffer
+from datalab.collector.exchange import StandardizedTick
+from datalab.utils.storage import PartitionedParquetWriter
+
+DAY = 1_700_000_000 * 10**9
+
+def _write_ticks(root, symbol, start):
+    buffer = TickBuffer(10)
+    for i in range(10):
+        buffer.append(StandardizedTick(DAY + start + i, "binance", symbol, 100.0, 101.0,
+                                       1.0, 2.0, 3.0, 4.0, 5.0, 6.0))
+    writer = PartitionedParquetWriter(root)
+    writer.write(buffer.to_arrow())
+    writer.close()
+
+def _load(root, cache, builds, exchange=None):
+    def build():
+        builds.append(1)
+        return pd.DataFrame({"timestamp": [1, 2], "bid_price": [1.0, 2.0], "ask_price": [1.5, 2.5]})
+    return load_features(build, "BTC/USD", "1h", "2023-01-01", "2023-12-31", {},
+                         source=root, cache=cache, exchange=exchange)
+
+def test_new_file_in_symbol_partition_invalidates_cache(tmp_path):
+    root = str(tmp_path / "data")
+    cache = FeatureCache(str(tmp_path / "cache"))
+    builds = []
+    _write_ticks(root, "BTC/USD", 0)
+
+    _load(root, cache, builds, exchange="binance")
+    _load(root, cache, builds, exchange="binance")
+    assert len(builds) == 1
+
+    # Other symbols do not touch the entry
+    _write_ticks(root, "ETH-USD", 100)
+    _load(root, cache, builds, exchange="binance")
+    assert len(builds) == 1
+
+    _write_ticks(root, "BTC/USD", 100)
+    _load(root, cache, builds, exchange="binance")
+    assert len(builds) == 2
+
+def test_exchange_is_part_of_the_key(tmp_path):
+    root = str(tmp_path / "data")
+    cache = FeatureCache(str(tmp_path / "cache"))
+    builds = []
+    _write_ticks(root, "BTC/USD", 0)
+
+    _load(root, cache, builds, exchange="binance")
+    _load(root, cache, builds, exchange="dydx")
+    _load(root, cache, builds)
+    assert len(builds) == 3
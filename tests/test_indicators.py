@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+from datalab.strategy.indicators import EMA, RSI, SMA, Drawdown, RollingStd, compute_indicators
+
+INDICATORS = [SMA(20), EMA(12), RollingStd(20), RSI(14), Drawdown()]
+
+def _prices(n=2000, seed=3):
+    rng = np.random.default_rng(seed)
+    return 30_000.0 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+
+@pytest.mark.parametrize("indicator", INDICATORS, ids=lambda i: type(i).__name__)
+def test_streaming_matches_vectorized(indicator):
+    values = _prices()
+    indicator.reset()
+    streamed = np.array([indicator.update(v) for v in values])
+    np.testing.assert_allclose(streamed, indicator.compute(values), rtol=1e-9, equal_nan=True)
+    # reset() starts over
+    indicator.reset()
+    again = np.array([indicator.update(v) for v in values[:50]])
+    np.testing.assert_array_equal(again, streamed[:50])
+
+def test_warmup_and_reference_values():
+    values = _prices(200)
+    series = pd.Series(values)
+    np.testing.assert_allclose(SMA(20).compute(values), series.rolling(20).mean(), rtol=1e-12, equal_nan=True)
+    assert np.isnan(EMA(12).compute(values)[:11]).all()
+    assert np.isnan(RSI(14).compute(values)[:14]).all() and not np.isnan(RSI(14).compute(values)[14])
+    assert RSI(3).compute(np.arange(10.0))[-1] == 100.0
+
+def test_compute_indicators_reads_each_source():
+    data = pd.DataFrame({"ask_price": [1.0, 2.0, 3.0], "bid_price": [0.0, 2.0, 4.0]})
+    out = compute_indicators({"sma": SMA(2), "bid_sma": SMA(2, source="bid_price")}, data)
+    np.testing.assert_array_equal(out["sma"], [np.nan, 1.5, 2.5])
+    np.testing.assert_array_equal(out["bid_sma"], [np.nan, 1.0, 3.0])
+
+def test_windows_are_validated():
+    with pytest.raises(ValueError):
+        SMA(0)
+    with pytest.raises(ValueError):
+        RollingStd(1)
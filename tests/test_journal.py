@@ -0,0 +1,91 @@
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import threading
+import pyarrow.dataset as ds
+from datalab.collector.buffer import TickBuffer
+from datalab.collector.exchange import StandardizedTick
+from datalab.collector.manager import MultiExchangeCollector
+from datalab.collector.writer import FlushWriter
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+# Feeds n numbered ticks, waits until every full buffer has been written, then blocks until killed
+CHILD = """
+import asyncio, sys, time
+from datalab.collector.exchange import StandardizedTick
+from datalab.collector.manager import MultiExchangeCollector
+
+async def main(root, n):
+    collector = MultiExchangeCollector({"data_dir": root, "buffer_size": 50, "journal": True, "exchanges": []})
+    await collector.start()
+    base = time.time_ns()
+    for i in range(n):
+        symbol = "BTC/USD" if i % 2 else "ETH-USD"
+        await collector._process_tick(StandardizedTick(base + i, "simulated", symbol, 100.0, 101.0,
+                                                       1.0, 2.0, 3.0, 4.0, 5.0, 6.0, sequence=i))
+    while collector.writer.flushed_ticks < n // 50 * 50:
+        await asyncio.sleep(0.01)
+    print("ready", flush=True)
+    await asyncio.sleep(3600)
+
+asyncio.run(main(sys.argv[1], int(sys.argv[2])))
+"""
+
+def _config(root):
+    return {"data_dir": root, "buffer_size": 50, "journal": True, "exchanges": []}
+
+def test_killed_collector_recovers_every_tick(tmp_path):
+    root = str(tmp_path / "data")
+    ticks = 175
+    child = subprocess.Popen(
+        [sys.executable, "-c", CHILD, root, str(ticks)],
+        stdout=subprocess.PIPE, text=True, env={**os.environ, "PYTHONPATH": SRC},
+    )
+    try:
+        assert child.stdout.readline().strip() == "ready"
+    finally:
+        child.send_signal(signal.SIGKILL)
+        child.wait()
+
+    # Flushed buffers only reached files that were still open (no footer) when the process died
+    in_progress = [f for _, _, files in os.walk(root) for f in files if f.endswith(".inprogress")]
+    assert in_progress
+
+    async def restart():
+        collector = MultiExchangeCollector(_config(root))
+        await collector.start()
+        await collector.stop()
+        return collector.journal_dir
+
+    journal_dir = asyncio.run(restart())
+
+    table = ds.dataset(root, format="parquet", partitioning="hive").to_table()
+    assert sorted(table.column("sequence").to_pylist()) == list(range(ticks))
+    assert not [f for _, _, files in os.walk(root) for f in files if f.endswith(".inprogress")]
+    assert os.listdir(journal_dir) == []
+
+def test_drop_oldest_releases_dropped_tokens():
+    written, dropped = [], []
+    unblock = threading.Event()
+
+    def sink(table, token):
+        unblock.wait()
+        written.append(token)
+
+    writer = FlushWriter(sink, 10, queue_size=1, policy="drop_oldest", on_dropped=dropped.append)
+
+    async def submit_all():
+        for token in range(3):
+            buffer = TickBuffer(10, writer.dictionaries)
+            buffer.append(StandardizedTick(1, "e", "s", 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0))
+            await writer.submit(buffer, token)
+            await asyncio.sleep(0.05)
+
+    asyncio.run(submit_all())
+    unblock.set()
+    writer.close()
+    assert len(dropped) == 1
+    assert sorted(written + dropped) == [0, 1, 2]
@@ -0,0 +1,56 @@
+import asyncio
+import threading
+import time
+from datalab.collector import manager
+from datalab.collector.exchange import StandardizedTick
+from datalab.collector.latency import LatencyHistogram, LatencyRecorder, bucket_bounds, bucket_index, summarize_latency
+from datalab.collector.manager import MultiExchangeCollector
+from datalab.utils.storage import load_latency_histograms
+
+def test_buckets_cover_every_value_with_bounded_error():
+    for value in [0, 1, 127, 128, 129, 255, 256, 1000, 123_456, 10**9]:
+        lower, upper = bucket_bounds(bucket_index(value))
+        assert lower <= value <= upper
+        assert upper - lower <= max(1, value // 63)
+
+def test_percentiles_and_summary_agree():
+    histogram = LatencyHistogram()
+    for value in range(1, 1001):
+        histogram.record(value)
+    assert histogram.percentile(50) in range(500, 510)
+    assert histogram.percentile(100) == 1000
+
+    recorder = LatencyRecorder()
+    for value in range(1, 1001):
+        recorder.record("binance", "BTCUSDT", "feed", value * 1000)
+    summary = summarize_latency(recorder.snapshot())
+    assert summary["count"].tolist() == [1000]
+    assert 0.5 <= summary["p50_ms"][0] < 0.51
+    assert recorder.snapshot().num_rows == 0
+
+def test_side_table_writes_do_not_block_the_tick_path(tmp_path, monkeypatch):
+    release = threading.Event()
+    write = manager.write_latency_histograms
+
+    def slow_write(*args):
+        release.wait(timeout=5)
+        return write(*args)
+
+    monkeypatch.setattr(manager, "write_latency_histograms", slow_write)
+    root = str(tmp_path)
+
+    async def run():
+        collector = MultiExchangeCollector({"data_dir": root, "buffer_size": 10, "exchanges": []})
+        await collector.start()
+        started = time.monotonic()
+        for i in range(10):
+            await collector._process_tick(StandardizedTick(time.time_ns(), "simulated", "BTC-USD", 100.0, 101.0,
+                                                           1.0, 2.0, 3.0, 4.0, 5.0, 6.0))
+        # The buffer flushed while the histogram write is still held back
+        assert time.monotonic() - started < 0.5
+        assert collector._side_task is not None and not collector._side_task.done()
+        release.set()
+        await collector.stop()
+
+    asyncio.run(run())
+    assert load_latency_histograms(root).num_rows > 0
@@ -0,0 +1,81 @@
+import asyncio
+import math
+import aiohttp
+import numpy as np
+from datalab.collector.exchange import StandardizedTick
+from datalab.collector.live import LiveIndex, LiveQueryServer
+
+T0 = 1_700_000_000 * 10**9
+
+def _tick(ts, exchange="binance", bid=100.0, spread=1.0):
+    return StandardizedTick(ts, exchange, "BTC-USD", bid, bid + 1.0, spread, spread * 2, math.nan, math.nan, 3.0, 4.0)
+
+def test_ring_wraps_and_keeps_the_newest_ticks():
+    index = LiveIndex(capacity=5)
+    for i in range(12):
+        index.append(_tick(T0 + i, bid=float(i)))
+    out = index.range("binance", "BTC-USD", T0, T0 + 100)
+    assert out["timestamp"] == [T0 + i for i in range(7, 12)]
+    assert out["bid_price"] == [7.0, 8.0, 9.0, 10.0, 11.0]
+    assert out["spread_100k"] == [None] * 5
+    assert index.series() == [{"exchange": "binance", "symbol": "BTC-USD", "count": 5, "first": T0 + 7, "last": T0 + 11}]
+
+def test_range_bounds_and_limit_across_the_wrap():
+    index = LiveIndex(capacity=8)
+    for i in range(13):
+        index.append(_tick(T0 + 10 * i, bid=float(i)))
+    # Stored: ticks 5..12, physically split at the wrap point
+    out = index.range("binance", "BTC-USD", T0 + 60, T0 + 110)
+    assert out["bid_price"] == [6.0, 7.0, 8.0, 9.0, 10.0]
+    assert not out["truncated"]
+
+    limited = index.range("binance", "BTC-USD", T0 + 60, T0 + 110, limit=2)
+    assert limited["bid_price"] == [9.0, 10.0] and limited["truncated"]
+    assert index.range("dydx", "BTC-USD", T0, T0 + 100)["timestamp"] == []
+
+def test_clock_steps_back_keep_the_series_sorted():
+    index = LiveIndex(capacity=4)
+    for ts in (T0 + 5, T0 + 3, T0 + 7):
+        index.append(_tick(ts))
+    assert index.range("binance", "BTC-USD", T0, T0 + 10)["timestamp"] == [T0 + 5, T0 + 5, T0 + 7]
+
+def test_latest_and_spread_stats_per_exchange():
+    index = LiveIndex(capacity=100)
+    for i in range(50):
+        index.append(_tick(T0 + i * 10**9, "binance", spread=float(i)))
+        index.append(_tick(T0 + i * 10**9, "dydx", bid=200.0))
+    latest = index.latest("BTC-USD")
+    assert [(q["exchange"], q["bid_price"]) for q in latest] == [("binance", 100.0), ("dydx", 200.0)]
+
+    (stats,) = index.spread_stats("BTC-USD", 10 * 10**9, exchange="binance", now=T0 + 49 * 10**9)
+    assert stats["ticks"] == 11
+    spread = stats["spread_10k"]
+    values = np.arange(39.0, 50.0)
+    assert (spread["count"], spread["min"], spread["max"]) == (11, 39.0, 49.0)
+    assert spread["mean"] == values.mean() and spread["p99"] == np.percentile(values, 99)
+    assert stats["spread_100k"] == {"count": 0}
+
+def test_server_answers_range_queries_and_rejects_bad_input():
+    index = LiveIndex(capacity=10)
+    for i in range(3):
+        index.append(_tick(T0 + i, bid=float(i)))
+
+    async def run():
+        server = LiveQueryServer(index, port=0)
+        await server.start()
+        port = server._runner.addresses[0][1]
+        base = f"http://127.0.0.1:{port}"
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"{base}/range", params={"exchange": "binance", "symbol": "BTC-USD",
+                                                            "start": str(T0), "end": str(T0 + 10)}) as r:
+                body = await r.json()
+            async with session.get(f"{base}/range", params={"symbol": "BTC-USD"}) as r:
+                missing = r.status
+            async with session.get(f"{base}/stats", params={"symbol": "BTC-USD", "window": "soon"}) as r:
+                bad_window = r.status
+        await server.stop()
+        return body, missing, bad_window
+
+    body, missing, bad_window = asyncio.run(run())
+    assert body["bid_price"] == [0.0, 1.0, 2.0]
+    assert (missing, bad_window) == (400, 400)
@@ -0,0 +1,56 @@
+import os
+import pandas as pd
+from datalab.collector.buffer import TickBuffer
+from datalab.collector.exchange import StandardizedTick
+from datalab.utils.storage import PartitionedParquetWriter, iter_tick_batches, load_ticks, save_to_parquet
+
+DAY = 86_400 * 10**9
+T0 = 19_700 * DAY  # 2023-12-09 00:00 UTC
+
+def _dataset(root):
+    buffer = TickBuffer(40)
+    for i in range(40):
+        exchange = "binance" if i % 2 else "dydx"
+        symbol = "BTC-USD" if i % 4 < 2 else "ETH-USD"
+        buffer.append(StandardizedTick(T0 + (i // 20) * DAY + i, exchange, symbol, float(i), i + 1.0,
+                                       1.0, 2.0, 3.0, 4.0, 5.0, 6.0, sequence=i))
+    writer = PartitionedParquetWriter(root)
+    writer.write(buffer.to_arrow())
+    writer.close()
+
+def test_filters_and_columns(tmp_path):
+    root = str(tmp_path)
+    _dataset(root)
+    df = load_ticks(root, exchanges=["binance"], symbols=["BTC-USD"], columns=["timestamp", "sequence"])
+    assert list(df.columns) == ["timestamp", "sequence"]
+    assert sorted(df["sequence"]) == [i for i in range(40) if i % 2 and i % 4 < 2]
+
+    day_two = load_ticks(root, start=T0 + DAY, columns=["sequence"])
+    assert sorted(day_two["sequence"]) == list(range(20, 40))
+    window = load_ticks(root, start=pd.Timestamp(T0 + 5, tz="UTC"), end="2023-12-09 00:00:00.000000010",
+                        columns=["sequence"])
+    assert sorted(window["sequence"]) == list(range(5, 10))
+
+def test_other_partitions_are_never_opened(tmp_path):
+    root = str(tmp_path)
+    _dataset(root)
+    # A file that cannot be read in a partition the filter excludes
+    broken = os.path.join(root, "exchange=kraken", "symbol=BTC-USD", "date=2023-12-09")
+    os.makedirs(broken)
+    with open(os.path.join(broken, "part_1.parquet"), "wb") as f:
+        f.write(b"not parquet")
+    assert len(load_ticks(root, exchanges=["dydx"], columns=["sequence"])) == 20
+
+def test_batches_are_bounded(tmp_path):
+    root = str(tmp_path)
+    _dataset(root)
+    sizes = [b.num_rows for b in iter_tick_batches(root, batch_size=3, columns=["timestamp"])]
+    assert max(sizes) <= 3 and sum(sizes) == 40
+
+def test_single_file(tmp_path):
+    path = str(tmp_path / "ticks.parquet")
+    buffer = TickBuffer(3)
+    for i in range(3):
+        buffer.append(StandardizedTick(T0 + i, "dydx", "BTC-USD", 1.0, 2.0, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0))
+    save_to_parquet(buffer.to_arrow(), path)
+    assert load_ticks(path, symbols=["BTC-USD"], start=T0 + 1)["timestamp"].tolist() == [T0 + 1, T0 + 2]
@@ -0,0 +1,75 @@
+import asyncio
+import logging
+import time
+import aiohttp
+import pytest
+from datalab.collector import loop
+from datalab.collector.metrics import CollectorMetrics, MetricsReporter
+
+def test_uvloop_falls_back_to_asyncio(monkeypatch, caplog):
+    async def main():
+        return "done"
+
+    monkeypatch.setattr(loop, "uvloop", None)
+    with caplog.at_level(logging.WARNING):
+        assert loop.run(main(), "uvloop") == "done"
+    assert "uvloop is not installed" in caplog.text
+    assert loop.available_loops() == ["asyncio"]
+    coro = main()
+    with pytest.raises(ValueError):
+        loop.run(coro, "trio")
+    coro.close()
+
+def test_lag_monitor_sees_a_blocked_loop():
+    lags = []
+
+    async def run():
+        monitor = asyncio.create_task(loop.monitor_loop_lag(lags.append, interval_s=0.01))
+        await asyncio.sleep(0.02)
+        time.sleep(0.1)  # hold the loop
+        await asyncio.sleep(0.05)
+        monitor.cancel()
+        await asyncio.gather(monitor, return_exceptions=True)
+
+    asyncio.run(run())
+    assert max(lags) >= 0.05
+
+def test_histogram_is_cumulative_and_lag_max_is_windowed():
+    metrics = CollectorMetrics(latency_buckets_ms=(1.0, 10.0))
+    for latency in (0.5, 0.5, 5.0, 50.0):
+        metrics.observe_tick("binance", latency)
+    metrics.observe_loop_lag(0.2)
+    metrics.observe_loop_lag(0.01)
+    metrics.roll()
+    text = metrics.render_prometheus({"queue_depth": 3})
+
+    assert 'datalab_tick_latency_ms_bucket{exchange="binance",le="1"} 2' in text
+    assert 'datalab_tick_latency_ms_bucket{exchange="binance",le="10"} 3' in text
+    assert 'datalab_tick_latency_ms_bucket{exchange="binance",le="+Inf"} 4' in text
+    assert 'datalab_ticks_total{exchange="binance"} 4' in text
+    assert "datalab_loop_lag_seconds 0.010000" in text
+    assert "datalab_loop_lag_max_seconds 0.200000" in text
+    assert "datalab_queue_depth 3" in text
+
+    metrics.roll()
+    assert metrics.loop_lag_max_s == 0.0
+    assert metrics.ticks_per_sec["binance"] == 0.0
+
+def test_reporter_serves_and_writes_the_same_text(tmp_path):
+    path = tmp_path / "metrics.prom"
+
+    async def run():
+        metrics = CollectorMetrics()
+        metrics.observe_tick("dydx", 1.0)
+        reporter = MetricsReporter(metrics, path=str(path), port=0, interval_s=60.0)
+        await reporter.start()
+        port = reporter._runner.addresses[0][1]
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"http://127.0.0.1:{port}/metrics") as response:
+                served = await response.text()
+        await reporter.stop()
+        return served
+
+    served = asyncio.run(run())
+    assert 'datalab_ticks_total{exchange="dydx"} 1' in served
+    assert 'datalab_ticks_total{exchange="dydx"} 1' in path.read_text()
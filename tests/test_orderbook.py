@@ -0,0 +1,91 @@
+import math
+import random
+from datalab.collector.orderbook import BookSide, OrderBook
+
+NOTIONALS = (10_000.0, 50_000.0, 100_000.0, 500_000.0)
+
+def _reference_fills(levels, is_bid, notionals=NOTIONALS):
+    # Walk the whole book from the best level
+    fills = []
+    for target in notionals:
+        notional = quantity = 0.0
+        fill = math.nan
+        for price, size in sorted(levels.items(), reverse=is_bid):
+            if notional + price * size >= target:
+                fill = target / (quantity + (target - notional) / price)
+                break
+            notional += price * size
+            quantity += size
+        fills.append(fill)
+    return fills
+
+def _assert_fills(side, levels):
+    expected = _reference_fills(levels, side.is_bid)
+    actual = side.fill_prices()
+    for a, e in zip(actual, expected):
+        assert (math.isnan(a) and math.isnan(e)) or math.isclose(a, e, rel_tol=1e-12)
+
+def test_random_deltas_match_a_full_walk():
+    rng = random.Random(7)
+    for is_bid in (True, False):
+        side = BookSide(is_bid)
+        levels = {}
+        for _ in range(3000):
+            price = round(100 + rng.randint(-200, 200) * 0.01, 2)
+            size = rng.choice([0.0, 0.0, rng.uniform(1, 300)])
+            side.update(price, size)
+            if size > 0:
+                levels[price] = size
+            else:
+                levels.pop(price, None)
+            if rng.random() < 0.3:
+                _assert_fills(side, levels)
+        assert len(side) == len(levels)
+        best = max(levels) if is_bid else min(levels)
+        assert side.best() == (best, levels[best])
+
+def test_level_removal():
+    side = BookSide(False)
+    side.replace([(100.0, 50.0), (101.0, 500.0), (102.0, 5000.0)])
+    assert side.update(100.0, 0.0)
+    assert side.best() == (101.0, 500.0)
+    assert len(side) == 2
+    _assert_fills(side, {101.0: 500.0, 102.0: 5000.0})
+    # Removing a level that is not there changes nothing
+    assert not side.update(100.5, 0.0)
+
+def test_cache_is_kept_below_the_deepest_used_level():
+    side = BookSide(False)
+    side.replace([(100.0, 10_000.0), (200.0, 1.0)])
+    fills = side.fill_prices()
+    assert fills == (100.0, 100.0, 100.0, 100.0)
+
+    # Beyond the depth the fills used: cache stays valid
+    assert not side.update(200.0, 2.0)
+    assert not side.update(150.0, 3.0)
+    assert side.fill_prices() is fills
+
+    # At the top: recomputed
+    assert side.update(99.0, 10.0)
+    _assert_fills(side, {99.0: 10.0, 100.0: 10_000.0, 150.0: 3.0, 200.0: 2.0})
+
+def test_thin_book_reports_nan_and_any_update_invalidates():
+    side = BookSide(True)
+    side.replace([(100.0, 1.0)])
+    assert all(math.isnan(f) for f in side.fill_prices())
+    assert side.update(50.0, 1.0)
+    assert all(math.isnan(f) for f in side.fill_prices())
+
+def test_offsets_ignore_older_updates():
+    side = BookSide(False)
+    assert side.update(100.0, 1.0, offset=5)
+    assert not side.update(100.0, 2.0, offset=4)
+    assert side.best() == (100.0, 1.0)
+
+def test_top_of_book_update_drops_better_levels():
+    book = OrderBook("BTC-USD")
+    book.apply_snapshot([(99.0, 1000.0), (98.0, 1000.0)], [(101.0, 1000.0), (102.0, 1000.0)])
+    assert book.apply_top(98.5, 2.0, 101.0, 3.0)
+    tick = book.tick("binance", 1)
+    assert (tick.bid_price, tick.liquidity_bid, tick.ask_price, tick.liquidity_ask) == (98.5, 2.0, 101.0, 3.0)
+    _assert_fills(book.bids, {98.5: 2.0, 98.0: 1000.0})
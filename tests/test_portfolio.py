@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+import pytest
+from datalab.backtest.portfolio import PortfolioEngine, align_prices
+from datalab.strategy.library.dca import PeriodicDCA
+
+def _frame(days, bid):
+    return pd.DataFrame({
+        "timestamp": pd.to_datetime(days),
+        "bid_price": bid,
+        "ask_price": [b + 1.0 for b in bid],
+    })
+
+def test_align_carries_quotes_forward_from_the_first_common_row():
+    prices = align_prices({
+        "A": _frame(["2024-01-01", "2024-01-02", "2024-01-04"], [10.0, 11.0, 13.0]),
+        "B": _frame(["2024-01-02", "2024-01-03"], [20.0, 21.0]),
+    })
+    assert list(prices.timestamps.astype("datetime64[D]").astype(str)) == ["2024-01-02", "2024-01-03", "2024-01-04"]
+    np.testing.assert_array_equal(prices.bids, [[11.0, 20.0], [11.0, 21.0], [13.0, 21.0]])
+    np.testing.assert_array_equal(prices.asks - prices.bids, np.ones((3, 2)))
+
+def test_align_rejects_an_asset_without_bars():
+    with pytest.raises(ValueError, match="B"):
+        align_prices({"A": _frame(["2024-01-01"], [10.0]), "B": _frame([], [])})
+
+def test_sleeves_add_up_to_the_portfolio():
+    days = pd.date_range("2024-01-01", periods=60, freq="D")
+    prices = align_prices({
+        "A": _frame(days, np.linspace(100, 150, 60)),
+        "B": _frame(days, np.linspace(50, 40, 60)),
+    })
+    result = PortfolioEngine(10_000.0, 0.001).run(
+        {"A": PeriodicDCA(100.0, 7), "B": PeriodicDCA(50.0, 7)}, prices, weights={"A": 3, "B": 1}, rebalance_days=30,
+    )
+    assert result.portfolio.final_value == pytest.approx(sum(r.final_value for r in result.assets.values()))
+    assert result.portfolio.total_invested == pytest.approx(sum(r.total_invested for r in result.assets.values()))
+    assert len(result.assets["A"].history) > 0
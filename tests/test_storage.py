@@ -0,0 +1,90 @@
+import os
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from datalab.collector.buffer import TickBuffer
+from datalab.collector.exchange import StandardizedTick
+from datalab.utils.storage import PartitionedParquetWriter, compact_dataset
+
+T0 = 1_700_000_000 * 10**9
+
+def _ticks(start, n):
+    buffer = TickBuffer(n)
+    for i in range(n):
+        buffer.append(StandardizedTick(T0 + start + i, "binance", "BTC/USD", 100.0, 101.0,
+                                       1.0, 2.0, 3.0, 4.0, 5.0, 6.0, sequence=start + i))
+    return buffer.to_arrow()
+
+def _write(root, start, n, prefix="part"):
+    writer = PartitionedParquetWriter(root, file_prefix=prefix)
+    writer.write(_ticks(start, n))
+    writer.close()
+
+def _files(root):
+    return sorted(os.path.join(d, f) for d, _, files in os.walk(root) for f in files if f.endswith(".parquet"))
+
+def _sequences(root):
+    return sorted(ds.dataset(root, format="parquet", partitioning="hive").to_table().column("sequence").to_pylist())
+
+def test_partition_layout_uses_uri_encoded_values(tmp_path):
+    root = str(tmp_path)
+    _write(root, 0, 5)
+    (path,) = _files(root)
+    assert os.path.relpath(path, root).split(os.sep)[:3] == ["exchange=binance", "symbol=BTC%2FUSD", "date=2023-11-14"]
+    table = ds.dataset(root, format="parquet", partitioning="hive").to_table()
+    assert set(table.column("symbol").to_pylist()) == {"BTC/USD"}
+
+def test_compaction_merges_small_files_in_row_groups(tmp_path):
+    root = str(tmp_path)
+    for i in range(5):
+        _write(root, i * 30, 30)
+    stats = compact_dataset(root, row_group_size=40, max_rows_per_file=100)
+    assert stats == {"partitions": 1, "files_removed": 5, "files_written": 2}
+    files = _files(root)
+    assert [pq.read_metadata(f).num_rows for f in files] == [100, 50]
+    first = pq.ParquetFile(files[0])
+    assert [first.metadata.row_group(i).num_rows for i in range(first.num_row_groups)] == [40, 40, 20]
+    assert _sequences(root) == list(range(150))
+
+def test_compaction_leaves_large_files_alone(tmp_path):
+    root = str(tmp_path)
+    for i in range(4):
+        _write(root, i * 25, 25)
+    compact_dataset(root, max_rows_per_file=100, large_file_rows=100)
+    (large,) = _files(root)
+    mtime = os.stat(large).st_mtime_ns
+
+    _write(root, 100, 10)
+    assert compact_dataset(root, max_rows_per_file=100, large_file_rows=100)["partitions"] == 0
+    _write(root, 110, 10)
+    stats = compact_dataset(root, max_rows_per_file=100, large_file_rows=100)
+    assert stats["files_removed"] == 2
+    assert large in _files(root) and os.stat(large).st_mtime_ns == mtime
+    assert _sequences(root) == list(range(120))
+
+def test_compaction_unifies_older_schemas(tmp_path):
+    root = str(tmp_path)
+    _write(root, 0, 10)
+    (path,) = _files(root)
+    # An older file without the sequence column
+    old = pq.read_table(path).drop_columns(["sequence"])
+    pq.write_table(old, os.path.join(os.path.dirname(path), "old_1.parquet"))
+    compact_dataset(root)
+    table = pq.read_table(_files(root)[0])
+    assert table.num_rows == 20
+    assert table.column("sequence").null_count == 10
+
+def test_orphaned_in_progress_files_are_recovered(tmp_path):
+    root = str(tmp_path)
+    writer = PartitionedParquetWriter(root, file_prefix="w0")
+    writer.write(_ticks(0, 5))
+    (in_progress,) = [os.path.join(d, f) for d, _, files in os.walk(root) for f in files]
+    directory = os.path.dirname(in_progress)
+    # One closed-but-not-renamed file, one without a footer, one of another prefix
+    pq.write_table(_ticks(5, 5).drop_columns(["exchange", "symbol"]), os.path.join(directory, ".w0_1.parquet.inprogress"))
+    with open(os.path.join(directory, ".w1_1.parquet.inprogress"), "wb") as f:
+        f.write(b"PAR1")
+
+    stats = PartitionedParquetWriter(root, file_prefix="w0").recover_orphans()
+    assert stats == {"renamed": 1, "removed": 1}
+    assert sorted(os.listdir(directory)) == [".w1_1.parquet.inprogress", "w0_1.parquet"]
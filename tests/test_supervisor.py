@@ -0,0 +1,60 @@
+from datalab.collector import supervisor
+from datalab.collector.supervisor import CollectorSupervisor, plan_shards, worker_config
+
+CONFIG = {
+    "data_dir": "/data",
+    "processes": 4,
+    "metrics_file": "/tmp/metrics.json",
+    "metrics_port": 9100,
+    "live": {"port": 8700, "path": "/tmp/live.sock"},
+    "exchanges": [
+        {"name": "binance", "symbols": [f"B{i}" for i in range(8)]},
+        {"name": "dydx", "symbols": ["D0", "D1"]},
+    ],
+}
+
+def test_large_exchanges_are_split_until_every_process_has_work():
+    groups = plan_shards(CONFIG, 4)
+    assert len(groups) == 4
+    symbols = sorted(s for group in groups for unit in group for s in unit["symbols"])
+    assert symbols == sorted(CONFIG["exchanges"][0]["symbols"] + CONFIG["exchanges"][1]["symbols"])
+    assert sorted(sum(len(u["symbols"]) for u in g) for g in groups) == [2, 2, 2, 4]
+    # Nothing left to split: fewer workers than requested
+    assert len(plan_shards({"exchanges": [{"name": "dydx", "symbols": ["D0"]}]}, 3)) == 1
+
+def test_workers_get_private_outputs():
+    conf = worker_config(CONFIG, CONFIG["exchanges"][:1], 2)
+    assert "processes" not in conf
+    assert conf["file_prefix"] == "part-w2"
+    assert conf["spill_dir"] == "/data/_spill/w2"
+    assert conf["metrics_file"] == "/tmp/metrics.w2.json"
+    assert conf["metrics_port"] == 9102
+    assert conf["live"] == {"port": 8702, "path": "/tmp/live.sock.w2"}
+    # The shared config is left untouched
+    assert CONFIG["live"]["port"] == 8700
+
+class _Exited:
+    exitcode = 1
+
+    def is_alive(self):
+        return False
+
+def test_dead_workers_restart_with_backoff(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(supervisor.time, "monotonic", lambda: clock[0])
+    sup = CollectorSupervisor(CONFIG, processes=1, restart_delay_s=1.0, max_restart_delay_s=4.0, healthy_after_s=60.0)
+    spawned = []
+
+    def spawn(i):
+        spawned.append(clock[0])
+        sup._procs[i] = _Exited()
+        sup._started_at[i] = clock[0]
+
+    monkeypatch.setattr(sup, "_spawn", spawn)
+    sup.start()
+    for _ in range(40):
+        clock[0] += 0.5
+        sup.check()
+    # Delays double: 1, 2, 4, then capped at 4 (plus the poll that noticed the exit)
+    assert [b - a - 0.5 for a, b in zip(spawned, spawned[1:])][:5] == [1.0, 2.0, 4.0, 4.0, 4.0]
+    assert sup.restarts == [len(spawned) - 1]
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+import pytest
+from datalab.backtest.engine import BacktestEngine
+from datalab.backtest.sweep import METRIC_FIELDS, expand_grid, run_sweep
+from datalab.strategy.library.momentum import MomentumDCA
+
+def _prices(n=300):
+    rng = np.random.default_rng(11)
+    bid = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({
+        "timestamp": pd.date_range("2022-01-01", periods=n, freq="D"),
+        "bid_price": bid,
+        "ask_price": bid * 1.001,
+    })
+
+GRID = {"budget_per_period": [50.0, 100.0], "period_days": [1, 7], "sma_period": [5, 20]}
+
+def test_expand_grid_covers_every_combination():
+    combos = expand_grid(GRID)
+    assert len(combos) == 8
+    assert {tuple(c.values()) for c in combos} == {(b, p, s) for b in [50.0, 100.0] for p in [1, 7] for s in [5, 20]}
+
+def test_rows_match_single_engine_runs():
+    data = _prices()
+    table = run_sweep(data, MomentumDCA, GRID, workers=1)
+    engine = BacktestEngine()
+    for row in table.itertuples(index=False):
+        result = engine.run(MomentumDCA(row.budget_per_period, row.period_days, row.sma_period), data)
+        for name in METRIC_FIELDS:
+            assert getattr(row, name) == pytest.approx(getattr(result, name), rel=1e-9, abs=1e-9), name
+        assert row.trades == len(result.history)
+
+def test_worker_processes_give_the_same_table():
+    data = _prices()
+    serial = run_sweep(data, MomentumDCA, GRID, workers=1)
+    parallel = run_sweep(data, MomentumDCA, GRID, workers=2, chunksize=3)
+    pd.testing.assert_frame_equal(serial, parallel)
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+from datalab.backtest.ticks import TickBacktester, slippage
+from datalab.collector.buffer import TickBuffer
+from datalab.collector.exchange import StandardizedTick
+from datalab.strategy.base import BaseDCAStrategy
+from datalab.utils.storage import PartitionedParquetWriter
+
+SEC = 10**9
+T0 = 1_700_000_040 * SEC  # a minute boundary
+
+class _Always(BaseDCAStrategy):
+    # Buys at every decision after the first minute, once every venue has quoted
+    def __init__(self, budget):
+        super().__init__(budget, 0)
+
+    def should_invest(self, date, price, indicators):
+        return date.value >= T0 + 60 * SEC
+
+    def get_investment_amount(self, date, available_cash):
+        return self.budget
+
+def _write(root, quotes, seconds=300):
+    # quotes: exchange -> (bid, ask, (spread_10k, spread_50k, spread_100k, spread_500k))
+    buffer = TickBuffer(seconds * len(quotes))
+    for s in range(seconds):
+        for exchange, (bid, ask, spreads) in quotes.items():
+            buffer.append(StandardizedTick(T0 + s * SEC, exchange, "BTC-USD", bid, ask, *spreads, 1.0, 1.0))
+    writer = PartitionedParquetWriter(root)
+    writer.write(buffer.to_arrow())
+    writer.close()
+
+# Tighter top of book on dydx, but its depth runs out quickly
+QUOTES = {
+    "binance": (99.9, 100.0, (0.1, 0.1, 0.1, 0.1)),
+    "dydx": (99.85, 99.95, (1.0, 2.0, 3.0, 4.0)),
+}
+
+def test_slippage_interpolates_the_recorded_depth():
+    bid, ask = np.array([99.9]), np.array([100.0])
+    spreads = np.array([[0.3, 0.7, 1.1, 3.1]])
+    assert slippage(0.0, bid, ask, spreads)[0] == pytest.approx(0.0)
+    assert slippage(5_000.0, bid, ask, spreads)[0] == pytest.approx(0.05)
+    assert slippage(10_000.0, bid, ask, spreads)[0] == pytest.approx(0.1)
+    assert slippage(30_000.0, bid, ask, spreads)[0] == pytest.approx(0.2)
+    assert np.isnan(slippage(10_000.0, bid, ask, np.array([[np.nan] * 4]))[0])
+
+def test_orders_go_to_the_cheapest_all_in_price(tmp_path):
+    root = str(tmp_path)
+    _write(root, QUOTES)
+    backtester = TickBacktester(100_000.0, 0.001)
+
+    small = backtester.run(_Always(1_000.0), root, "BTC-USD")
+    assert small.venues == ["dydx"] * 4
+    assert small.history.column("price")[0] == pytest.approx(99.95 + 0.045)
+
+    large = backtester.run(_Always(10_000.0), root, "BTC-USD")
+    assert large.venues == ["binance"] * 4
+    assert large.history.column("price")[0] == pytest.approx(100.0)
+    assert large.events == 600
+
+    # A higher fee outweighs dydx's better fill
+    expensive = TickBacktester(100_000.0, {"binance": 0.001, "dydx": 0.01}).run(_Always(1_000.0), root, "BTC-USD")
+    assert expensive.venues == ["binance"] * 4
+
+def test_stale_and_thin_venues_are_skipped(tmp_path):
+    root = str(tmp_path)
+    _write(root, {"dydx": QUOTES["dydx"]}, seconds=65)
+    _write(root, {"binance": (99.9, 100.0, (np.nan,) * 4)})
+    result = TickBacktester(100_000.0, 0.001, max_quote_age="10s").run(_Always(1_000.0), root, "BTC-USD")
+    # dydx stops quoting after the second decision; binance has no depth to fill against
+    assert result.venues == ["dydx"]
+    assert result.rejected_orders == 3
+
+def test_small_batches_replay_the_same(tmp_path):
+    root = str(tmp_path)
+    _write(root, QUOTES)
+    whole = TickBacktester(100_000.0, 0.001, sample_freq="1min").run(_Always(1_000.0), root, "BTC-USD")
+    batched = TickBacktester(100_000.0, 0.001, sample_freq="1min", batch_size=7).run(_Always(1_000.0), root, "BTC-USD")
+    assert whole.history == batched.history
+    assert whole.venues == batched.venues
+    np.testing.assert_allclose(whole.daily_values, batched.daily_values)
+    assert len(whole.daily_values) == 5
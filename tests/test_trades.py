@@ -0,0 +1,50 @@
+import pickle
+import numpy as np
+import pandas as pd
+import pytest
+from datalab.backtest.trades import TRADE_DTYPE, Trade, TradeLog
+
+def _trades(tz=None):
+    dates = pd.date_range("2024-03-01 09:00", periods=5, freq="D", tz=tz)
+    return [Trade(d, 100.0 + i, 50.0 + i, 0.1, (100.0 + i) / (50.0 + i)) for i, d in enumerate(dates)]
+
+@pytest.mark.parametrize("tz", [None, "Europe/Berlin"])
+def test_round_trip_keeps_every_field_and_the_time_zone(tz):
+    trades = _trades(tz)
+    log = TradeLog.from_trades(trades)
+    assert log.tz == (None if tz is None else tz)
+    assert log == trades
+    assert log[2] == trades[2]
+    assert list(log) == trades
+    assert log.nbytes == 5 * TRADE_DTYPE.itemsize
+
+    frame = log.to_frame()
+    assert list(frame.columns) == list(TRADE_DTYPE.names)
+    assert frame["date"].tolist() == [t.date for t in trades]
+
+def test_slices_are_logs_and_columns_are_views():
+    log = TradeLog.from_trades(_trades())
+    head = log[:2]
+    assert isinstance(head, TradeLog) and len(head) == 2
+    assert head == _trades()[:2]
+    assert np.shares_memory(log.column("amount"), log.records)
+    assert log.column("date").dtype == np.dtype("datetime64[ns]")
+
+def test_from_columns_matches_from_trades():
+    trades = _trades()
+    log = TradeLog.from_columns(
+        np.array([t.date for t in trades], dtype="datetime64[ns]"),
+        np.array([t.amount for t in trades]),
+        np.array([t.price for t in trades]),
+        np.array([t.fee for t in trades]),
+        np.array([t.asset_amount for t in trades]),
+    )
+    assert log == TradeLog.from_trades(trades)
+
+def test_pickles_as_one_buffer():
+    log = TradeLog.from_trades(_trades("UTC"))
+    restored = pickle.loads(pickle.dumps(log))
+    assert restored == log and restored.tz == "UTC"
+    assert TradeLog() == [] and len(TradeLog()) == 0
+    with pytest.raises(ValueError):
+        TradeLog(np.zeros(3))
@@ -0,0 +1,77 @@
+import asyncio
+import os
+import threading
+from dataclasses import replace
+import pytest
+from datalab.collector.exchange import StandardizedTick
+from datalab.collector.writer import FlushWriter
+
+TICK = StandardizedTick(0, "binance", "BTCUSDT", 100.0, 101.0, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0)
+
+class _Sink:
+    """Records the first timestamp of each written table; holds writes until released."""
+    def __init__(self):
+        self.release = threading.Event()
+        self.written = []
+
+    def __call__(self, table, token):
+        self.release.wait(timeout=5)
+        self.written.append(table.column("timestamp")[0].as_py())
+
+def _submit(writer, count, size=5):
+    async def run():
+        for i in range(count):
+            buffer = writer.acquire_buffer()
+            for j in range(size):
+                buffer.append(replace(TICK, timestamp=i * size + j))
+            await writer.submit(buffer)
+            await asyncio.sleep(0.02)
+    asyncio.run(run())
+
+def test_block_waits_and_writes_everything_in_order():
+    sink = _Sink()
+    writer = FlushWriter(sink, 5, queue_size=1, policy="block")
+    threading.Timer(0.2, sink.release.set).start()
+    _submit(writer, 4)
+    writer.close()
+    assert sink.written == [0, 5, 10, 15]
+    stats = writer.stats()
+    assert stats["flushed_ticks"] == 20 and stats["late_ticks"] > 0 and stats["dropped_ticks"] == 0
+
+def test_drop_oldest_discards_queued_buffers():
+    sink = _Sink()
+    writer = FlushWriter(sink, 5, queue_size=1, policy="drop_oldest")
+    _submit(writer, 4)
+    sink.release.set()
+    writer.close()
+    # The first buffer was already being written; the second and third were pushed out
+    assert sink.written == [0, 15]
+    assert writer.stats()["dropped_ticks"] == 10
+
+def test_spill_parks_buffers_on_disk_until_the_writer_catches_up(tmp_path):
+    spill_dir = str(tmp_path / "spill")
+    sink = _Sink()
+    writer = FlushWriter(sink, 5, queue_size=1, policy="spill", spill_dir=spill_dir)
+    _submit(writer, 4)
+    assert len(os.listdir(spill_dir)) == 2
+    sink.release.set()
+    writer.close()
+    assert sorted(sink.written) == [0, 5, 10, 15]
+    assert writer.stats()["spilled_ticks"] == 10
+    assert os.listdir(spill_dir) == []
+
+def test_written_buffers_are_recycled():
+    sink = _Sink()
+    sink.release.set()
+    writer = FlushWriter(sink, 5)
+    first = writer.acquire_buffer()
+    first.append(TICK)
+    asyncio.run(writer.submit(first))
+    writer.close()
+    assert writer.acquire_buffer() is first and len(first) == 0
+
+def test_policy_is_validated():
+    with pytest.raises(ValueError):
+        FlushWriter(_Sink(), 5, policy="fast")
+    with pytest.raises(ValueError):
+        FlushWriter(_Sink(), 5, policy="spill")